@@ -0,0 +1,126 @@
+"""
+Benchmark the leaderboard read query with and without the composite score indexes.
+
+Populates a scratch database with synthetic entries, then times the query
+get_leaderboard runs (and the per-language variant) and the rank count of
+rank_entry, and prints the query plans, first without the indexes and then
+with them.
+
+    python benchmarks/leaderboard_query.py [--rows 1000000] [--url sqlite:////tmp/leaderboard_bench.db]
+
+Point --url at a scratch Postgres database to measure the production planner;
+the tables there are dropped and recreated.
+"""
+from pathlib import Path
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import sqlalchemy as sa
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.models import LeaderboardEntry  # noqa: E402
+
+DATASET_TYPES = ['word_sorting', 'logical_deduction', 'causal_judgement',
+                 'text_summarization', 'translation_task', 'complex_transformation']
+LANGUAGES = ['es', 'pt', 'ru', 'sl', 'sv']
+BATCH_SIZE = 20000
+REPEATS = 50
+
+table = LeaderboardEntry.__table__
+
+BOARD_QUERY = (
+    sa.select(table)
+    .where(table.c.dataset_type == sa.bindparam('dataset_type'), table.c.is_production == sa.bindparam('is_production'))
+    .order_by(table.c.score.desc())
+    .limit(20)
+)
+LANGUAGE_QUERY = (
+    sa.select(table)
+    .where(table.c.dataset_type == 'translation_task', table.c.is_production == sa.bindparam('is_production'),
+           table.c.target_language == sa.bindparam('target_language'))
+    .order_by(table.c.score.desc())
+    .limit(20)
+)
+
+# rank_entry: entries ahead of a mid-board score
+RANK_QUERY = (
+    sa.select(sa.func.count())
+    .select_from(table)
+    .where(table.c.dataset_type == sa.bindparam('dataset_type'), table.c.is_production == sa.bindparam('is_production'),
+           table.c.score > sa.bindparam('score'))
+)
+
+
+def populate(engine, rows: int):
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        for start in range(0, rows, BATCH_SIZE):
+            batch = []
+            for _ in range(min(BATCH_SIZE, rows - start)):
+                dataset_type = rng.choice(DATASET_TYPES)
+                batch.append({
+                    'dataset_type': dataset_type,
+                    'name': f"user{rng.randrange(50000)}",
+                    'score': rng.uniform(0, 100),
+                    'prompt_length': rng.randrange(20, 2000),
+                    'is_production': rng.random() < 0.8,
+                    'target_language': rng.choice(LANGUAGES) if dataset_type == 'translation_task' else None,
+                })
+            conn.execute(table.insert(), batch)
+
+
+def explain(conn, query, params) -> str:
+    sql = str(query.params(**params).compile(conn, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN ANALYZE '
+    rows = conn.exec_driver_sql(prefix + sql).fetchall()
+    return '\n'.join('    ' + ' '.join(str(value) for value in row) for row in rows)
+
+
+def measure(engine, label: str):
+    cases = [
+        ('board', BOARD_QUERY, {'dataset_type': 'word_sorting', 'is_production': True}),
+        ('language', LANGUAGE_QUERY, {'is_production': True, 'target_language': 'sv'}),
+        ('rank (top 1%)', RANK_QUERY, {'dataset_type': 'word_sorting', 'is_production': True, 'score': 99.0}),
+        ('rank (median)', RANK_QUERY, {'dataset_type': 'word_sorting', 'is_production': True, 'score': 50.0}),
+    ]
+    with engine.connect() as conn:
+        for name, query, params in cases:
+            conn.execute(query, params).fetchall()  # warm the page cache
+            timings = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                conn.execute(query, params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{label} {name}: median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms")
+            print(explain(conn, query, params))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--url', default='sqlite:////tmp/leaderboard_bench.db')
+    args = parser.parse_args()
+
+    engine = sa.create_engine(args.url)
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    for index in table.indexes:
+        index.drop(engine)
+
+    start = time.perf_counter()
+    populate(engine, args.rows)
+    print(f"Inserted {args.rows} rows in {time.perf_counter() - start:.1f} s")
+
+    measure(engine, 'without indexes')
+    for index in table.indexes:
+        index.create(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+    measure(engine, 'with indexes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark pretest throughput of the serving modes against simulated Groq latency.
+
+Starts gunicorn (with gunicorn.conf.py) once per configuration, serving this
+module's app, where every Groq call is replaced by a sleep of --latency
+seconds, then fires --requests pretests at it from --concurrency clients and
+reports requests/sec and latency percentiles. The configurations are the
+current sync worker with one completion after another, the sync worker with a
+request's completions awaited together (ASYNC_COMPLETIONS), and the gthread
+worker with --threads threads on top of that.
+
+    python benchmarks/serving.py [--workers 1] [--threads 32] [--concurrency 32] [--requests 128] [--latency 0.3]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = Path(__file__).parent.parent
+LATENCY = float(os.environ.get('SIMULATED_GROQ_LATENCY', 0.3))
+DATASET_TYPE = 'word_sorting'
+
+
+def _completion(messages):
+    # Echo the user message back, as if the model had answered the example unchanged
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=messages[-1]['content']))])
+
+
+class _SimulatedCompletions:
+    def create(self, messages, **kwargs):
+        time.sleep(LATENCY)
+        return _completion(messages)
+
+
+class _SimulatedAsyncCompletions:
+    async def create(self, messages, **kwargs):
+        await asyncio.sleep(LATENCY)
+        return _completion(messages)
+
+
+def serve():
+    """The app with Groq simulated, imported by the gunicorn workers this benchmark starts"""
+    sys.path.insert(0, str(ROOT))
+    from src import llm_client
+    llm_client.initialize_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=_SimulatedCompletions()))
+    llm_client.initialize_async_client = lambda: SimpleNamespace(
+        chat=SimpleNamespace(completions=_SimulatedAsyncCompletions()))
+    from src.app import app
+    return app
+
+
+if os.environ.get('SERVING_BENCHMARK') == 'true':
+    app = serve()
+
+
+def wait_until_ready(url: str, timeout: float = 300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{url}/config/datasets.json", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.5)
+    raise RuntimeError(f"gunicorn did not start within {timeout}s")
+
+
+def pretest(url: str) -> float:
+    start = time.perf_counter()
+    response = requests.post(f"{url}/api/pretest", json={'dataset_type': DATASET_TYPE, 'system_prompt': 'Sort the words.'})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def run(name: str, env: dict, args) -> dict:
+    port = args.port
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'benchmarks.serving:app'],
+        cwd=ROOT,
+        env=dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(args.workers), SERVING_BENCHMARK='true',
+                 SIMULATED_GROQ_LATENCY=str(args.latency), GROQ_API_KEY='simulated', **env),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(url)
+        pretest(url)  # load the dataset before timing
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            start = time.perf_counter()
+            latencies = list(pool.map(lambda _: pretest(url), range(args.requests)))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        'name': name,
+        'rps': args.requests / elapsed,
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=128)
+    parser.add_argument('--latency', type=float, default=LATENCY, help='seconds per simulated Groq call')
+    parser.add_argument('--port', type=int, default=10100)
+    args = parser.parse_args()
+
+    configurations = [
+        ('sync, sequential completions', {'GUNICORN_THREADS': '1', 'ASYNC_COMPLETIONS': 'false'}),
+        ('sync, concurrent completions', {'GUNICORN_THREADS': '1', 'ASYNC_COMPLETIONS': 'true'}),
+        (f"gthread x{args.threads}, concurrent completions",
+         {'GUNICORN_THREADS': str(args.threads), 'ASYNC_COMPLETIONS': 'true'}),
+    ]
+    print(f"{args.workers} worker(s), {args.concurrency} clients, {args.requests} pretests, "
+          f"{args.latency * 1000:.0f} ms per Groq call")
+    baseline = None
+    for name, env in configurations:
+        result = run(name, env, args)
+        baseline = baseline or result['rps']
+        print(f"{result['name']:<40} {result['rps']:8.2f} req/s  ({result['rps'] / baseline:5.1f}x)  "
+              f"p50 {result['p50'] * 1000:7.0f} ms  p95 {result['p95'] * 1000:7.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
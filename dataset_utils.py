@@ -1,7 +1,11 @@
 import json
-import requests
 import random
-from datasets import Dataset
+from pathlib import Path
+from src.dataset_table import DatasetTable
+from src.remote_cache import fetch_json
+
+DATA_DIR = Path(__file__).parent / 'data'
+CAUSAL_JUDGEMENT_URL = 'https://raw.githubusercontent.com/google/BIG-bench/main/bigbench/benchmark_tasks/causal_judgment/task.json'
 
 def load_word_sorting_dataset_by_length(word_length=8, num_examples=10):
     """
@@ -9,12 +13,12 @@ def load_word_sorting_dataset_by_length(word_length=8, num_examples=10):
     """
     try:
         if word_length == 8:
-            filepath = '/Users/benwolley/prompt_game/data/word_sorting_8_words.json'
+            filepath = DATA_DIR / 'word_sorting_8_words.json'
             max_examples = 10  # Fixed 10 examples for 8-word list
             # Always return exactly 10 examples for 8-word lists
             requested_examples = 10
         elif word_length == 10:
-            filepath = '/Users/benwolley/prompt_game/data/word_sorting_10_words.json'
+            filepath = DATA_DIR / 'word_sorting_10_words.json'
             max_examples = 100  # Allow selection of 10-100 examples for 10-word list
             # Use the requested number for 10-word lists
             requested_examples = num_examples
@@ -56,11 +60,11 @@ def load_logical_deduction_five_objects():
     Loads the Logical Deduction 5-object dataset from a local file.
     - Fixed at 10 examples for testing.
     """
-    filepath = '/Users/benwolley/prompt_game/data/logical_deduction_5_objects.json'
+    filepath = DATA_DIR / 'logical_deduction_5_objects.json'
     try:
         with open(filepath, 'r') as f:
             data = json.load(f)
-        return Dataset.from_dict(data)
+        return DatasetTable.from_dict(data)
     except Exception as e:
         print(f"Error loading Logical Deduction 5-object dataset: {e}")
         return None
@@ -72,7 +76,7 @@ def load_logical_deduction_three_objects(num_examples=10):
     Loads the Logical Deduction 3-object dataset from a local file.
     Allows selection of 10-100 examples.
     """
-    filepath = '/Users/benwolley/prompt_game/data/logical_deduction_3_objects.json'
+    filepath = DATA_DIR / 'logical_deduction_3_objects.json'
     
     try:
         with open(filepath, 'r') as f:
@@ -86,52 +90,62 @@ def load_logical_deduction_three_objects(num_examples=10):
         
         dataset = {'inputs': selected_inputs, 'targets': selected_targets}
         print(f"Loaded {num_examples} examples from 3-object dataset from {filepath}")
-        return Dataset.from_dict(dataset)
+        return DatasetTable.from_dict(dataset)
     except Exception as e:
         print(f"Error loading Logical Deduction 3-object dataset from {filepath}: {e}")
         return None
 
-def load_causal_judgement(filepath='https://raw.githubusercontent.com/google/BIG-bench/main/bigbench/benchmark_tasks/causal_judgment/task.json', 
-                          is_pretest=False, num_examples=100):
+def load_causal_judgement(filepath=CAUSAL_JUDGEMENT_URL, is_pretest=False, num_examples=100):
     """
     Loads the Causal Judgment dataset.
     - Pretest: Takes first 10 examples
     - Full test: Takes up to num_examples from remaining examples (after the first 10)
     
+    The bundled data/causal_judgement_pretest.json and causal_judgement_fulltest.json
+    are used when present; otherwise the BIG-bench task is fetched through the
+    local content-addressed cache, so it is downloaded at most once.
+    
     Args:
-        filepath: URL to the dataset
+        filepath: URL to the dataset (only used when the bundled files are missing)
         is_pretest: Whether this is for pretest (loads pretest file) or full test (loads full test file)
         num_examples: Number of examples to load for full test
         
     Returns:
-        Dataset: Contains 'inputs' and 'targets' where targets are 'Yes' or 'No'
+        DatasetTable: Contains 'inputs' and 'targets' where targets are 'Yes' or 'No'
     """
     try:
-        response = requests.get(filepath)
-        response.raise_for_status()
-        data = json.loads(response.text)
-        
-        all_examples = data['examples']
-        
-        if is_pretest:
-            # Take first 10 examples for pretest
-            selected_examples = all_examples[:10]
+        bundled_path = DATA_DIR / ('causal_judgement_pretest.json' if is_pretest else 'causal_judgement_fulltest.json')
+        if bundled_path.exists():
+            with open(bundled_path) as f:
+                data = json.load(f)
+            inputs, targets = data['inputs'], data['targets']
+            if not is_pretest:
+                # The bundled full test file already excludes the pretest examples
+                selected_indices = random.sample(range(len(inputs)), min(len(inputs), num_examples))
+                inputs = [inputs[i] for i in selected_indices]
+                targets = [targets[i] for i in selected_indices]
         else:
-            # Take up to num_examples from remaining examples (11 onwards)
-            remaining_examples = all_examples[10:]
-            selected_examples = random.sample(remaining_examples, min(len(remaining_examples), num_examples))
+            all_examples = fetch_json(filepath)['examples']
+            
+            if is_pretest:
+                # Take first 10 examples for pretest
+                selected_examples = all_examples[:10]
+            else:
+                # Take up to num_examples from remaining examples (11 onwards)
+                remaining_examples = all_examples[10:]
+                selected_examples = random.sample(remaining_examples, min(len(remaining_examples), num_examples))
 
-        inputs = []
-        targets = []
-        
-        for example in selected_examples:
-            inputs.append(example['input'])
-            # Convert target_scores to Yes/No
-            target = "Yes" if example['target_scores']['Yes'] == 1 else "No"
-            targets.append(target)
+            inputs = []
+            targets = []
+            
+            for example in selected_examples:
+                inputs.append(example['input'])
+                # Convert target_scores to Yes/No
+                target = "Yes" if example['target_scores']['Yes'] == 1 else "No"
+                targets.append(target)
 
         print(f"Loaded {len(inputs)} examples from the Causal Judgement dataset {'(pretest)' if is_pretest else '(full test)'}")
-        return Dataset.from_dict({'inputs': inputs, 'targets': targets})
+        return DatasetTable.from_dict({'inputs': inputs, 'targets': targets})
     except Exception as e:
         print(f"Error loading Causal Judgement dataset: {e}")
         return None
\ No newline at end of file
@@ -0,0 +1,45 @@
+# gunicorn.conf.py
+import os
+
+bind = f":{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+# Requests mostly wait on Groq, so each worker serves several at once on threads
+# (gunicorn switches to the gthread worker when threads > 1)
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = 120
+graceful_timeout = 120
+
+# Import the app (spaCy models, dataset cache, config) once in the master and
+# share it copy-on-write with the forked workers
+preload_app = True
+
+
+def when_ready(server):
+    from src.warmup import freeze_heap, memory_report
+    freeze_heap()
+    server.log.info(f"Master memory after preload: {memory_report()}")
+
+
+def post_fork(server, worker):
+    from src.app import app
+    from src.models import db
+    from src.warmup import memory_report
+
+    # Connections opened in the master (db.create_all) must not be shared across processes
+    with app.app_context():
+        db.engine.dispose(close=False)
+    server.log.info(f"Worker {worker.pid} memory after fork: {memory_report()}")
+
+
+def post_worker_init(worker):
+    from src.leaderboard import replay_write_behind
+    # Commit queued entries journaled by a worker that crashed (its lock died with it)
+    replay_write_behind()
+
+
+def worker_exit(server, worker):
+    from src.leaderboard import flush_write_behind
+    from src.warmup import memory_report
+    # Commit queued leaderboard entries before the worker goes away
+    flush_write_behind()
+    server.log.info(f"Worker {worker.pid} memory at exit: {memory_report()}")
@@ -0,0 +1,70 @@
+"""add prompt_hash to leaderboard_entry and result to submission_details
+
+Revision ID: 0a7c5e3d9f61
+Revises: f2b6d8e0c913
+Create Date: 2026-10-19 21:45:00.000000
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7c5e3d9f61'
+down_revision = 'f2b6d8e0c913'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _prompt_hash(prompt):
+    # Same normalization as src.leaderboard.prompt_hash
+    return hashlib.sha256(' '.join(prompt.split()).encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    # db.create_all() may already have created these on fresh databases
+    if 'prompt_hash' not in _columns('leaderboard_entry'):
+        with op.batch_alter_table('leaderboard_entry') as batch_op:
+            batch_op.add_column(sa.Column('prompt_hash', sa.String(length=64), nullable=True))
+    if 'result' not in _columns('submission_details'):
+        with op.batch_alter_table('submission_details') as batch_op:
+            batch_op.add_column(sa.Column('result', sa.JSON(), nullable=True))
+
+    # Backfill hashes of existing prompts
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT entry_id, system_prompt FROM submission_details "
+            "WHERE entry_id > :last_id AND system_prompt IS NOT NULL ORDER BY entry_id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("UPDATE leaderboard_entry SET prompt_hash = :prompt_hash WHERE id = :entry_id"),
+            [{'entry_id': entry_id, 'prompt_hash': _prompt_hash(prompt)} for entry_id, prompt in rows]
+        )
+        last_id = rows[-1][0]
+
+    if 'ix_leaderboard_entry_prompt_hash' not in _indexes('leaderboard_entry'):
+        op.create_index('ix_leaderboard_entry_prompt_hash', 'leaderboard_entry', ['dataset_type', 'prompt_hash'])
+
+
+def downgrade():
+    op.drop_index('ix_leaderboard_entry_prompt_hash', table_name='leaderboard_entry')
+    with op.batch_alter_table('submission_details') as batch_op:
+        batch_op.drop_column('result')
+    with op.batch_alter_table('leaderboard_entry') as batch_op:
+        batch_op.drop_column('prompt_hash')
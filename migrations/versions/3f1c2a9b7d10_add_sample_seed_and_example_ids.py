@@ -0,0 +1,36 @@
+"""add sample_seed and example_ids to leaderboard_entry
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-19 10:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    # db.create_all() may already have created these on fresh databases
+    existing = _columns('leaderboard_entry')
+    with op.batch_alter_table('leaderboard_entry') as batch_op:
+        if 'sample_seed' not in existing:
+            batch_op.add_column(sa.Column('sample_seed', sa.Integer(), nullable=True))
+        if 'example_ids' not in existing:
+            batch_op.add_column(sa.Column('example_ids', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('leaderboard_entry') as batch_op:
+        batch_op.drop_column('example_ids')
+        batch_op.drop_column('sample_seed')
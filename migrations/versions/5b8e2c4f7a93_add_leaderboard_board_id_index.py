@@ -0,0 +1,35 @@
+"""add leaderboard board id index for id-ordered scans
+
+Revision ID: 5b8e2c4f7a93
+Revises: 7d3f9b1e4a28
+Create Date: 2026-10-20 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2c4f7a93'
+down_revision = '7d3f9b1e4a28'
+branch_labels = None
+depends_on = None
+
+
+def _indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    # db.create_all() may already have created it on fresh databases
+    if 'ix_leaderboard_entry_board_id' not in _indexes('leaderboard_entry'):
+        with op.get_context().autocommit_block():
+            op.create_index('ix_leaderboard_entry_board_id', 'leaderboard_entry',
+                            ['dataset_type', 'is_production', 'id'], postgresql_concurrently=True)
+
+
+def downgrade():
+    if 'ix_leaderboard_entry_board_id' in _indexes('leaderboard_entry'):
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_leaderboard_entry_board_id', table_name='leaderboard_entry',
+                          postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""add near_clone_of to leaderboard_entry
+
+Revision ID: 7d3f9b1e4a28
+Revises: 0a7c5e3d9f61
+Create Date: 2026-10-19 23:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3f9b1e4a28'
+down_revision = '0a7c5e3d9f61'
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    # db.create_all() may already have created it on fresh databases.
+    # Existing entries are flagged with `flask api flag-near-clones`.
+    if 'near_clone_of' not in _columns('leaderboard_entry'):
+        with op.batch_alter_table('leaderboard_entry') as batch_op:
+            batch_op.add_column(sa.Column('near_clone_of', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('leaderboard_entry') as batch_op:
+        batch_op.drop_column('near_clone_of')
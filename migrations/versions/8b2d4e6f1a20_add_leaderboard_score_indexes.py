@@ -0,0 +1,44 @@
+"""add composite leaderboard score indexes
+
+Revision ID: 8b2d4e6f1a20
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-19 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2d4e6f1a20'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_leaderboard_entry_board_score': ['dataset_type', 'is_production', sa.text('score DESC')],
+    'ix_leaderboard_entry_language_score': ['dataset_type', 'is_production', 'target_language', sa.text('score DESC')],
+}
+
+
+def _indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    # db.create_all() may already have created these on fresh databases
+    existing = _indexes('leaderboard_entry')
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction; on Postgres it
+    # builds without blocking writes, other databases ignore the flag
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            if name not in existing:
+                op.create_index(name, 'leaderboard_entry', columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    existing = _indexes('leaderboard_entry')
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            if name in existing:
+                op.drop_index(name, table_name='leaderboard_entry', postgresql_concurrently=True)
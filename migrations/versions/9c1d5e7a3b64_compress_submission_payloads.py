@@ -0,0 +1,146 @@
+"""store submission payloads compressed, with inputs as dataset references
+
+Revision ID: 9c1d5e7a3b64
+Revises: 5b8e2c4f7a93
+Create Date: 2026-10-20 11:15:00.000000
+
+"""
+import json
+import struct
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c1d5e7a3b64'
+down_revision = '5b8e2c4f7a93'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+# (JSON column, compressed column) pairs; inputs_ref is only filled in by `flask api compress-submissions`
+PAYLOADS = (('raw_predictions', 'predictions_data'), ('inputs_used', 'inputs_data'), ('result', 'result_data'))
+
+# Same blob format as src.submission_codec (version 1): version, dictionary id, zlib stream
+_HEADER = struct.Struct('<BI')
+
+details = sa.table(
+    'submission_details',
+    sa.column('entry_id', sa.Integer),
+    *[sa.column(json_column, sa.JSON(none_as_null=True)) for json_column, _ in PAYLOADS],
+    *[sa.column(blob_column, sa.LargeBinary) for _, blob_column in PAYLOADS],
+    sa.column('inputs_ref', sa.JSON(none_as_null=True))
+)
+
+
+def _encode(value):
+    if value is None:
+        return None
+    # Existing rows are compressed without a dictionary; compress-submissions re-encodes them with one
+    return _HEADER.pack(1, 0) + zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def _decode(blob, dictionaries):
+    if blob is None:
+        return None
+    _, dictionary_id = _HEADER.unpack_from(blob)
+    dictionary = dictionaries.get(dictionary_id, b'')
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return json.loads(decompressor.decompress(blob[_HEADER.size:]) + decompressor.flush())
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_table(table):
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def _batches(columns):
+    """submission_details rows in entry_id order, BATCH_SIZE at a time"""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(details.c.entry_id, *columns).where(details.c.entry_id > last_id)
+            .order_by(details.c.entry_id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    # db.create_all() may already have created these on fresh databases
+    if not _has_table('compression_dictionary'):
+        op.create_table(
+            'compression_dictionary',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('dataset_type', sa.String(length=50), nullable=False),
+            sa.Column('data', sa.LargeBinary(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True)
+        )
+        op.create_index('ix_compression_dictionary_dataset_type', 'compression_dictionary', ['dataset_type'])
+
+    existing = _columns('submission_details')
+    with op.batch_alter_table('submission_details') as batch_op:
+        for _, blob_column in PAYLOADS:
+            if blob_column not in existing:
+                batch_op.add_column(sa.Column(blob_column, sa.LargeBinary(), nullable=True))
+        if 'inputs_ref' not in existing:
+            batch_op.add_column(sa.Column('inputs_ref', sa.JSON(), nullable=True))
+
+    old_columns = [json_column for json_column, _ in PAYLOADS if json_column in existing]
+    if not old_columns:
+        return
+
+    bind = op.get_bind()
+    for rows in _batches([details.c[column] for column in old_columns]):
+        for row in rows:
+            values = {dict(PAYLOADS)[column]: _encode(value) for column, value in zip(old_columns, row[1:])}
+            bind.execute(details.update().where(details.c.entry_id == row[0]).values(**values))
+
+    with op.batch_alter_table('submission_details') as batch_op:
+        for column in old_columns:
+            batch_op.drop_column(column)
+
+
+def downgrade():
+    # Inputs stored as references are read back from the dataset versions through the app;
+    # the downgrade stops rather than lose inputs whose version can't be read
+    from src.submission_codec import dereference_inputs
+
+    with op.batch_alter_table('submission_details') as batch_op:
+        for json_column, _ in PAYLOADS:
+            batch_op.add_column(sa.Column(json_column, sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    dictionaries = dict(bind.execute(sa.text("SELECT id, data FROM compression_dictionary")).fetchall())
+    dataset_types = sa.table('leaderboard_entry', sa.column('id', sa.Integer), sa.column('dataset_type', sa.String))
+    blob_columns = [details.c[blob_column] for _, blob_column in PAYLOADS]
+    for rows in _batches(blob_columns + [details.c.inputs_ref]):
+        entry_types = dict(bind.execute(sa.select(dataset_types.c.id, dataset_types.c.dataset_type).where(
+            dataset_types.c.id.in_([row[0] for row in rows])
+        )).fetchall())
+        for row in rows:
+            values = {json_column: _decode(blob, dictionaries) for (json_column, _), blob in zip(PAYLOADS, row[1:4])}
+            if row[4] is not None:
+                values['inputs_used'] = dereference_inputs(entry_types[row[0]], row[4])
+                if values['inputs_used'] is None:
+                    raise ValueError(
+                        f"Inputs of leaderboard entry {row[0]} reference {entry_types[row[0]]} examples that "
+                        f"can't be read back; restore the dataset version ({row[4].get('dataset_sha256')}) "
+                        f"under data/versions before downgrading"
+                    )
+            bind.execute(details.update().where(details.c.entry_id == row[0]).values(**values))
+
+    with op.batch_alter_table('submission_details') as batch_op:
+        for _, blob_column in PAYLOADS:
+            batch_op.drop_column(blob_column)
+        batch_op.drop_column('inputs_ref')
+    op.drop_index('ix_compression_dictionary_dataset_type', table_name='compression_dictionary')
+    op.drop_table('compression_dictionary')
@@ -0,0 +1,121 @@
+"""reuse stored results by reference and compact stored results
+
+Revision ID: b6e3f1a9c2d5
+Revises: 9c1d5e7a3b64
+Create Date: 2026-10-21 09:30:00.000000
+
+"""
+import json
+import struct
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e3f1a9c2d5'
+down_revision = '9c1d5e7a3b64'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# Same blob format as src.submission_codec (version 1): version, dictionary id, zlib stream
+_HEADER = struct.Struct('<BI')
+
+entries = sa.table(
+    'leaderboard_entry',
+    sa.column('id', sa.Integer),
+    sa.column('reused_from', sa.Integer)
+)
+details = sa.table(
+    'submission_details',
+    sa.column('entry_id', sa.Integer),
+    sa.column('predictions_data', sa.LargeBinary),
+    sa.column('inputs_ref', sa.JSON(none_as_null=True)),
+    sa.column('inputs_data', sa.LargeBinary),
+    sa.column('result_data', sa.LargeBinary)
+)
+
+
+def _encode(value, dictionary_id, dictionaries):
+    dictionary = dictionaries.get(dictionary_id, b'')
+    compressor = zlib.compressobj(9, zdict=dictionary) if dictionary else zlib.compressobj(9)
+    data = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return _HEADER.pack(1, dictionary_id) + compressor.compress(data) + compressor.flush()
+
+
+def _decode(blob, dictionaries):
+    _, dictionary_id = _HEADER.unpack_from(blob)
+    dictionary = dictionaries.get(dictionary_id, b'')
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return dictionary_id, json.loads(decompressor.decompress(blob[_HEADER.size:]) + decompressor.flush())
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _results():
+    """(entry_id, result_data) of submission_details rows with a stored result, BATCH_SIZE at a time"""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(details.c.entry_id, details.c.result_data)
+            .where(details.c.entry_id > last_id, details.c.result_data.isnot(None))
+            .order_by(details.c.entry_id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    # Stored results are shrunk to their evaluation settings, metrics and per-example scores
+    from src.submission_codec import compact_result
+
+    # db.create_all() may already have created it on fresh databases
+    if 'reused_from' not in _columns('leaderboard_entry'):
+        with op.batch_alter_table('leaderboard_entry') as batch_op:
+            batch_op.add_column(sa.Column('reused_from', sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    dictionaries = dict(bind.execute(sa.text("SELECT id, data FROM compression_dictionary")).fetchall())
+    for rows in _results():
+        for entry_id, blob in rows:
+            dictionary_id, result = _decode(blob, dictionaries)
+            if 'response' not in result:
+                continue
+            compact = compact_result(result.get('evaluation'), result['response'])
+            bind.execute(details.update().where(details.c.entry_id == entry_id).values(
+                result_data=_encode(compact, dictionary_id, dictionaries)))
+
+
+def downgrade():
+    # Compact results can't be turned back into full responses without the datasets,
+    # so they are dropped: those entries are simply evaluated again when resubmitted.
+    # Entries that reused a result get copies of their source's predictions and inputs.
+    bind = op.get_bind()
+    bind.execute(details.update().where(details.c.result_data.isnot(None)).values(result_data=None))
+
+    reused = bind.execute(
+        sa.select(entries.c.id, entries.c.reused_from).where(entries.c.reused_from.isnot(None))
+    ).fetchall()
+    for start in range(0, len(reused), BATCH_SIZE):
+        batch = dict(reused[start:start + BATCH_SIZE])
+        sources = {row[0]: row[1:] for row in bind.execute(
+            sa.select(details.c.entry_id, details.c.predictions_data, details.c.inputs_ref, details.c.inputs_data)
+            .where(details.c.entry_id.in_(set(batch.values())))
+        )}
+        for entry_id, source_id in batch.items():
+            if source_id not in sources:
+                continue
+            predictions_data, inputs_ref, inputs_data = sources[source_id]
+            bind.execute(details.update().where(details.c.entry_id == entry_id).values(
+                predictions_data=predictions_data, inputs_ref=inputs_ref, inputs_data=inputs_data))
+
+    with op.batch_alter_table('leaderboard_entry') as batch_op:
+        batch_op.drop_column('reused_from')
@@ -0,0 +1,116 @@
+"""move system_prompt, raw_predictions and inputs_used to submission_details
+
+Revision ID: c4e8a1d25b37
+Revises: 8b2d4e6f1a20
+Create Date: 2026-10-19 16:40:00.000000
+
+"""
+import json
+import struct
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1d25b37'
+down_revision = '8b2d4e6f1a20'
+branch_labels = None
+depends_on = None
+
+PAYLOAD_COLUMNS = ('system_prompt', 'raw_predictions', 'inputs_used')
+BATCH_SIZE = 500
+# Compressed columns a submission_details table made by db.create_all() has instead of the JSON ones,
+# in the blob format of src.submission_codec (version 1): version, dictionary id (0 = none), zlib stream
+COMPRESSED_COLUMNS = {'raw_predictions': 'predictions_data', 'inputs_used': 'inputs_data'}
+_HEADER = struct.Struct('<BI')
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_table(table):
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def _encode(value):
+    if value is None:
+        return None
+    if isinstance(value, str):  # JSON columns read back as text without a JSON type
+        value = json.loads(value)
+    return _HEADER.pack(1, 0) + zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def _backfill_compressed(existing):
+    """Copy payloads into a submission_details table that already has the compressed columns"""
+    bind = op.get_bind()
+    entries = sa.table('leaderboard_entry', sa.column('id', sa.Integer),
+                       *[sa.column(column) for column in PAYLOAD_COLUMNS if column in existing])
+    details = sa.table('submission_details', sa.column('entry_id', sa.Integer), sa.column('system_prompt'),
+                       *[sa.column(column, sa.LargeBinary) for column in COMPRESSED_COLUMNS.values()])
+    stored = sa.select(details.c.entry_id).where(details.c.entry_id == entries.c.id).exists()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(entries).where(entries.c.id > last_id, ~stored).order_by(entries.c.id).limit(BATCH_SIZE)
+        ).mappings().fetchall()
+        if not rows:
+            return
+        values = []
+        for row in rows:
+            if all(row.get(column) is None for column in PAYLOAD_COLUMNS):
+                continue
+            value = {'entry_id': row['id'], 'system_prompt': row.get('system_prompt')}
+            value.update({blob: _encode(row.get(column)) for column, blob in COMPRESSED_COLUMNS.items()})
+            values.append(value)
+        if values:
+            bind.execute(details.insert(), values)
+        last_id = rows[-1]['id']
+
+
+def upgrade():
+    # db.create_all() may already have created the new table on startup
+    if not _has_table('submission_details'):
+        op.create_table(
+            'submission_details',
+            sa.Column('entry_id', sa.Integer(), sa.ForeignKey('leaderboard_entry.id', ondelete='CASCADE'),
+                      primary_key=True),
+            sa.Column('system_prompt', sa.Text(), nullable=True),
+            sa.Column('raw_predictions', sa.JSON(), nullable=True),
+            sa.Column('inputs_used', sa.JSON(), nullable=True)
+        )
+
+    existing = _columns('leaderboard_entry')
+    if not set(PAYLOAD_COLUMNS) & existing:
+        return
+
+    if 'raw_predictions' not in _columns('submission_details'):
+        # Created by db.create_all() in the table's current, compressed shape
+        _backfill_compressed(existing)
+    else:
+        op.execute(
+            "INSERT INTO submission_details (entry_id, system_prompt, raw_predictions, inputs_used) "
+            "SELECT e.id, e.system_prompt, e.raw_predictions, e.inputs_used FROM leaderboard_entry e "
+            "WHERE NOT EXISTS (SELECT 1 FROM submission_details d WHERE d.entry_id = e.id) "
+            "AND (e.system_prompt IS NOT NULL OR e.raw_predictions IS NOT NULL OR e.inputs_used IS NOT NULL)"
+        )
+    with op.batch_alter_table('leaderboard_entry') as batch_op:
+        for column in PAYLOAD_COLUMNS:
+            if column in existing:
+                batch_op.drop_column(column)
+
+
+def downgrade():
+    with op.batch_alter_table('leaderboard_entry') as batch_op:
+        batch_op.add_column(sa.Column('system_prompt', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('raw_predictions', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('inputs_used', sa.JSON(), nullable=True))
+
+    for column in PAYLOAD_COLUMNS:
+        op.execute(
+            f"UPDATE leaderboard_entry SET {column} = "
+            f"(SELECT d.{column} FROM submission_details d WHERE d.entry_id = leaderboard_entry.id)"
+        )
+    op.drop_table('submission_details')
@@ -0,0 +1,42 @@
+"""add leaderboard name and timestamp filter indexes
+
+Revision ID: e1a9c3f7b542
+Revises: c4e8a1d25b37
+Create Date: 2026-10-19 19:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1a9c3f7b542'
+down_revision = 'c4e8a1d25b37'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_leaderboard_entry_name_score': ['dataset_type', 'is_production', 'name', sa.text('score DESC')],
+    'ix_leaderboard_entry_board_timestamp': ['dataset_type', 'is_production', 'timestamp'],
+}
+
+
+def _indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    # db.create_all() may already have created these on fresh databases
+    existing = _indexes('leaderboard_entry')
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            if name not in existing:
+                op.create_index(name, 'leaderboard_entry', columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    existing = _indexes('leaderboard_entry')
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            if name in existing:
+                op.drop_index(name, table_name='leaderboard_entry', postgresql_concurrently=True)
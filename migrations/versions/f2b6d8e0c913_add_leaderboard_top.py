@@ -0,0 +1,57 @@
+"""add leaderboard_top table of each board's best entries
+
+Revision ID: f2b6d8e0c913
+Revises: e1a9c3f7b542
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6d8e0c913'
+down_revision = 'e1a9c3f7b542'
+branch_labels = None
+depends_on = None
+
+# Must match LEADERBOARD_SIZE in src/leaderboard.py
+TOP_N = 20
+
+
+def upgrade():
+    # db.create_all() may already have created the (empty) table on startup
+    if not sa.inspect(op.get_bind()).has_table('leaderboard_top'):
+        op.create_table(
+            'leaderboard_top',
+            sa.Column('dataset_type', sa.String(length=50), primary_key=True),
+            sa.Column('is_production', sa.Boolean(), primary_key=True),
+            sa.Column('target_language', sa.String(length=10), primary_key=True),
+            sa.Column('entry_id', sa.Integer(), sa.ForeignKey('leaderboard_entry.id', ondelete='CASCADE'),
+                      primary_key=True),
+            sa.Column('score', sa.Float(), nullable=False)
+        )
+
+    # Seed every board from existing entries: '' is the all-languages board
+    op.execute("DELETE FROM leaderboard_top")
+    op.execute(
+        "INSERT INTO leaderboard_top (dataset_type, is_production, target_language, entry_id, score) "
+        "SELECT dataset_type, is_production, '', id, score FROM ("
+        "  SELECT dataset_type, is_production, id, score, ROW_NUMBER() OVER ("
+        "    PARTITION BY dataset_type, is_production ORDER BY score DESC, id DESC) AS position"
+        "  FROM leaderboard_entry WHERE is_production IS NOT NULL"
+        f") ranked WHERE position <= {TOP_N}"
+    )
+    op.execute(
+        "INSERT INTO leaderboard_top (dataset_type, is_production, target_language, entry_id, score) "
+        "SELECT dataset_type, is_production, target_language, id, score FROM ("
+        "  SELECT dataset_type, is_production, target_language, id, score, ROW_NUMBER() OVER ("
+        "    PARTITION BY dataset_type, is_production, target_language ORDER BY score DESC, id DESC) AS position"
+        "  FROM leaderboard_entry WHERE is_production IS NOT NULL"
+        "  AND target_language IS NOT NULL AND target_language <> ''"
+        f") ranked WHERE position <= {TOP_N}"
+    )
+
+
+def downgrade():
+    op.drop_table('leaderboard_top')
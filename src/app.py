@@ -4,9 +4,12 @@ from flask_migrate import Migrate
 from pathlib import Path
 import os
 from dotenv import load_dotenv
-from src.routes import api
+from src.routes import api, dataset_manager
+from src import commands  # registers CLI commands on the api blueprint
 from src.config import get_config
 from src.models import db
+from src.warmup import warm_up
+from src.leaderboard import init_write_behind, warm_prompt_index
 
 def create_app():
     # Load environment variables
@@ -36,11 +39,20 @@ def create_app():
     with app.app_context():
         db.create_all()
 
+    if app.config.get('LEADERBOARD_WRITE_BEHIND'):
+        init_write_behind(app)
+
     # Setup CORS
     CORS(app)
     
     # Register blueprint
     app.register_blueprint(api)
+
+    # Warm shared state so a preloading gunicorn master shares it with workers
+    if app.config.get('PRELOAD_DATASETS'):
+        warm_up(dataset_manager)
+        with app.app_context():
+            warm_prompt_index(list(dataset_manager.config))
     
     return app
 
@@ -0,0 +1,174 @@
+import json
+import time
+from pathlib import Path
+from flask.cli import click
+from src.routes import api, dataset_manager
+from src.leaderboard import flag_near_clones, rebuild_top_entries
+from src.leaderboard_archive import RETENTION_DAYS, archive_entries, restore_entries
+from src.leaderboard_export import EXPORT_FORMATS, export_chunks
+from src.models import db, LeaderboardEntry
+from src.submission_storage import recompress_submissions, train_compression_dictionary
+from src.metrics.lexical import (
+    SUMMARIZATION_WEIGHTS,
+    TRANSLATION_WEIGHTS,
+    lexical_similarity,
+    score_agreement
+)
+from src.metrics.text_summarization import metrics as summarization_metrics
+from src.metrics.translation_task import metrics as translation_metrics
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+def _lead_sentence(document: str) -> str:
+    return document.strip().split('\n')[0]
+
+
+def _summarization_pairs():
+    """Reference summaries paired with the document lead (related) and the next summary (unrelated)."""
+    with open(DATA_DIR / 'xsum_sample_100.json') as f:
+        examples = json.load(f)
+    pairs = []
+    for i, example in enumerate(examples):
+        pairs.append((example['summary'], _lead_sentence(example['document'])))
+        pairs.append((example['summary'], examples[(i + 1) % len(examples)]['summary']))
+    return pairs
+
+
+def _translation_pairs():
+    """Reference translations paired with a truncated copy (related) and the next example (unrelated)."""
+    with open(DATA_DIR / 'translation_test.json') as f:
+        examples = json.load(f)['examples']
+    pairs = []
+    for i, example in enumerate(examples):
+        following = examples[(i + 1) % len(examples)]
+        for language, reference in example['translations'].items():
+            words = reference.split()
+            pairs.append((' '.join(words[:max(1, len(words) * 3 // 4)]), reference))
+            pairs.append((following['translations'][language], reference))
+    return pairs
+
+
+@api.cli.command('similarity-agreement')
+def similarity_agreement():
+    """Compare lexical and spaCy similarity scores on the bundled datasets."""
+    if summarization_metrics.nlp is None or translation_metrics.nlp is None:
+        click.echo("spaCy model en_core_web_md is not available; nothing to compare against")
+        return
+
+    runs = [
+        ('text_summarization', _summarization_pairs(),
+         lambda a, b: summarization_metrics.calculate_similarity(a, b, 'spacy'), SUMMARIZATION_WEIGHTS),
+        ('translation_task', _translation_pairs(),
+         lambda a, b: translation_metrics.calculate_translation_similarity(a, b, 'spacy'), TRANSLATION_WEIGHTS),
+    ]
+    for dataset_type, pairs, spacy_score, weights in runs:
+        spacy_scores = [spacy_score(a, b) for a, b in pairs]
+        lexical_scores = [lexical_similarity(a, b, weights) for a, b in pairs]
+        agreement = score_agreement(spacy_scores, lexical_scores)
+        click.echo(f"{dataset_type}: {json.dumps(agreement)}")
+
+
+@api.cli.command('convert-datasets')
+@click.argument('dataset_type', required=False)
+def convert_datasets(dataset_type=None):
+    """Convert configured JSON datasets to indexed JSONL files."""
+    dataset_types = [dataset_type] if dataset_type else list(dataset_manager.config)
+    for name in dataset_types:
+        for mode in ('practice', 'test'):
+            file_name = dataset_manager.config[name].get(mode, {}).get('file_path', '')
+            if not file_name or file_name.endswith('.jsonl'):
+                continue
+            output = dataset_manager.convert_to_jsonl(name, mode)
+            click.echo(f"{name} {mode}: wrote {output}")
+
+
+@api.cli.command('compile-datasets')
+@click.argument('dataset_type', required=False)
+@click.option('--verify', is_flag=True, help='Check existing bundles against their sources\' SHA-256 instead of compiling.')
+def compile_datasets(dataset_type=None, verify=False):
+    """Validate configured datasets and compile them into bundles under data/compiled."""
+    dataset_types = [dataset_type] if dataset_type else list(dataset_manager.config)
+    failures = []
+    for name in dataset_types:
+        for mode in ('practice', 'test'):
+            file_name = dataset_manager.config[name].get(mode, {}).get('file_path', '')
+            if not file_name or file_name.endswith('.jsonl'):
+                continue
+            if verify:
+                if dataset_manager.verify_bundle(name, mode):
+                    click.echo(f"{name} {mode}: bundle is current")
+                else:
+                    failures.append(f"{name}.{mode}: bundle is missing or stale")
+                continue
+            try:
+                output = dataset_manager.compile_dataset(name, mode)
+            except ValueError as e:
+                failures.append(str(e))
+                continue
+            click.echo(f"{name} {mode}: wrote {output}")
+    if failures:
+        raise click.ClickException(("Stale bundles:\n" if verify else "Schema errors:\n") + "\n".join(failures))
+
+
+@api.cli.command('rebuild-leaderboard-top')
+def rebuild_leaderboard_top():
+    """Recompute the leaderboard_top table from all leaderboard entries."""
+    written = rebuild_top_entries()
+    click.echo(f"Wrote {written} leaderboard_top rows")
+
+
+@api.cli.command('flag-near-clones')
+@click.argument('dataset_type', required=False)
+def flag_near_clones_command(dataset_type):
+    """Rebuild the near-duplicate prompt index from the database and re-flag near clones."""
+    dataset_types = [dataset_type] if dataset_type else [
+        row[0] for row in db.session.query(LeaderboardEntry.dataset_type).distinct()
+    ]
+    for name in dataset_types:
+        start = time.perf_counter()
+        flagged = flag_near_clones(name)
+        click.echo(f"{name}: {flagged} near clones flagged ({time.perf_counter() - start:.2f}s)")
+
+
+@api.cli.command('export-leaderboard')
+@click.argument('dataset_type')
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='csv')
+@click.option('--private', is_flag=True, help='Include prompts, predictions, inputs and sampling data.')
+@click.option('--output', type=click.Path(dir_okay=False), help='File to write (default: stdout).')
+def export_leaderboard_command(dataset_type, export_format, private, output):
+    """Export every entry of a dataset as CSV or JSON lines."""
+    with click.open_file(output or '-', 'w') as f:
+        for chunk in export_chunks(dataset_type, export_format, private):
+            f.write(chunk)
+
+
+@api.cli.command('compress-submissions')
+@click.argument('dataset_type')
+@click.option('--train/--no-train', default=True, help='Train a new dictionary from recent submissions first.')
+def compress_submissions_command(dataset_type, train):
+    """Re-encode stored predictions, inputs and results of a dataset with its compression dictionary."""
+    if train:
+        dictionary_id = train_compression_dictionary(dataset_type)
+        click.echo(f"Trained dictionary {dictionary_id}" if dictionary_id else "No submissions to train on")
+    stats = recompress_submissions(dataset_type)
+    click.echo(f"Re-encoded {stats['rows']} submissions: {stats['bytes_before']} -> {stats['bytes_after']} bytes, "
+               f"{stats['inputs_referenced']} with inputs stored as dataset references")
+
+
+@api.cli.command('archive-leaderboard')
+@click.option('--older-than', 'older_than_days', type=int, default=RETENTION_DAYS, show_default=True,
+              help='Archive entries submitted more than this many days ago.')
+def archive_leaderboard_command(older_than_days):
+    """Move old entries (except top-N and each player's best) to gzipped JSONL archive files."""
+    archived = archive_entries(older_than_days)
+    click.echo(f"Archived {archived} leaderboard entries")
+
+
+@api.cli.command('restore-leaderboard')
+@click.argument('paths', nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def restore_leaderboard_command(paths):
+    """Restore archived entries (all archive files, or only the given ones)."""
+    restored = restore_entries(paths=list(paths) if paths else None)
+    written = rebuild_top_entries()
+    click.echo(f"Restored {restored} leaderboard entries; wrote {written} leaderboard_top rows")
@@ -27,6 +27,12 @@ class Config:
     TESTING = False
     CORS_HEADERS = 'Content-Type'
     TEMPLATES_AUTO_RELOAD = True
+    # Load datasets into memory in create_app (before gunicorn forks workers)
+    PRELOAD_DATASETS = os.getenv('PRELOAD_DATASETS', 'true').lower() == 'true'
+    # Queue leaderboard inserts and commit them in batches from a background thread
+    LEADERBOARD_WRITE_BEHIND = os.getenv('LEADERBOARD_WRITE_BEHIND', 'false').lower() == 'true'
+    # Optional directory for the write-behind journal (queued entries survive a crash)
+    LEADERBOARD_JOURNAL_DIR = os.getenv('LEADERBOARD_JOURNAL_DIR')
     
     TEMPLATE_DIR = str(BASE_DIR / 'templates')
     DATASET_CONFIG_PATH = str(BASE_DIR / 'config' / 'datasets.json')
@@ -35,6 +41,8 @@ class Config:
     def __init__(self):
         load_environment()
         self.GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+        # Bearer token for admin-only data (private fields in exports); unset disables them
+        self.ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
         self.MODEL_NAME = "llama3-70b-8192"
         self.TEMPERATURE = 0
 
@@ -0,0 +1,57 @@
+from pathlib import Path
+from typing import Dict, Tuple
+import hashlib
+import json
+import pickle
+import struct
+from src.dataset_table import DatasetTable
+
+BUNDLE_SUFFIX = '.bundle'
+BUNDLE_MAGIC = b'PGBUNDLE'
+# Bump when the normalized layout (columns, derived data) changes; old bundles are then ignored.
+# Retained dataset versions (data/versions) are bundles too: keep reading their format after a bump.
+BUNDLE_FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct('<8sHI')  # magic, format version, header length
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_bundle(path: Path, table: DatasetTable, header: Dict) -> Path:
+    """
+    Write a bundle: preamble, JSON header (source fingerprint, row count, columns)
+    and the pickled column dict.
+    """
+    header = dict(header, format_version=BUNDLE_FORMAT_VERSION,
+                  num_rows=len(table), columns=table.column_names)
+    header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        pickle.dump(table.columns, f, protocol=4)
+    tmp_path.replace(path)
+    return path
+
+
+def read_bundle_header(f) -> Dict:
+    magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+    if magic != BUNDLE_MAGIC:
+        raise ValueError("Not a dataset bundle")
+    if version != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Bundle format {version} is not supported (expected {BUNDLE_FORMAT_VERSION})")
+    return json.loads(f.read(header_length))
+
+
+def read_bundle(path: Path) -> Tuple[Dict, DatasetTable]:
+    with open(path, 'rb') as f:
+        header = read_bundle_header(f)
+        columns = pickle.load(f)
+    return header, DatasetTable(columns)
@@ -1,46 +1,239 @@
 from pathlib import Path
 import json
-from typing import Dict, List, Optional
+import os
+from typing import Dict, List, Optional, Tuple, Union
 import random
+import secrets
+import threading
+import time
+from src.jsonl_index import JsonlReader, write_jsonl
+from src.stream_sampling import reservoir_sample_json
+from src.dataset_table import DatasetTable
+from src.dataset_bundle import BUNDLE_SUFFIX, read_bundle, read_bundle_header, sha256_file, write_bundle
+
+JSONL_SUFFIX = '.jsonl'
+# Record keys used by JSONL input/target datasets when the config sets no input_field/target_field
+JSONL_INPUT_FIELD = 'input'
+JSONL_TARGET_FIELD = 'target'
+
+# Datasets whose examples are whole records rather than input/target pairs
+EXAMPLE_DATASETS = ("translation_task", "complex_transformation")
+# Keys every record of an example dataset must carry
+REQUIRED_EXAMPLE_KEYS = {
+    "translation_task": ("input", "translations"),
+    "complex_transformation": ("task_description", "evaluation_guide", "evaluation_reference", "display_reference")
+}
+
+CONFIG_CHECK_INTERVAL = 2.0  # seconds between checks of config/datasets.json for changes
+MODES = ("practice", "test")
+
+# JSON dataset files larger than this are reservoir-sampled in a streaming pass
+# instead of being parsed and cached (per-mode override: "stream_threshold_bytes")
+STREAM_THRESHOLD_BYTES = int(os.environ.get('DATASET_STREAM_THRESHOLD_BYTES', 50 * 1024 * 1024))
+
+# Compiled copy of every dataset version, named by the source's SHA-256 and never removed, so
+# stored submissions can reference examples of a version after its source file has changed
+VERSIONS_DIR = os.environ.get('DATASET_VERSIONS_DIR')
+
+def validate_config(config: Dict, data_dir: Path):
+    """Raise ValueError listing every problem found in a datasets config."""
+    if not isinstance(config, dict) or not config:
+        raise ValueError("Dataset config must be a non-empty JSON object")
+
+    errors = []
+    for dataset_type, dataset in config.items():
+        if not isinstance(dataset, dict):
+            errors.append(f"{dataset_type}: must be an object")
+            continue
+        if not dataset.get("name"):
+            errors.append(f"{dataset_type}: missing name")
+        for mode in MODES:
+            mode_config = dataset.get(mode)
+            if mode_config is None:
+                continue
+            prefix = f"{dataset_type}.{mode}"
+            file_path = mode_config.get("file_path")
+            if not isinstance(file_path, str) or not file_path:
+                errors.append(f"{prefix}: missing file_path")
+            elif not (data_dir / file_path).exists():
+                errors.append(f"{prefix}: file {file_path} not found")
+            if "stream_threshold_bytes" in mode_config and not isinstance(mode_config["stream_threshold_bytes"], int):
+                errors.append(f"{prefix}: stream_threshold_bytes must be an integer")
+            if mode_config.get("fixed_size", False):
+                if not isinstance(mode_config.get("num_examples"), int) or mode_config["num_examples"] < 1:
+                    errors.append(f"{prefix}: fixed_size requires a positive num_examples")
+            else:
+                min_examples = mode_config.get("min_examples", 10)
+                max_examples = mode_config.get("max_examples", min_examples)
+                if not isinstance(min_examples, int) or not isinstance(max_examples, int) or min_examples > max_examples:
+                    errors.append(f"{prefix}: min_examples/max_examples must be integers with min <= max")
+
+    if errors:
+        raise ValueError("Invalid dataset config: " + "; ".join(errors))
+
+def normalize_dataset(dataset_type: str, table: DatasetTable) -> DatasetTable:
+    """
+    Add the derived columns every load path (cache, bundle, JSONL, streaming) provides:
+    input/target lengths and, for word sorting, the tokenized targets.
+    """
+    if 'inputs' not in table or 'input_lengths' in table:
+        return table
+    columns = dict(table.columns)
+    columns['input_lengths'] = [len(value) for value in table['inputs']]
+    columns['target_lengths'] = [len(value) for value in table['targets']]
+    if dataset_type == "word_sorting":
+        columns['target_words'] = [value.strip().split() for value in table['targets']]
+    return DatasetTable(columns)
+
+def validate_dataset(dataset_type: str, table: DatasetTable, dataset: Dict) -> List[str]:
+    """Check every record of a parsed dataset against its schema; returns the problems found."""
+    errors = []
+    if len(table) == 0:
+        return ["dataset has no examples"]
+
+    if dataset_type in EXAMPLE_DATASETS:
+        required = REQUIRED_EXAMPLE_KEYS[dataset_type]
+        languages = dataset.get("languages", [])
+        for i, example in enumerate(table['examples']):
+            if not isinstance(example, dict):
+                errors.append(f"example {i}: must be an object")
+                continue
+            missing = [key for key in required if key not in example]
+            if missing:
+                errors.append(f"example {i}: missing {', '.join(missing)}")
+            translations = example.get("translations")
+            if dataset_type == "translation_task" and isinstance(translations, dict):
+                missing_languages = [lang for lang in languages if not isinstance(translations.get(lang), str)]
+                if missing_languages:
+                    errors.append(f"example {i}: missing translations for {', '.join(missing_languages)}")
+        return errors
+
+    for column in ('inputs', 'targets'):
+        for i, value in enumerate(table[column]):
+            if not isinstance(value, str) or not value.strip():
+                errors.append(f"{column}[{i}]: must be a non-empty string")
+    return errors
+
+def new_seed() -> int:
+    """Draw a sampling seed that fits in a 32-bit signed integer column."""
+    return secrets.randbelow(2 ** 31)
 
 class DatasetManager:
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent
         self.data_dir = self.base_dir / 'data'
         self.config_path = self.base_dir / 'config' / 'datasets.json'
+        self.versions_dir = Path(VERSIONS_DIR) if VERSIONS_DIR else self.data_dir / 'versions'
+        self._source_hashes: Dict[Tuple[str, str], Tuple[Tuple, str]] = {}
+        self._versions: Dict[Tuple[str, str, str], DatasetTable] = {}
+        self._cache: Dict[Tuple[str, str], Tuple[Tuple, Union[DatasetTable, JsonlReader]]] = {}
+        self._cache_lock = threading.Lock()
+        self._config: Dict = {}
+        self._config_stamp: Optional[Tuple[int, int]] = None
+        self._config_checked_at = time.monotonic()
+        self._config_lock = threading.Lock()
+        self.config_version = 0
+        # (config_version, config), replaced as a whole on reload
+        self._snapshot: Tuple[int, Dict] = (0, {})
         self.load_config()
         print(f"Debug - Initialized DatasetManager:")
         print(f"Debug - Base dir: {self.base_dir}")
         print(f"Debug - Data dir: {self.data_dir}")
         print(f"Debug - Config path: {self.config_path}")
 
+    @property
+    def config(self) -> Dict:
+        """The current dataset config, reloaded if config/datasets.json changed on disk."""
+        self._check_config()
+        return self._config
+
+    def config_snapshot(self) -> Tuple[int, Dict]:
+        """
+        (config_version, config) read together, so a reload on another thread
+        can't pair one version's config with another's number.
+        """
+        self._check_config()
+        return self._snapshot
+
     def load_config(self):
-        """Load dataset configurations."""
+        """
+        Load dataset configurations. A config that fails validation is rejected:
+        the previously loaded config (or an empty one at startup) stays active.
+        """
+        with self._config_lock:
+            try:
+                stamp = self._config_file_stamp()
+            except OSError as e:
+                print(f"Error loading config: {str(e)}")
+                return False
+            try:
+                with open(self.config_path) as f:
+                    new_config = json.load(f)
+                validate_config(new_config, self.data_dir)
+            except Exception as e:
+                print(f"Error loading config: {str(e)}")
+                # Don't retry until the file changes again
+                self._config_stamp = stamp
+                return False
+
+            old_config = self._config
+            with self._cache_lock:
+                # Swap in the new config and drop cached datasets whose config changed
+                self._config = new_config
+                self._config_stamp = stamp
+                self.config_version += 1
+                self._snapshot = (self.config_version, new_config)
+                for dataset_type, mode in list(self._cache):
+                    if (old_config.get(dataset_type, {}).get(mode) !=
+                            new_config.get(dataset_type, {}).get(mode)):
+                        del self._cache[(dataset_type, mode)]
+            print(f"Debug - Loaded config successfully (version {self.config_version})")
+            return True
+
+    def _config_file_stamp(self) -> Tuple[int, int]:
+        stat = self.config_path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _check_config(self):
+        """Stat the config file at most every CONFIG_CHECK_INTERVAL seconds and reload it if it changed."""
+        now = time.monotonic()
+        if now - self._config_checked_at < CONFIG_CHECK_INTERVAL:
+            return
+        self._config_checked_at = now
         try:
-            with open(self.config_path) as f:
-                self.config = json.load(f)
-                print(f"Debug - Loaded config successfully")
-        except Exception as e:
-            print(f"Error loading config: {str(e)}")
-            self.config = {}
+            stamp = self._config_file_stamp()
+        except OSError:
+            return
+        if stamp != self._config_stamp:
+            self.load_config()
 
-    def load_dataset(self, dataset_type: str, mode: str = "practice", num_examples: Optional[int] = None):
+    def load_dataset(self, dataset_type: str, mode: str = "practice", num_examples: Optional[int] = None,
+                     seed: Optional[int] = None):
         """
         Generic dataset loader that works with any dataset following the config structure.
+        Files ending in .jsonl are read through their offset index, so only the
+        sampled records are decoded.
+
+        Sampling is driven by `seed` (a fresh one is drawn when None); the seed and
+        the pool positions of the selected examples are returned as 'seed' and
+        'example_ids', so passing the same seed back reproduces the same sample.
         """
         try:
             print(f"\nDebug - Loading dataset: {dataset_type}, mode: {mode}")
             
+            # Take one config snapshot so a reload mid-request can't mix versions
+            config = self.config
+
             # Get dataset config
-            if dataset_type not in self.config:
+            if dataset_type not in config:
                 print(f"Debug - Dataset {dataset_type} not found in config")
                 raise ValueError(f"Dataset {dataset_type} not found in config")
             
-            if mode not in self.config[dataset_type]:
+            if mode not in config[dataset_type]:
                 print(f"Debug - Mode {mode} not found for dataset {dataset_type}")
                 raise ValueError(f"Mode {mode} not found for dataset {dataset_type}")
             
-            dataset_config = self.config[dataset_type][mode]
+            dataset_config = config[dataset_type][mode]
             print(f"Debug - Dataset config: {dataset_config}")
             
             # Load data file
@@ -50,86 +243,351 @@ class DatasetManager:
                 
             file_path = self.data_dir / dataset_config["file_path"]
             print(f"Debug - Attempting to load file: {file_path}")
-            print(f"Debug - File exists: {file_path.exists()}")
             
             if not file_path.exists():
                 raise FileNotFoundError(f"Dataset file not found: {file_path}")
-                
-            with open(file_path) as f:
-                raw_data = json.load(f)
-                print(f"Debug - Successfully loaded raw data")
-
-            # Handle different dataset types
-            if dataset_type == "translation_task":
-                return {
-                    'examples': raw_data['examples'],
-                    'dataset_type': 'translation_task',
-                    'dataset_info': self.config[dataset_type]
-                }
-            elif dataset_type == "complex_transformation":
-                examples = raw_data.get('examples', [])
-                if not examples:
-                    print("Debug - No examples found in complex transformation dataset")
-                    raise ValueError("No examples found in complex transformation dataset")
-
-                print(f"Debug - Found {len(examples)} examples in dataset")
-                
-                if mode == "practice":
-                    selected_examples = examples
-                else:  # test mode
-                    selected_examples = [random.choice(examples)]
-                    print(f"Debug - Selected 1 random example for test mode")
-
-                return {
-                    'examples': selected_examples,
-                    'dataset_type': 'complex_transformation',
-                    'dataset_info': self.config[dataset_type]
-                }
-            else:
-                # Handle other dataset types (word sorting, logical deduction, etc.)
-                input_field = dataset_config.get("input_field", "inputs")
-                target_field = dataset_config.get("target_field", "targets")
-                
-                # Convert data to standard format
-                if isinstance(raw_data, list):
-                    # Data is a list of examples
-                    data = {
-                        'inputs': [item[input_field] for item in raw_data],
-                        'targets': [item[target_field] for item in raw_data]
-                    }
-                else:
-                    # Data already has inputs/targets lists
-                    data = raw_data
-
-                # Validate data structure
-                if not isinstance(data, dict) or 'inputs' not in data or 'targets' not in data:
-                    print("Debug - Invalid dataset format")
-                    raise ValueError("Invalid dataset format")
-
-                # Handle number of examples
-                total_examples = len(data['inputs'])
-                if dataset_config.get("fixed_size", False):
-                    num_examples = dataset_config["num_examples"]
-                else:
-                    min_examples = dataset_config.get("min_examples", 10)
-                    max_examples = dataset_config.get("max_examples", total_examples)
-                    num_examples = min(max(num_examples or min_examples, min_examples), max_examples)
-                
-                if num_examples > total_examples:
-                    print(f"Debug - Requested {num_examples} examples but only {total_examples} available")
-                    raise ValueError(f"Requested {num_examples} examples but only {total_examples} available")
 
-                # Select examples
-                indices = random.sample(range(total_examples), num_examples)
-                print(f"Debug - Selected {num_examples} examples from {total_examples} total")
+            if seed is None:
+                seed = new_seed()
+            rng = random.Random(seed)
+
+            threshold = dataset_config.get("stream_threshold_bytes", STREAM_THRESHOLD_BYTES)
+            if file_path.suffix != JSONL_SUFFIX and file_path.stat().st_size > threshold:
+                # Too large to keep in memory: sample in one streaming pass instead of caching
+                total_examples, indices, selected = self._stream_sample(
+                    dataset_type, dataset_config, file_path, num_examples, rng)
+            else:
+                pool = self._get_cached_dataset(dataset_type, mode, file_path, dataset_config)
+                total_examples = len(pool)
+                indices = self._select_indices(dataset_config, total_examples, num_examples, rng)
+                selected = self._take(dataset_type, dataset_config, pool, indices)
+            print(f"Debug - Selected {len(indices)} examples from {total_examples} total with seed {seed}")
 
-                return {
-                    'inputs': [data['inputs'][i] for i in indices],
-                    'targets': [data['targets'][i] for i in indices],
-                    'dataset_type': dataset_type,
-                    'dataset_info': self.config[dataset_type]
-                }
+            selected.update({
+                'dataset_type': dataset_type,
+                'dataset_info': config[dataset_type],
+                'seed': seed,
+                'example_ids': indices
+            })
+            return selected
 
         except Exception as e:
             print(f"Error loading dataset {dataset_type}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def _resolve_num_examples(dataset_config: Dict, num_examples: Optional[int],
+                              total_examples: Optional[int] = None) -> int:
+        """Apply fixed_size and min/max_examples from the config to the requested count."""
+        if dataset_config.get("fixed_size", False):
+            return dataset_config["num_examples"]
+        min_examples = dataset_config.get("min_examples", 10)
+        max_examples = dataset_config.get("max_examples", total_examples)
+        num_examples = max(num_examples or min_examples, min_examples)
+        return min(num_examples, max_examples) if max_examples is not None else num_examples
+
+    @staticmethod
+    def _check_available(num_examples: int, total_examples: int):
+        if num_examples > total_examples:
+            print(f"Debug - Requested {num_examples} examples but only {total_examples} available")
+            raise ValueError(f"Requested {num_examples} examples but only {total_examples} available")
+
+    def _select_indices(self, dataset_config: Dict, total_examples: int, num_examples: Optional[int],
+                        rng: random.Random) -> List[int]:
+        """Pick which examples to use, honouring fixed_size and min/max_examples from the config."""
+        num_examples = self._resolve_num_examples(dataset_config, num_examples, total_examples)
+        self._check_available(num_examples, total_examples)
+
+        # Fixed sets that use every example keep their file order
+        if num_examples == total_examples:
+            return list(range(total_examples))
+        return rng.sample(range(total_examples), num_examples)
+
+    def _stream_sample(self, dataset_type: str, dataset_config: Dict, file_path: Path,
+                       num_examples: Optional[int], rng: random.Random) -> Tuple[int, List[int], Dict]:
+        """Reservoir-sample a large JSON dataset in a single pass with memory bounded by the sample size."""
+        num_examples = self._resolve_num_examples(dataset_config, num_examples)
+        columns = ('examples',) if dataset_type in EXAMPLE_DATASETS else ('inputs', 'targets')
+        print(f"Debug - Streaming {num_examples} examples from {file_path}")
+        total_examples, positions, sampled = reservoir_sample_json(file_path, num_examples, rng, columns)
+        self._check_available(num_examples, total_examples)
+
+        if 'records' in sampled:
+            records = sampled['records']
+            if dataset_type in EXAMPLE_DATASETS:
+                return total_examples, positions, {'examples': records}
+            table = DatasetTable.from_records(records, {
+                'inputs': dataset_config.get("input_field", "inputs"),
+                'targets': dataset_config.get("target_field", "targets")
+            })
+        else:
+            table = DatasetTable({column: sampled[column] for column in columns})
+        return total_examples, positions, normalize_dataset(dataset_type, table).to_dict()
+
+    def _take(self, dataset_type: str, dataset_config: Dict, pool, indices: List[int]) -> Dict:
+        """Materialize the selected examples from an in-memory table or an indexed JSONL file."""
+        if isinstance(pool, JsonlReader):
+            records = pool.read(indices)
+            if dataset_type in EXAMPLE_DATASETS:
+                return {'examples': records}
+            return normalize_dataset(dataset_type, DatasetTable.from_records(records, {
+                'inputs': dataset_config.get("input_field", JSONL_INPUT_FIELD),
+                'targets': dataset_config.get("target_field", JSONL_TARGET_FIELD)
+            })).to_dict()
+
+        return pool.select(indices).to_dict()
+
+    def _get_cached_dataset(self, dataset_type: str, mode: str, file_path: Path, dataset_config: Dict):
+        """
+        Return the parsed, normalized dataset for (dataset_type, mode), re-reading
+        the file only when its mtime or size changes. A compiled bundle that
+        matches the file and config is loaded instead of parsing the JSON. JSONL
+        files are not parsed up front; a JsonlReader over their offset index is
+        cached instead.
+        """
+        stat = file_path.stat()
+        # The entry is also tied to the dataset's config so field/format changes take effect on reload
+        stamp = (str(file_path), stat.st_mtime_ns, stat.st_size, json.dumps(dataset_config, sort_keys=True))
+        key = (dataset_type, mode)
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+
+            if file_path.suffix == JSONL_SUFFIX:
+                data = JsonlReader(file_path)
+            else:
+                data = self._load_bundle(dataset_type, mode, file_path, dataset_config)
+                if data is None:
+                    data = normalize_dataset(dataset_type, self._read_dataset(dataset_type, file_path, dataset_config))
+            self._cache[key] = (stamp, data)
+            print(f"Debug - Cached dataset {dataset_type} {mode} from {file_path}")
+            return data
+
+    def bundle_path(self, dataset_type: str, mode: str) -> Path:
+        return self.data_dir / 'compiled' / f"{dataset_type}.{mode}{BUNDLE_SUFFIX}"
+
+    @staticmethod
+    def _bundle_header(file_path: Path, dataset_config: Dict) -> Dict:
+        """The part of a bundle header that must match the current source file and config."""
+        stat = file_path.stat()
+        return {
+            'source_file': file_path.name,
+            'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'config': json.dumps(dataset_config, sort_keys=True)
+        }
+
+    def _load_bundle(self, dataset_type: str, mode: str, file_path: Path,
+                     dataset_config: Dict) -> Optional[DatasetTable]:
+        """
+        Load the compiled bundle for (dataset_type, mode) if it is current, else None.
+
+        A bundle is current when the source's (size, mtime) stamp and the config
+        match its header, the same check the dataset cache uses. Only when the
+        mtime alone differs (e.g. the files were copied by a deploy) is the source
+        hashed and compared with the SHA-256 recorded at compile time.
+        """
+        path = self.bundle_path(dataset_type, mode)
+        if not path.exists():
+            return None
+        try:
+            header, table = read_bundle(path)
+        except Exception as e:
+            print(f"Debug - Ignoring unreadable bundle {path}: {str(e)}")
+            return None
+        expected = self._bundle_header(file_path, dataset_config)
+        mtime = expected.pop('source_mtime_ns')
+        if any(header.get(name) != value for name, value in expected.items()) or (
+                header.get('source_mtime_ns') != mtime and header.get('source_sha256') != sha256_file(file_path)):
+            print(f"Debug - Bundle {path} is stale, parsing {file_path}")
+            return None
+        print(f"Debug - Loaded bundle {path}")
+        return table
+
+    def verify_bundle(self, dataset_type: str, mode: str) -> bool:
+        """Whether the bundle for (dataset_type, mode) exists and matches its source's SHA-256 and config."""
+        dataset_config = self.config[dataset_type][mode]
+        file_path = self.data_dir / dataset_config["file_path"]
+        path = self.bundle_path(dataset_type, mode)
+        if not path.exists():
+            return False
+        with open(path, 'rb') as f:
+            header = read_bundle_header(f)
+        return (header.get('source_sha256') == sha256_file(file_path)
+                and header.get('config') == json.dumps(dataset_config, sort_keys=True))
+
+    def compile_dataset(self, dataset_type: str, mode: str) -> Path:
+        """
+        Parse, validate and normalize the JSON file configured for (dataset_type, mode)
+        and write it as a bundle the manager loads directly. Raises ValueError
+        listing every schema problem found.
+        """
+        dataset = self.config[dataset_type]
+        dataset_config = dataset[mode]
+        file_path = self.data_dir / dataset_config["file_path"]
+        if file_path.suffix == JSONL_SUFFIX:
+            raise ValueError(f"{file_path} is JSONL and is read through its index; nothing to compile")
+
+        table = self._read_dataset(dataset_type, file_path, dataset_config)
+        errors = validate_dataset(dataset_type, table, dataset)
+        if errors:
+            raise ValueError(f"{dataset_type}.{mode}: " + "; ".join(errors))
+
+        table = normalize_dataset(dataset_type, table)
+        header = dict(self._bundle_header(file_path, dataset_config), source_sha256=sha256_file(file_path),
+                      dataset_type=dataset_type, mode=mode)
+        version_path = self.version_path(dataset_type, mode, header['source_sha256'])
+        if not version_path.exists():
+            write_bundle(version_path, table, header)
+        return write_bundle(self.bundle_path(dataset_type, mode), table, header)
+
+    def _read_dataset(self, dataset_type: str, file_path: Path, dataset_config: Dict) -> DatasetTable:
+        """Parse a dataset file into a table with an 'examples' column or 'inputs'/'targets' columns."""
+        with open(file_path) as f:
+            raw_data = json.load(f)
+
+        if dataset_type == "translation_task":
+            return DatasetTable({'examples': raw_data['examples']})
+
+        if dataset_type == "complex_transformation":
+            examples = raw_data.get('examples', [])
+            if not examples:
+                print("Debug - No examples found in complex transformation dataset")
+                raise ValueError("No examples found in complex transformation dataset")
+            return DatasetTable({'examples': examples})
+
+        # Convert data to standard format
+        if isinstance(raw_data, list):
+            # Data is a list of examples
+            return DatasetTable.from_records(raw_data, {
+                'inputs': dataset_config.get("input_field", "inputs"),
+                'targets': dataset_config.get("target_field", "targets")
+            })
+
+        # Data already has inputs/targets lists
+        if not isinstance(raw_data, dict) or 'inputs' not in raw_data or 'targets' not in raw_data:
+            print("Debug - Invalid dataset format")
+            raise ValueError("Invalid dataset format")
+
+        return DatasetTable({'inputs': raw_data['inputs'], 'targets': raw_data['targets']})
+
+    def warm(self) -> int:
+        """
+        Load every configured dataset into the cache (skipping files above the
+        streaming threshold). Returns the number of datasets cached.
+        """
+        config = self.config
+        cached = 0
+        for dataset_type, dataset in config.items():
+            for mode in MODES:
+                dataset_config = dataset.get(mode)
+                if not dataset_config:
+                    continue
+                file_path = self.data_dir / dataset_config["file_path"]
+                threshold = dataset_config.get("stream_threshold_bytes", STREAM_THRESHOLD_BYTES)
+                if file_path.suffix != JSONL_SUFFIX and file_path.stat().st_size > threshold:
+                    continue
+                self._get_cached_dataset(dataset_type, mode, file_path, dataset_config)
+                cached += 1
+        return cached
+
+    def version_path(self, dataset_type: str, mode: str, version: str) -> Path:
+        return self.versions_dir / f"{dataset_type}.{mode}.{version}{BUNDLE_SUFFIX}"
+
+    def source_version(self, dataset_type: str, mode: str) -> Optional[str]:
+        """SHA-256 of the source file of (dataset_type, mode), rehashed only when its size or mtime changes."""
+        dataset_config = self.config.get(dataset_type, {}).get(mode)
+        if not dataset_config:
+            return None
+        file_path = self.data_dir / dataset_config["file_path"]
+        stat = file_path.stat()
+        stamp = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._source_hashes.get((dataset_type, mode))
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, sha256_file(file_path))
+            self._source_hashes[(dataset_type, mode)] = cached
+        return cached[1]
+
+    def dataset_version(self, dataset_type: str, mode: str) -> Optional[str]:
+        """
+        The current version of (dataset_type, mode), i.e. its source's SHA-256,
+        if `compile-datasets` has retained a compiled copy of it; else None.
+        Streamed datasets have no version, as they aren't held in memory.
+        """
+        dataset_config = self.config.get(dataset_type, {}).get(mode)
+        if not dataset_config:
+            return None
+        threshold = dataset_config.get("stream_threshold_bytes", STREAM_THRESHOLD_BYTES)
+        if (self.data_dir / dataset_config["file_path"]).stat().st_size > threshold:
+            return None
+        version = self.source_version(dataset_type, mode)
+        if version is None or not self.version_path(dataset_type, mode, version).exists():
+            return None
+        return version
+
+    def _version_table(self, dataset_type: str, mode: str, version: str) -> Optional[DatasetTable]:
+        key = (dataset_type, mode, version)
+        with self._cache_lock:
+            if key not in self._versions:
+                path = self.version_path(dataset_type, mode, version)
+                if not path.exists():
+                    return None
+                self._versions[key] = read_bundle(path)[1]
+                print(f"Debug - Loaded dataset version {path}")
+            return self._versions[key]
+
+    def resolve_inputs(self, dataset_type: str, mode: str, example_ids: List[int],
+                       version: Optional[str] = None) -> Optional[List]:
+        """
+        The model inputs of the given examples, as test_prompt sends them, so
+        stored submissions can reference examples instead of copying them.
+        With a version they are read from that retained version, otherwise from
+        the current dataset. Returns None for datasets that aren't held in
+        memory (streamed files), whose inputs aren't plain strings, or whose
+        version isn't retained.
+        """
+        dataset_config = self.config.get(dataset_type, {}).get(mode)
+        if not dataset_config or dataset_type == "complex_transformation":
+            return None
+        if version is not None:
+            pool = self._version_table(dataset_type, mode, version)
+            if pool is None:
+                return None
+        else:
+            file_path = self.data_dir / dataset_config["file_path"]
+            threshold = dataset_config.get("stream_threshold_bytes", STREAM_THRESHOLD_BYTES)
+            if file_path.suffix != JSONL_SUFFIX and file_path.stat().st_size > threshold:
+                return None
+            pool = self._get_cached_dataset(dataset_type, mode, file_path, dataset_config)
+
+        if not all(0 <= i < len(pool) for i in example_ids):
+            return None
+        selected = self._take(dataset_type, dataset_config, pool, example_ids)
+        if dataset_type == "translation_task":
+            return [example['input'] for example in selected['examples']]
+        return selected['inputs']
+
+    def convert_to_jsonl(self, dataset_type: str, mode: str) -> Path:
+        """
+        Convert the JSON file configured for (dataset_type, mode) into an indexed
+        JSONL file next to it. Point the config's file_path at the result to use it.
+        """
+        dataset_config = self.config[dataset_type][mode]
+        file_path = self.data_dir / dataset_config["file_path"]
+        if file_path.suffix == JSONL_SUFFIX:
+            raise ValueError(f"{file_path} is already JSONL")
+
+        data = self._read_dataset(dataset_type, file_path, dataset_config)
+        if dataset_type in EXAMPLE_DATASETS:
+            records = data['examples']
+        else:
+            input_field = dataset_config.get("input_field", JSONL_INPUT_FIELD)
+            target_field = dataset_config.get("target_field", JSONL_TARGET_FIELD)
+            records = (
+                {input_field: inp, target_field: target}
+                for inp, target in zip(data['inputs'], data['targets'])
+            )
+
+        return write_jsonl(records, file_path.with_suffix(JSONL_SUFFIX))
@@ -0,0 +1,65 @@
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+
+class DatasetTable:
+    """
+    Small columnar dataset: a fixed set of equally long, named columns.
+
+    Stands in for the parts of HuggingFace's Dataset this app uses
+    (from_dict, column access, select) without its import cost.
+    """
+
+    __slots__ = ('columns', 'num_rows')
+
+    def __init__(self, columns: Dict[str, List[Any]]):
+        lengths = {name: len(values) for name, values in columns.items()}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"Columns have different lengths: {lengths}")
+        self.columns = {name: list(values) for name, values in columns.items()}
+        self.num_rows = next(iter(lengths.values()), 0)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Sequence[Any]]) -> 'DatasetTable':
+        return cls(dict(data))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], fields: Dict[str, str]) -> 'DatasetTable':
+        """Build columns from row dicts; `fields` maps column name -> record key."""
+        columns: Dict[str, List[Any]] = {name: [] for name in fields}
+        for record in records:
+            for name, key in fields.items():
+                columns[name].append(record[key])
+        return cls(columns)
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, key):
+        """Column list by name, or a row dict by integer position."""
+        if isinstance(key, str):
+            return self.columns[key]
+        return {name: values[key] for name, values in self.columns.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self.num_rows):
+            yield self[i]
+
+    def select(self, indices: Sequence[int]) -> 'DatasetTable':
+        """New table holding the given rows, in the given order."""
+        table = DatasetTable.__new__(DatasetTable)
+        table.columns = {name: [values[i] for i in indices] for name, values in self.columns.items()}
+        table.num_rows = len(indices)
+        return table
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        return {name: list(values) for name, values in self.columns.items()}
+
+    def __repr__(self) -> str:
+        return f"DatasetTable(columns={self.column_names}, num_rows={self.num_rows})"
@@ -0,0 +1,106 @@
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+import json
+import mmap
+import struct
+
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'JSONLIDX'
+_HEADER = struct.Struct('<8sQQ')  # magic, data file size, record count
+
+
+def index_path_for(data_path: Path) -> Path:
+    return data_path.with_name(data_path.name + INDEX_SUFFIX)
+
+
+def build_index(data_path: Path) -> Path:
+    """
+    Scan a JSONL file once and write a sidecar index of record start offsets.
+    Blank lines are skipped. The index holds count + 1 offsets so record i is
+    the byte range offsets[i]:offsets[i + 1].
+    """
+    offsets = array('Q')
+    position = 0
+    with open(data_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                offsets.append(position)
+            position += len(line)
+    offsets.append(position)
+
+    if offsets.itemsize != 8:
+        raise RuntimeError("array('Q') is not 64-bit on this platform")
+
+    index_path = index_path_for(data_path)
+    tmp_path = index_path.with_name(index_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, position, len(offsets) - 1))
+        offsets.tofile(f)
+    tmp_path.replace(index_path)
+    return index_path
+
+
+def load_index(data_path: Path) -> array:
+    """Load the offset index for data_path, rebuilding it if missing or stale."""
+    index_path = index_path_for(data_path)
+    data_stat = data_path.stat()
+
+    for attempt in range(2):
+        if index_path.exists() and index_path.stat().st_mtime_ns >= data_stat.st_mtime_ns:
+            with open(index_path, 'rb') as f:
+                magic, data_size, count = _HEADER.unpack(f.read(_HEADER.size))
+                if magic == INDEX_MAGIC and data_size == data_stat.st_size:
+                    offsets = array('Q')
+                    offsets.fromfile(f, count + 1)
+                    return offsets
+        if attempt == 0:
+            print(f"Debug - Building JSONL index for {data_path}")
+            build_index(data_path)
+
+    raise ValueError(f"Could not build a valid index for {data_path}")
+
+
+class JsonlReader:
+    """Random access to the records of an indexed JSONL file via mmap."""
+
+    def __init__(self, data_path: Path):
+        self.data_path = data_path
+        self.offsets = load_index(data_path)
+        self._file = open(data_path, 'rb')
+        size = self.offsets[-1]
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def read(self, indices: Sequence[int]) -> List[Dict]:
+        """Decode only the records at the given positions, in the given order."""
+        records = []
+        for i in indices:
+            start, end = self.offsets[i], self.offsets[i + 1]
+            records.append(json.loads(self._map[start:end]))
+        return records
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def write_jsonl(records: Iterable[Dict], data_path: Path) -> Path:
+    """Write records as JSONL and build the sidecar index."""
+    tmp_path = data_path.with_name(data_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+    tmp_path.replace(data_path)
+    build_index(data_path)
+    return data_path
@@ -0,0 +1,594 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import base64
+import binascii
+import hashlib
+import json
+import os
+from sqlalchemy.exc import OperationalError
+from src.models import db, LeaderboardEntry, LeaderboardTop, SubmissionDetails
+from src.leaderboard_cache import LeaderboardCache
+from src.prompt_index import MinHashLSH, PromptIndex, signature
+from src.write_behind import PartialFlushError, WriteBehindQueue, replay_journals
+
+IS_PRODUCTION = os.environ.get('GAE_ENV', '').startswith('standard')
+
+# Entries kept per board in leaderboard_top, and served by the cached leaderboard;
+# serialized top entries per (dataset_type, language, environment) are shared by all workers
+LEADERBOARD_SIZE = 20
+leaderboard_cache = LeaderboardCache()
+
+# Pages of the filterable leaderboard API
+MAX_PAGE_SIZE = 100
+# Columns a client may request with ?fields= (everything to_dict exposes publicly)
+PUBLIC_FIELDS = ('name', 'score', 'prompt_length', 'timestamp', 'accuracy', 'word_accuracy', 'efficiency',
+                 'similarity', 'length_penalty_avg', 'prompt_efficiency', 'base_accuracy',
+                 'semantic_similarity', 'language_quality', 'target_language')
+
+# Entries shown on each side of a rank lookup
+RANK_NEIGHBOURS = 2
+MAX_RANK_NEIGHBOURS = 10
+
+# Near-duplicate prompts (estimated Jaccard similarity of character shingles):
+# shown to submitters above SIMILAR_THRESHOLD, and an entry is flagged as a
+# near clone of an earlier entry by someone else above NEAR_CLONE_THRESHOLD
+SIMILAR_THRESHOLD = 0.7
+NEAR_CLONE_THRESHOLD = 0.9
+SIMILAR_LIMIT = 5
+
+# Batched inserts (LEADERBOARD_WRITE_BEHIND); None means every entry commits inline
+_write_behind: Optional[WriteBehindQueue] = None
+
+
+def leaderboard_key(dataset_type: str, target_language: str = '') -> str:
+    board = f"{dataset_type}.{target_language}" if target_language else dataset_type
+    return f"{board}.{'production' if IS_PRODUCTION else 'development'}"
+
+
+def top_entries(dataset_type: str, target_language: str = '') -> Callable[[], List[Dict]]:
+    """Builder for the cached leaderboard payload of a board ('' = all languages)"""
+    def build():
+        rows = LeaderboardTop.query.filter_by(
+            dataset_type=dataset_type,
+            is_production=IS_PRODUCTION,
+            target_language=target_language
+        ).order_by(
+            LeaderboardTop.score.desc(),
+            LeaderboardTop.entry_id.desc()
+        ).limit(LEADERBOARD_SIZE).all()
+        return [row.entry.to_dict() for row in rows]
+    return build
+
+
+def entry_boards(entry: LeaderboardEntry) -> List[str]:
+    """Boards (target languages) an entry competes on: all languages, plus its own language"""
+    return [''] + ([entry.target_language] if entry.target_language else [])
+
+
+def update_top_entries(entry: LeaderboardEntry):
+    """
+    Keep leaderboard_top current for a flushed entry, in the caller's transaction:
+    insert it into each board it beats the Nth score of and trim the board back
+    to LEADERBOARD_SIZE rows (which also repairs overflow from concurrent inserts).
+    """
+    for target_language in entry_boards(entry):
+        rows = LeaderboardTop.query.filter_by(
+            dataset_type=entry.dataset_type,
+            is_production=entry.is_production,
+            target_language=target_language
+        ).order_by(LeaderboardTop.score.desc(), LeaderboardTop.entry_id.desc()).all()
+
+        if len(rows) >= LEADERBOARD_SIZE:
+            nth = rows[LEADERBOARD_SIZE - 1]
+            if (entry.score, entry.id) <= (nth.score, nth.entry_id):
+                continue
+        db.session.add(LeaderboardTop(
+            dataset_type=entry.dataset_type,
+            is_production=entry.is_production,
+            target_language=target_language,
+            entry_id=entry.id,
+            score=entry.score
+        ))
+        for row in rows[LEADERBOARD_SIZE - 1:]:
+            db.session.delete(row)
+
+
+def rebuild_top_entries() -> int:
+    """Recompute leaderboard_top from leaderboard_entry. Returns the number of rows written."""
+    LeaderboardTop.query.delete()
+    boards = db.session.query(LeaderboardEntry.dataset_type, LeaderboardEntry.is_production).distinct().all()
+    language_boards = db.session.query(
+        LeaderboardEntry.dataset_type, LeaderboardEntry.is_production, LeaderboardEntry.target_language
+    ).filter(LeaderboardEntry.target_language.isnot(None), LeaderboardEntry.target_language != '').distinct().all()
+
+    written = 0
+    for dataset_type, is_production, target_language in [(*board, '') for board in boards] + language_boards:
+        query = LeaderboardEntry.query.filter_by(dataset_type=dataset_type, is_production=is_production)
+        if target_language:
+            query = query.filter_by(target_language=target_language)
+        best = query.with_entities(LeaderboardEntry.id, LeaderboardEntry.score).order_by(
+            LeaderboardEntry.score.desc(), LeaderboardEntry.id.desc()
+        ).limit(LEADERBOARD_SIZE).all()
+        db.session.add_all([
+            LeaderboardTop(dataset_type=dataset_type, is_production=is_production,
+                           target_language=target_language, entry_id=entry_id, score=score)
+            for entry_id, score in best
+        ])
+        written += len(best)
+    db.session.commit()
+    return written
+
+
+def refresh_cached_boards(dataset_type: str, target_languages):
+    # Write-through so every worker serves the new standings right away
+    for target_language in target_languages:
+        try:
+            leaderboard_cache.refresh(leaderboard_key(dataset_type, target_language),
+                                      top_entries(dataset_type, target_language))
+        except Exception as e:
+            print(f"Error refreshing leaderboard cache: {str(e)}")
+
+
+def merge_pending(entries: List[Dict], pending: List[Dict]) -> List[Dict]:
+    """Fold not-yet-committed entries into a top-N list, skipping ones already in it"""
+    seen = {(entry['name'], entry['score'], entry['timestamp']) for entry in entries}
+    merged = entries + [entry for entry in pending
+                        if (entry['name'], entry['score'], entry['timestamp']) not in seen]
+    merged.sort(key=lambda entry: entry['score'], reverse=True)
+    return merged[:LEADERBOARD_SIZE]
+
+
+def pending_entries(dataset_type: str, target_language: str = '') -> List[Dict]:
+    if _write_behind is None:
+        return []
+    return [item['entry'] for item in _write_behind.pending()
+            if item['dataset_type'] == dataset_type
+            and (not target_language or item['entry'].get('target_language') == target_language)]
+
+
+def leaderboard_payload(dataset_type: str, target_language: str = '') -> bytes:
+    """Serialized top entries, including this worker's submissions still waiting in the write-behind queue"""
+    body = leaderboard_cache.get(leaderboard_key(dataset_type, target_language),
+                                 top_entries(dataset_type, target_language))
+    pending = pending_entries(dataset_type, target_language)
+    if pending:
+        return json.dumps(merge_pending(json.loads(body), pending)).encode('utf-8')
+    return body
+
+
+def encode_cursor(score: float, entry_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, entry_id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(score), int(entry_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in PUBLIC_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+def query_leaderboard(dataset_type: str, limit: int = LEADERBOARD_SIZE, cursor: Optional[str] = None,
+                      target_language: Optional[str] = None, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None, name: Optional[str] = None,
+                      fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of a leaderboard, best score first, with optional filters.
+
+    Pages are keyset-paginated on (score, id): the cursor encodes the last row
+    returned and the next page starts strictly after it, so deep pages cost the
+    same as the first. Returns (entries, cursor for the next page or None).
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    query = LeaderboardEntry.query.filter_by(dataset_type=dataset_type, is_production=IS_PRODUCTION)
+    if target_language:
+        query = query.filter(LeaderboardEntry.target_language == target_language)
+    if name:
+        query = query.filter(LeaderboardEntry.name == name)
+    if since:
+        query = query.filter(LeaderboardEntry.timestamp >= since)
+    if until:
+        query = query.filter(LeaderboardEntry.timestamp < until)
+    if cursor:
+        last_score, last_id = decode_cursor(cursor)
+        query = query.filter(db.or_(
+            LeaderboardEntry.score < last_score,
+            db.and_(LeaderboardEntry.score == last_score, LeaderboardEntry.id < last_id)
+        ))
+    query = query.order_by(LeaderboardEntry.score.desc(), LeaderboardEntry.id.desc()).limit(limit + 1)
+
+    if fields:
+        # Only read the requested columns (plus the cursor key)
+        columns = [getattr(LeaderboardEntry, field) for field in fields]
+        rows = query.with_entities(LeaderboardEntry.id, LeaderboardEntry.score, *columns).all()
+        entries = [
+            {field: value.isoformat() if isinstance(value, datetime) else value
+             for field, value in zip(fields, row[2:])}
+            for row in rows[:limit]
+        ]
+    else:
+        rows = query.all()
+        entries = [row.to_dict() for row in rows[:limit]]
+
+    next_cursor = encode_cursor(rows[limit - 1].score, rows[limit - 1].id) if len(rows) > limit else None
+    return entries, next_cursor
+
+
+def rank_entry(dataset_type: str, score: float, entry_id: Optional[int] = None,
+               target_language: Optional[str] = None, neighbours: int = RANK_NEIGHBOURS) -> Dict:
+    """
+    Position of a score on a board, with the entries just above and below it.
+
+    Ranks follow the board order (score, then id, descending). With entry_id
+    this is the rank of that stored entry; without it, of a new submission,
+    which ranks above the entries it ties. Counts are range scans of the
+    board's score index and the neighbours are keyset reads from the score's
+    position, so nothing is sorted and only the neighbours are fetched.
+    """
+    if not 0 <= neighbours <= MAX_RANK_NEIGHBOURS:
+        raise ValueError(f"neighbours must be between 0 and {MAX_RANK_NEIGHBOURS}")
+
+    board = LeaderboardEntry.query.filter_by(dataset_type=dataset_type, is_production=IS_PRODUCTION)
+    if target_language:
+        board = board.filter(LeaderboardEntry.target_language == target_language)
+    if entry_id is None:
+        ahead = LeaderboardEntry.score > score
+        behind = LeaderboardEntry.score <= score
+    else:
+        ahead = db.or_(LeaderboardEntry.score > score,
+                       db.and_(LeaderboardEntry.score == score, LeaderboardEntry.id > entry_id))
+        behind = db.or_(LeaderboardEntry.score < score,
+                        db.and_(LeaderboardEntry.score == score, LeaderboardEntry.id < entry_id))
+
+    rank = board.filter(ahead).with_entities(db.func.count()).scalar() + 1
+    total = board.with_entities(db.func.count()).scalar() + (1 if entry_id is None else 0)
+
+    above = board.filter(ahead).order_by(
+        LeaderboardEntry.score.asc(), LeaderboardEntry.id.asc()
+    ).limit(neighbours).all()[::-1] if neighbours else []
+    below = board.filter(behind).order_by(
+        LeaderboardEntry.score.desc(), LeaderboardEntry.id.desc()
+    ).limit(neighbours).all() if neighbours else []
+
+    return {
+        'rank': rank,
+        'total': total,
+        'score': score,
+        'above': [dict(entry.to_dict(), rank=rank - len(above) + i) for i, entry in enumerate(above)],
+        'below': [dict(entry.to_dict(), rank=rank + 1 + i) for i, entry in enumerate(below)],
+    }
+
+
+def normalize_prompt(prompt: str) -> str:
+    return ' '.join(prompt.split())
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+
+
+def find_cached_result(dataset_type: str, system_prompt: str, seed: int, example_ids: List[int],
+                       target_language: Optional[str], evaluation: Dict) -> Optional[LeaderboardEntry]:
+    """
+    The latest entry that evaluated exactly this prompt on exactly this sample
+    with the same model settings, so its stored result can be returned instead
+    of calling the model again. The evaluation includes a fingerprint of the
+    sample's inputs and expected outputs, so results don't outlive dataset edits. The indexed prompt hash narrows the candidates;
+    the prompt itself is compared exactly since length feeds the efficiency score.
+    """
+    candidates = LeaderboardEntry.query.filter_by(
+        dataset_type=dataset_type,
+        prompt_hash=prompt_hash(system_prompt),
+        is_production=IS_PRODUCTION,
+        sample_seed=seed,
+        target_language=target_language,
+        # Entries that reused a result point at it rather than storing one
+        reused_from=None
+    ).order_by(LeaderboardEntry.id.desc()).limit(5).all()
+
+    for entry in candidates:
+        result = entry.result
+        if (result and result.get('evaluation') == evaluation
+                and entry.system_prompt == system_prompt and entry.example_ids == example_ids):
+            return entry
+    return None
+
+
+def _prompt_rows(dataset_type: str, after_id: int):
+    return db.session.query(
+        LeaderboardEntry.id, LeaderboardEntry.name, SubmissionDetails.system_prompt
+    ).join(SubmissionDetails, SubmissionDetails.entry_id == LeaderboardEntry.id).filter(
+        LeaderboardEntry.dataset_type == dataset_type,
+        LeaderboardEntry.is_production == IS_PRODUCTION,
+        LeaderboardEntry.id > after_id,
+        SubmissionDetails.system_prompt.isnot(None)
+    ).order_by(LeaderboardEntry.id).yield_per(1000)
+
+
+prompt_index = PromptIndex(_prompt_rows)
+
+
+def similar_entries(dataset_type: str, system_prompt: str, limit: int = SIMILAR_LIMIT) -> List[Dict]:
+    """Public data of the previous submissions closest to a prompt, with their estimated similarity"""
+    try:
+        matches = prompt_index.similar(dataset_type, system_prompt, SIMILAR_THRESHOLD, limit)
+        if not matches:
+            return []
+        entries = {entry.id: entry for entry in
+                   LeaderboardEntry.query.filter(LeaderboardEntry.id.in_([match[0] for match in matches]))}
+    except Exception as e:
+        print(f"Error looking up similar prompts: {str(e)}")
+        return []
+    return [dict(entries[entry_id].to_dict(), similarity=round(similarity, 3))
+            for entry_id, _, similarity in matches if entry_id in entries]
+
+
+def _near_clone(matches: List[Tuple[int, str, float]], name: str) -> Optional[int]:
+    # Credit goes to the earliest match; resubmitting your own prompt isn't cloning
+    if not matches:
+        return None
+    entry_id, original_name, _ = min(matches)
+    return entry_id if original_name != name else None
+
+
+def find_near_clone(entry: LeaderboardEntry) -> Optional[int]:
+    """
+    Id of the earliest previous entry, by someone else, whose prompt this entry's
+    prompt nearly copies. Runs inside the insert transaction, so it only reads
+    the index as already loaded and never syncs it from the database; entries
+    committed since the last sync are caught by `flask api flag-near-clones`.
+    """
+    if not entry.system_prompt:
+        return None
+    matches = prompt_index.similar(entry.dataset_type, entry.system_prompt, NEAR_CLONE_THRESHOLD,
+                                   SIMILAR_LIMIT, sync=False)
+    return _near_clone(matches, entry.name)
+
+
+def warm_prompt_index(dataset_types: List[str]) -> int:
+    """Load every dataset's near-duplicate index at startup. Returns the number of prompts indexed."""
+    indexed = 0
+    for dataset_type in dataset_types:
+        try:
+            indexed += len(prompt_index.sync(dataset_type).lsh)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error indexing prompts of {dataset_type}: {str(e)}")
+    print(f"Debug - Indexed {indexed} prompts for near-duplicate lookups")
+    return indexed
+
+
+def index_entries(entries: List[LeaderboardEntry]):
+    for entry in entries:
+        if entry.id is not None:
+            prompt_index.add(entry.dataset_type, entry.id, entry.name, entry.system_prompt)
+
+
+def flag_near_clones(dataset_type: str) -> int:
+    """
+    Recompute near_clone_of for a dataset by replaying its history in id order
+    through a fresh index. Returns the number of entries flagged.
+    """
+    index = MinHashLSH()
+    updates = []
+    for entry_id, name, prompt in _prompt_rows(dataset_type, 0):
+        sig = signature(prompt)
+        if sig is None:
+            continue
+        near_clone_of = _near_clone(index.query(sig, NEAR_CLONE_THRESHOLD, SIMILAR_LIMIT), name)
+        updates.append({'id': entry_id, 'near_clone_of': near_clone_of})
+        index.add(entry_id, name, sig)
+
+    db.session.bulk_update_mappings(LeaderboardEntry, updates)
+    db.session.commit()
+    prompt_index.reset(dataset_type)
+
+    target_languages = [row[0] for row in db.session.query(LeaderboardEntry.target_language).filter(
+        LeaderboardEntry.dataset_type == dataset_type,
+        LeaderboardEntry.target_language.isnot(None),
+        LeaderboardEntry.target_language != ''
+    ).distinct()]
+    refresh_cached_boards(dataset_type, [''] + target_languages)
+    return sum(1 for update in updates if update['near_clone_of'] is not None)
+
+
+def build_entry(dataset_type: str, data: Dict[str, Any]) -> LeaderboardEntry:
+    """Map a submission (metrics dict plus prompt, predictions and sample info) onto a new entry"""
+    metrics = data['metrics']
+
+    new_entry = LeaderboardEntry(
+        dataset_type=dataset_type,
+        name=data.get('name', 'Anonymous'),
+        prompt_length=metrics.get('prompt_length_chars', metrics.get('prompt_length', 0)),
+        is_production=IS_PRODUCTION,  # Keep this to differentiate environments
+        system_prompt=data.get('system_prompt'),
+        sample_seed=data.get('sample_seed'),
+        example_ids=data.get('example_ids'),
+        reused_from=data.get('reused_from')
+    )
+    # Payloads are compressed with the dataset's dictionary, so set them once dataset_type is
+    new_entry.raw_predictions = data.get('raw_predictions')
+    new_entry.result = data.get('result')
+    new_entry.store_inputs(data.get('inputs_used'), data.get('example_ids'))
+    if data.get('system_prompt'):
+        new_entry.prompt_hash = prompt_hash(data['system_prompt'])
+    if data.get('submitted_at'):
+        new_entry.timestamp = datetime.fromisoformat(data['submitted_at'])
+
+    if dataset_type == "word_sorting":
+        efficiency = float(metrics.get('efficiency_modifier', 0)) * 100
+        new_entry.score = float(metrics.get('combined_score', 0))
+        new_entry.accuracy = float(metrics.get('accuracy', 0))
+        new_entry.word_accuracy = float(metrics.get('word_accuracy', 0))
+        new_entry.efficiency = efficiency
+
+    elif dataset_type == "text_summarization":
+        new_entry.score = float(metrics.get('final_score', 0))
+        new_entry.similarity = float(metrics.get('similarity', 0))
+        new_entry.length_penalty_avg = float(metrics.get('length_penalty_avg', 0))
+        new_entry.prompt_efficiency = float(metrics.get('prompt_efficiency', 0))
+
+    elif dataset_type == "causal_judgement":
+        new_entry.score = float(metrics.get('final_score', 0))
+        new_entry.accuracy = float(metrics.get('accuracy', 0))
+        new_entry.base_accuracy = float(metrics.get('base_accuracy', 0))
+        new_entry.efficiency = float(metrics.get('efficiency', 0))
+
+    elif dataset_type == "translation_task":
+        new_entry.score = float(metrics.get('final_score', 0))
+        new_entry.semantic_similarity = float(metrics.get('semantic_similarity', 0))
+        new_entry.language_quality = float(metrics.get('language_quality', 0))
+        new_entry.efficiency = float(metrics.get('efficiency', 0))
+        new_entry.target_language = data.get('target_language', '')
+
+    return new_entry
+
+
+def record_entry(dataset_type: str, data: Dict[str, Any]) -> LeaderboardEntry:
+    """
+    Save a submission to the leaderboard and refresh the cached standings.
+    Used by the leaderboard POST route and directly by test_prompt, so results
+    computed in-process never go through a JSON round trip.
+    """
+    try:
+        new_entry = build_entry(dataset_type, data)
+        add_entry(new_entry)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    print(f"Added entry ID: {new_entry.id} for {dataset_type}")
+    index_entries([new_entry])
+
+    refresh_cached_boards(dataset_type, entry_boards(new_entry))
+    return new_entry
+
+
+def add_entry(entry: LeaderboardEntry):
+    """Stage an entry, its near-clone flag and its leaderboard_top changes in the current transaction"""
+    entry.near_clone_of = find_near_clone(entry)
+    db.session.add(entry)
+    db.session.flush()  # assigns entry.id
+    update_top_entries(entry)
+
+
+def _entries_committed(entries: List[LeaderboardEntry]):
+    print(f"Added {len(entries)} queued entries")
+    index_entries(entries)
+
+    boards: Dict[str, set] = {}
+    for entry in entries:
+        boards.setdefault(entry.dataset_type, set()).update(entry_boards(entry))
+    for dataset_type, target_languages in boards.items():
+        refresh_cached_boards(dataset_type, target_languages)
+
+
+def commit_batch(items: List[Dict]):
+    """
+    Insert queued submissions in one transaction. If the batch is rejected for
+    anything but a connection problem, retry row by row so one bad submission
+    doesn't drop the rest. A connection problem during that retry raises
+    PartialFlushError, so the rows not yet handled stay queued.
+    """
+    entries = [build_entry(item['dataset_type'], item['data']) for item in items]
+    try:
+        for entry in entries:
+            add_entry(entry)
+        db.session.commit()
+    except OperationalError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error committing leaderboard batch, retrying row by row: {str(e)}")
+        # Only entries that committed are indexed: a dropped one keeps the id its flush assigned
+        entries = []
+        for flushed, item in enumerate(items):
+            try:
+                entry = build_entry(item['dataset_type'], item['data'])
+                add_entry(entry)
+                db.session.commit()
+            except OperationalError as e:
+                db.session.rollback()
+                _entries_committed(entries)
+                raise PartialFlushError(flushed, e)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Dropping leaderboard entry for {item['dataset_type']}: {str(e)}")
+                continue
+            entries.append(entry)
+    _entries_committed(entries)
+
+
+def init_write_behind(app):
+    """Queue leaderboard inserts for batched commits, replaying journals left by crashed workers"""
+    global _write_behind
+
+    def flush_batch(items):
+        with app.app_context():
+            commit_batch(items)
+
+    journal_dir = app.config.get('LEADERBOARD_JOURNAL_DIR')
+    _write_behind = WriteBehindQueue(flush_batch, Path(journal_dir) if journal_dir else None)
+    replay_write_behind()
+
+
+def replay_write_behind() -> int:
+    """
+    Commit journals left by crashed processes. Runs at app start and in each
+    gunicorn worker as it boots, so a replacement worker picks up the journal
+    of the one that died. Failures are logged, never raised: the journals stay
+    on disk for the next attempt and the app still starts.
+    """
+    if _write_behind is None or _write_behind.journal_dir is None:
+        return 0
+    try:
+        return replay_journals(_write_behind.journal_dir, _write_behind.flush_batch)
+    except Exception as e:
+        print(f"Error replaying leaderboard journals: {str(e)}")
+        return 0
+
+
+def flush_write_behind():
+    if _write_behind is not None:
+        _write_behind.flush()
+
+
+def submit_entry(dataset_type: str, data: Dict[str, Any]):
+    """
+    Save a submission: inline via record_entry, or through the write-behind
+    queue when enabled. Queued entries are patched into the shared leaderboard
+    cache right away so the submitter sees their result before the commit lands.
+    Returns the entry (not yet committed, so without an id, when queued).
+    """
+    if _write_behind is None:
+        return record_entry(dataset_type, data)
+
+    data = dict(data, submitted_at=datetime.utcnow().isoformat())
+    entry = build_entry(dataset_type, data)
+    if entry.score is None:
+        raise ValueError(f"No score for dataset type {dataset_type}")
+    entry_dict = entry.to_dict()
+    _write_behind.enqueue({'dataset_type': dataset_type, 'data': data, 'entry': entry_dict})
+
+    for target_language in entry_boards(entry):
+        try:
+            leaderboard_cache.update(leaderboard_key(dataset_type, target_language),
+                                     top_entries(dataset_type, target_language),
+                                     lambda entries: merge_pending(entries, [entry_dict]))
+        except Exception as e:
+            print(f"Error updating leaderboard cache: {str(e)}")
+    return entry
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import base64
+import gzip
+import json
+import os
+from sqlalchemy.orm import selectinload
+from src.models import db, LeaderboardEntry, LeaderboardTop, SubmissionDetails
+
+ARCHIVE_DIR = Path(os.environ.get('LEADERBOARD_ARCHIVE_DIR', Path(__file__).parent.parent / 'data' / 'archive'))
+# Entries older than this are archived unless protected (see protected_entry_ids)
+RETENTION_DAYS = int(os.environ.get('LEADERBOARD_RETENTION_DAYS', 90))
+# Entries per archive file and per delete transaction
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_SUFFIX = '.jsonl.gz'
+
+
+def _encode_row(row, table) -> Dict:
+    record = {}
+    for column in table.columns:
+        value = getattr(row, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, bytes):
+            value = base64.b64encode(value).decode('ascii')
+        record[column.key] = value
+    return record
+
+
+def _decode_row(record: Dict, table) -> Dict:
+    row = {}
+    for column in table.columns:
+        value = record.get(column.key)
+        if value is not None and isinstance(column.type, db.DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column.type, db.LargeBinary):
+            value = base64.b64decode(value)
+        row[column.key] = value
+    return row
+
+
+def protected_entry_ids() -> Set[int]:
+    """
+    Entries that are never archived: every board's current top-N, each player's
+    best per board, and entries whose predictions and inputs reusing entries read
+    """
+    protected = {entry_id for (entry_id,) in db.session.query(LeaderboardTop.entry_id)}
+    protected.update(entry_id for (entry_id,) in db.session.query(LeaderboardEntry.reused_from).filter(
+        LeaderboardEntry.reused_from.isnot(None)).distinct())
+    ranked = db.session.query(
+        LeaderboardEntry.id.label('id'),
+        db.func.row_number().over(
+            partition_by=(LeaderboardEntry.dataset_type, LeaderboardEntry.is_production, LeaderboardEntry.name),
+            order_by=(LeaderboardEntry.score.desc(), LeaderboardEntry.id.desc())
+        ).label('position')
+    ).subquery()
+    protected.update(entry_id for (entry_id,) in db.session.query(ranked.c.id).filter(ranked.c.position == 1))
+    return protected
+
+
+def _write_archive(path: Path, entries: List[LeaderboardEntry]):
+    """Write a batch of entries (with their details) and fsync it before the rows are deleted"""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for entry in entries:
+                record = {
+                    'entry': _encode_row(entry, LeaderboardEntry.__table__),
+                    'details': _encode_row(entry.details, SubmissionDetails.__table__) if entry.details else None
+                }
+                f.write((json.dumps(record) + '\n').encode('utf-8'))
+        raw.flush()
+        os.fsync(raw.fileno())
+    tmp_path.replace(path)
+
+
+def archive_entries(older_than_days: int = RETENTION_DAYS, archive_dir: Path = ARCHIVE_DIR,
+                    batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move entries older than the cutoff out of the database into gzipped JSONL
+    files, one file and one transaction per batch. Details rows are deleted
+    explicitly since SQLite doesn't enforce the cascade. Returns the number archived.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    protected = protected_entry_ids()
+    archive_dir.mkdir(parents=True, exist_ok=True)
+
+    archived, last_id = 0, 0
+    while True:
+        candidates = LeaderboardEntry.query.options(selectinload(LeaderboardEntry.details)).filter(
+            LeaderboardEntry.id > last_id,
+            LeaderboardEntry.timestamp < cutoff
+        ).order_by(LeaderboardEntry.id).limit(batch_size).all()
+        if not candidates:
+            break
+        last_id = candidates[-1].id
+        entries = [entry for entry in candidates if entry.id not in protected]
+        if not entries:
+            continue
+
+        _write_archive(archive_dir / f"leaderboard-{entries[0].id}-{entries[-1].id}{ARCHIVE_SUFFIX}", entries)
+        ids = [entry.id for entry in entries]
+        db.session.expunge_all()
+        SubmissionDetails.query.filter(SubmissionDetails.entry_id.in_(ids)).delete(synchronize_session=False)
+        LeaderboardEntry.query.filter(LeaderboardEntry.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        archived += len(ids)
+        print(f"Debug - Archived {len(ids)} leaderboard entries up to id {ids[-1]}")
+    return archived
+
+
+def _read_archive(path: Path) -> Iterable[Dict]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def restore_entries(archive_dir: Path = ARCHIVE_DIR, paths: Optional[List[Path]] = None) -> int:
+    """
+    Insert archived entries back with their original ids, one file per
+    transaction, deleting each file once committed. Entries whose id already
+    exists are skipped. Returns the number restored.
+    """
+    paths = paths if paths is not None else sorted(archive_dir.glob(f"*{ARCHIVE_SUFFIX}"))
+    restored = 0
+    for path in paths:
+        records = list(_read_archive(path))
+        ids = [record['entry']['id'] for record in records]
+        existing = {entry_id for (entry_id,) in
+                    db.session.query(LeaderboardEntry.id).filter(LeaderboardEntry.id.in_(ids))}
+        records = [record for record in records if record['entry']['id'] not in existing]
+
+        entries = [_decode_row(record['entry'], LeaderboardEntry.__table__) for record in records]
+        details = [_decode_row(record['details'], SubmissionDetails.__table__)
+                   for record in records if record['details']]
+        if entries:
+            db.session.execute(LeaderboardEntry.__table__.insert(), entries)
+        if details:
+            db.session.execute(SubmissionDetails.__table__.insert(), details)
+        db.session.commit()
+        path.unlink()
+        restored += len(entries)
+        print(f"Debug - Restored {len(entries)} leaderboard entries from {path.name}")
+    return restored
@@ -0,0 +1,111 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import fcntl
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+CACHE_DIR = Path(os.environ.get('LEADERBOARD_CACHE_DIR', Path(tempfile.gettempdir()) / 'prompt_game_leaderboard'))
+# Safety net: entries older than this are rebuilt even if no write invalidated them
+CACHE_TTL = float(os.environ.get('LEADERBOARD_CACHE_TTL', 60))
+
+_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class LeaderboardCache:
+    """
+    Serialized leaderboard payloads shared by every worker on the host.
+
+    Each key is a JSON file in a local directory. Reads stat the file and serve
+    the in-process copy while the file is unchanged, so steady-state page views
+    cost neither a database query nor a file read. Writers call refresh() after
+    committing, which rebuilds the file in place, or update() to patch it; writes
+    for a key are serialized with a file lock so a slow reader can't overwrite a
+    newer payload.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, ttl: float = CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._local: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        if not _KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid leaderboard cache key: {key}")
+        return self.cache_dir / f"{key}.json"
+
+    @contextmanager
+    def _locked(self, key: str):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.cache_dir / f"{key}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_fresh(self, key: str) -> Optional[bytes]:
+        """The stored payload if it exists and is within the TTL, else None."""
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if time.time() - stat.st_mtime > self.ttl:
+            return None
+
+        version = (stat.st_ino, stat.st_mtime_ns)
+        local = self._local.get(key)
+        if local is not None and local[0] == version:
+            return local[1]
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        self._local[key] = (version, body)
+        return body
+
+    def get(self, key: str, build: Callable[[], Any]) -> bytes:
+        body = self._read_fresh(key)
+        if body is not None:
+            return body
+        with self._locked(key):
+            # Another worker may have rebuilt it while we waited for the lock
+            body = self._read_fresh(key)
+            if body is not None:
+                return body
+            return self._store(key, build())
+
+    def refresh(self, key: str, build: Callable[[], Any]) -> bytes:
+        """Rebuild the payload for key now (write-through after a database write)."""
+        with self._locked(key):
+            return self._store(key, build())
+
+    def update(self, key: str, build: Callable[[], Any], modify: Callable[[Any], Any]) -> bytes:
+        """Apply modify to the stored payload (built first if missing or expired) in place."""
+        with self._locked(key):
+            body = self._read_fresh(key)
+            current = json.loads(body) if body is not None else build()
+            return self._store(key, modify(current))
+
+    def invalidate(self, key: str):
+        with self._locked(key):
+            self._path(key).unlink(missing_ok=True)
+            self._local.pop(key, None)
+
+    def _store(self, key: str, value: Any) -> bytes:
+        body = json.dumps(value).encode('utf-8')
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        tmp_path.replace(path)
+        stat = path.stat()
+        self._local[key] = ((stat.st_ino, stat.st_mtime_ns), body)
+        return body
@@ -0,0 +1,82 @@
+from typing import Dict, Iterator, List
+import csv
+import io
+import json
+from sqlalchemy.orm import selectinload
+from src.models import db, LeaderboardEntry
+from src.leaderboard import IS_PRODUCTION
+
+EXPORT_FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+# Rows fetched (and serialized into one chunk) per query
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_fields(dataset_type: str, include_private: bool = False) -> List[str]:
+    """Columns of an export: the keys to_dict produces for this dataset"""
+    return ['id'] + list(LeaderboardEntry(dataset_type=dataset_type).to_dict(include_private))
+
+
+def _export_row(entry: LeaderboardEntry, include_private: bool) -> Dict:
+    return dict(id=entry.id, **entry.to_dict(include_private))
+
+
+def iter_rows(dataset_type: str, include_private: bool = False,
+              batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    Export rows of every entry of a dataset in id order, in batches.
+
+    Each batch is its own short keyset query (id > last id seen) rather than
+    one long-lived cursor. The batch is turned into rows (decoding any private
+    payloads) and the transaction is rolled back before the rows are yielded,
+    so no connection sits idle in a transaction while a chunk is being sent,
+    and memory stays bounded since the entries are expunged from the session.
+    Private exports load submission details for the whole batch in one query.
+    """
+    last_id = 0
+    while True:
+        query = LeaderboardEntry.query.filter(
+            LeaderboardEntry.dataset_type == dataset_type,
+            LeaderboardEntry.is_production == IS_PRODUCTION,
+            LeaderboardEntry.id > last_id
+        ).order_by(LeaderboardEntry.id).limit(batch_size)
+        if include_private:
+            query = query.options(selectinload(LeaderboardEntry.details))
+        batch = query.all()
+        if not batch:
+            db.session.rollback()
+            return
+        last_id = batch[-1].id
+        rows = [_export_row(entry, include_private) for entry in batch]
+        db.session.expunge_all()
+        db.session.rollback()
+        yield rows
+
+
+def export_csv(dataset_type: str, include_private: bool = False) -> Iterator[str]:
+    """CSV chunks (header first); list-valued private fields are JSON-encoded in their cells"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=export_fields(dataset_type, include_private))
+    writer.writeheader()
+    for rows in iter_rows(dataset_type, include_private):
+        for row in rows:
+            writer.writerow({key: json.dumps(value) if isinstance(value, (list, dict)) else value
+                             for key, value in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_jsonl(dataset_type: str, include_private: bool = False) -> Iterator[str]:
+    """One JSON object per line, one chunk per batch"""
+    for rows in iter_rows(dataset_type, include_private):
+        yield ''.join(json.dumps(row) + '\n' for row in rows)
+
+
+def export_chunks(dataset_type: str, export_format: str, include_private: bool = False) -> Iterator[str]:
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'csv':
+        return export_csv(dataset_type, include_private)
+    return export_jsonl(dataset_type, include_private)
@@ -0,0 +1,123 @@
+from math import ceil, sqrt
+from typing import Dict, List, Optional
+import os
+from src.models import db, LeaderboardEntry
+from src.leaderboard import IS_PRODUCTION
+from src.leaderboard_cache import LeaderboardCache
+
+# Statistics aren't refreshed by writes, so they are only cached briefly
+STATS_CACHE_TTL = float(os.environ.get('LEADERBOARD_STATS_TTL', 30))
+stats_cache = LeaderboardCache(ttl=STATS_CACHE_TTL)
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+HISTOGRAM_BINS = 10
+
+# Numeric columns summarized for every dataset, plus its own metrics (as in to_dict)
+COMMON_COLUMNS = ('score', 'prompt_length')
+METRIC_COLUMNS = {
+    'word_sorting': ('accuracy', 'word_accuracy', 'efficiency'),
+    'text_summarization': ('similarity', 'length_penalty_avg', 'prompt_efficiency'),
+    'causal_judgement': ('accuracy', 'base_accuracy', 'efficiency'),
+    'translation_task': ('semantic_similarity', 'language_quality', 'efficiency'),
+}
+
+
+def stats_key(dataset_type: str, target_language: str = '') -> str:
+    board = f"{dataset_type}.{target_language}" if target_language else dataset_type
+    return f"stats.{board}.{'production' if IS_PRODUCTION else 'development'}"
+
+
+def _number(value):
+    # Postgres returns AVG of integer columns as Decimal
+    return float(value) if value is not None else None
+
+
+def _percentiles(column, filters, count: int) -> Dict[str, float]:
+    """Nearest-rank percentiles from one ROW_NUMBER() pass (SQLite has no percentile_cont)"""
+    positions = {p: max(1, ceil(p / 100 * count)) for p in PERCENTILES}
+    ranked = db.session.query(
+        column.label('value'),
+        db.func.row_number().over(order_by=column).label('position')
+    ).filter(*filters, column.isnot(None)).subquery()
+    values = dict(db.session.query(ranked.c.position, ranked.c.value).filter(
+        ranked.c.position.in_(set(positions.values()))
+    ).all())
+    return {f"p{p}": _number(values.get(position)) for p, position in positions.items()}
+
+
+def _histograms(columns: Dict[str, object], bounds: Dict[str, tuple], filters) -> Dict[str, List[Dict]]:
+    """Equal-width buckets between each column's min and max, counted for all columns in one scan"""
+    edges, counts = {}, []
+    for name, column in columns.items():
+        low, high = bounds[name]
+        if low is None:
+            continue
+        width = (high - low) / HISTOGRAM_BINS
+        edges[name] = [low + width * i for i in range(HISTOGRAM_BINS)] + [high]
+        for i in range(HISTOGRAM_BINS):
+            # Last bucket is closed so the maximum is counted
+            upper = column <= high if i == HISTOGRAM_BINS - 1 else column < edges[name][i + 1]
+            counts.append(db.func.sum(db.case((db.and_(column >= edges[name][i], upper), 1), else_=0)))
+    if not counts:
+        return {}
+
+    row = iter(db.session.query(*counts).filter(*filters).one())
+    histograms = {}
+    for name, bucket_edges in edges.items():
+        histograms[name] = [
+            {'start': bucket_edges[i], 'end': bucket_edges[i + 1], 'count': int(next(row) or 0)}
+            for i in range(HISTOGRAM_BINS)
+        ]
+    return histograms
+
+
+def compute_stats(dataset_type: str, target_language: Optional[str] = None) -> Dict:
+    """
+    Count, mean, standard deviation, range, percentiles and a histogram of the
+    score, prompt length and dataset metrics of a board, aggregated in the
+    database with queries that run on both SQLite and Postgres.
+    """
+    filters = [LeaderboardEntry.dataset_type == dataset_type, LeaderboardEntry.is_production == IS_PRODUCTION]
+    if target_language:
+        filters.append(LeaderboardEntry.target_language == target_language)
+
+    names = COMMON_COLUMNS + METRIC_COLUMNS.get(dataset_type, ())
+    columns = {name: getattr(LeaderboardEntry, name) for name in names}
+    aggregates = [db.func.count()]
+    for column in columns.values():
+        aggregates += [db.func.count(column), db.func.avg(column), db.func.avg(column * column),
+                       db.func.min(column), db.func.max(column)]
+    row = db.session.query(*aggregates).filter(*filters).one()
+
+    total, values = row[0], iter(row[1:])
+    summaries, bounds = {}, {}
+    for name, column in columns.items():
+        count = next(values)
+        mean, mean_square, low, high = (_number(next(values)) for _ in range(4))
+        bounds[name] = (low, high)
+        summaries[name] = {
+            'count': count,
+            'mean': mean,
+            # Population standard deviation from E[x^2] - E[x]^2 (no STDDEV in SQLite)
+            'stddev': sqrt(max(mean_square - mean * mean, 0.0)) if count else None,
+            'min': low,
+            'max': high,
+            'percentiles': _percentiles(column, filters, count) if count else {},
+        }
+
+    histograms = _histograms(columns, bounds, filters)
+    for name, summary in summaries.items():
+        summary['histogram'] = histograms.get(name, [])
+
+    return {
+        'dataset_type': dataset_type,
+        'target_language': target_language or None,
+        'count': total,
+        'metrics': summaries,
+    }
+
+
+def leaderboard_stats(dataset_type: str, target_language: str = '') -> bytes:
+    """Serialized statistics of a board, shared by all workers for STATS_CACHE_TTL seconds"""
+    return stats_cache.get(stats_key(dataset_type, target_language),
+                           lambda: compute_stats(dataset_type, target_language))
@@ -0,0 +1,135 @@
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Union
+import asyncio
+import os
+import threading
+import time
+from groq import AsyncGroq, Groq, RateLimitError
+
+# Completions of a request run concurrently on one event loop per worker process
+ASYNC_COMPLETIONS = os.environ.get('ASYNC_COMPLETIONS', 'true').lower() == 'true'
+# Upper bound on Groq calls in flight per process, across all requests
+MAX_CONCURRENT_COMPLETIONS = int(os.environ.get('LLM_MAX_CONCURRENCY', 64))
+# Rate-limited (429) calls are retried this many times, on top of the client's own retries,
+# waiting Retry-After when Groq sends it and otherwise doubling from LLM_RATE_LIMIT_BACKOFF seconds
+RATE_LIMIT_RETRIES = int(os.environ.get('LLM_RATE_LIMIT_RETRIES', 4))
+RATE_LIMIT_BACKOFF = float(os.environ.get('LLM_RATE_LIMIT_BACKOFF', 1.0))
+MAX_RATE_LIMIT_DELAY = 30.0
+
+Messages = List[Dict[str, str]]
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_loop_lock = threading.Lock()
+# Created on the loop thread: both are bound to the loop they are first used on
+_async_client: Optional[AsyncGroq] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def initialize_client() -> Groq:
+    return Groq(api_key=os.environ.get("GROQ_API_KEY", "").strip())
+
+
+def initialize_async_client() -> AsyncGroq:
+    return AsyncGroq(api_key=os.environ.get("GROQ_API_KEY", "").strip())
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """
+    The process's completion loop, started on first use. Gunicorn preloads the
+    app in the master and forks, and threads don't survive a fork, so a worker
+    that inherits the master's loop starts its own.
+    """
+    global _loop, _loop_pid, _async_client, _semaphore
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            _async_client, _semaphore = None, None
+            threading.Thread(target=_loop.run_forever, name='llm-completions', daemon=True).start()
+        return _loop
+
+
+def _rate_limit_delay(error: RateLimitError, attempt: int) -> float:
+    """Seconds to wait before retrying a rate-limited call"""
+    try:
+        delay = float(error.response.headers.get('retry-after', ''))
+    except (AttributeError, ValueError):
+        delay = RATE_LIMIT_BACKOFF * 2 ** attempt
+    return min(max(delay, 0.0), MAX_RATE_LIMIT_DELAY)
+
+
+async def _complete(messages: Messages, model: str, temperature: float) -> str:
+    global _async_client, _semaphore
+    if _async_client is None:
+        _async_client = initialize_async_client()
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMPLETIONS)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            async with _semaphore:
+                chat_completion = await _async_client.chat.completions.create(
+                    messages=messages,
+                    model=model,
+                    temperature=temperature
+                )
+            return chat_completion.choices[0].message.content.strip()
+        except RateLimitError as e:
+            if attempt == RATE_LIMIT_RETRIES:
+                raise
+            # Back off without holding a slot, so calls that aren't limited keep going
+            await asyncio.sleep(_rate_limit_delay(e, attempt))
+
+
+def _complete_blocking(client: Groq, messages: Messages, model: str, temperature: float) -> str:
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            chat_completion = client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=temperature
+            )
+            return chat_completion.choices[0].message.content.strip()
+        except RateLimitError as e:
+            if attempt == RATE_LIMIT_RETRIES:
+                raise
+            time.sleep(_rate_limit_delay(e, attempt))
+
+
+async def _complete_all(requests: List[Messages], model: str, temperature: float) -> List:
+    return await asyncio.gather(*(_complete(messages, model, temperature) for messages in requests),
+                                return_exceptions=True)
+
+
+def complete_all(requests: List[Messages], model: str, temperature: float) -> List[Union[str, Exception]]:
+    """
+    Responses to a list of chat requests, in order. A failed request yields its
+    exception instead of a response so callers can keep the rest. Calls that
+    Groq rate-limits are retried with backoff before they count as failed.
+
+    With ASYNC_COMPLETIONS the requests are awaited together on the worker's
+    event loop and the calling (request) thread just waits for the batch, so a
+    request costs about one round trip to Groq instead of one per example.
+    Otherwise they are sent one after another on a blocking client.
+    """
+    if not requests:
+        return []
+    if ASYNC_COMPLETIONS:
+        future: Future = asyncio.run_coroutine_threadsafe(_complete_all(requests, model, temperature),
+                                                          _event_loop())
+        return future.result()
+
+    client, responses = initialize_client(), []
+    for messages in requests:
+        try:
+            responses.append(_complete_blocking(client, messages, model, temperature))
+        except Exception as e:
+            responses.append(e)
+    return responses
+
+
+def complete(messages: Messages, model: str, temperature: float) -> str:
+    """A single response; raises if the request fails"""
+    response = complete_all([messages], model, temperature)[0]
+    if isinstance(response, Exception):
+        raise response
+    return response
@@ -1,9 +1,8 @@
 from typing import Dict, Any, List
-import os
 import json
-from groq import Groq
 import logging
 from ..utils import calculate_efficiency_modifier
+from ...llm_client import complete
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,8 +14,6 @@ def evaluate_with_groq(
    evaluation_guide: Dict
 ) -> Dict:
    try:
-       client = Groq(api_key=os.environ.get("GROQ_API_KEY", "").strip())
-       
        # Build a generic evaluation prompt using the evaluation_guide
        evaluation_prompt = f"""Evaluate this solution for the given task.
 
@@ -47,14 +44,12 @@ FEEDBACK:
        logger.info(f"Sending evaluation request to GROQ for task: {task_description[:100]}...")
        logger.info(f"User output to evaluate: {user_output[:100]}...")
 
-       chat_completion = client.chat.completions.create(
-           messages=[{"role": "system", "content": "You are an evaluator for complex transformation tasks."}, 
-                    {"role": "user", "content": evaluation_prompt}],
+       raw_response = complete(
+           [{"role": "system", "content": "You are an evaluator for complex transformation tasks."},
+            {"role": "user", "content": evaluation_prompt}],
            model="llama3-70b-8192",
            temperature=0.1
        )
-
-       raw_response = chat_completion.choices[0].message.content.strip()
        logger.info(f"Raw GROQ response: {raw_response}")
 
        scores = {'rules': 0, 'accuracy': 0, 'format': 0}
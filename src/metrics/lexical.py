@@ -0,0 +1,149 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from functools import lru_cache
+import os
+import threading
+import zlib
+import numpy as np
+
+SCORERS = ('auto', 'spacy', 'lexical')
+
+# Words at least this long are treated as "key words" (they usually carry the content)
+KEY_WORD_MIN_LENGTH = 5
+
+# (jaccard, key word overlap, positional match) weights per task
+SUMMARIZATION_WEIGHTS = (0.3, 0.5, 0.2)
+TRANSLATION_WEIGHTS = (0.4, 0.4, 0.2)
+
+DEFAULT_LATENCY_BUDGET_MS = float(os.environ.get('SIMILARITY_LATENCY_BUDGET_MS', 50))
+
+
+class LexicalTokens(NamedTuple):
+    sequence: np.ndarray   # token hashes in text order
+    vocab: np.ndarray      # sorted unique token hashes
+    key_vocab: np.ndarray  # sorted unique hashes of key words
+
+
+def _hash_words(words: List[str]) -> np.ndarray:
+    return np.fromiter(
+        (zlib.crc32(word.encode('utf-8')) for word in words),
+        dtype=np.uint32,
+        count=len(words)
+    )
+
+
+@lru_cache(maxsize=4096)
+def tokenize(text: str) -> LexicalTokens:
+    """
+    Tokenize text once into hashed integer arrays. Results are cached, so
+    reference texts that are scored repeatedly are only tokenized once.
+    """
+    words = text.lower().split()
+    sequence = _hash_words(words)
+    is_key = np.fromiter((len(w) >= KEY_WORD_MIN_LENGTH for w in words), dtype=bool, count=len(words))
+
+    tokens = LexicalTokens(sequence, np.unique(sequence), np.unique(sequence[is_key]))
+    for array in tokens:
+        array.setflags(write=False)
+    return tokens
+
+
+def _overlap(a: np.ndarray, b: np.ndarray) -> int:
+    return np.intersect1d(a, b, assume_unique=True).size
+
+
+def lexical_jaccard(text1: str, text2: str) -> float:
+    tokens1, tokens2 = tokenize(text1), tokenize(text2)
+    intersection = _overlap(tokens1.vocab, tokens2.vocab)
+    union = tokens1.vocab.size + tokens2.vocab.size - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def lexical_similarity(text1: str, text2: str, weights: Tuple[float, float, float] = SUMMARIZATION_WEIGHTS) -> float:
+    """
+    Weighted combination of word Jaccard, key word overlap (relative to text1)
+    and positional word match.
+    """
+    tokens1, tokens2 = tokenize(text1), tokenize(text2)
+
+    intersection = _overlap(tokens1.vocab, tokens2.vocab)
+    union = tokens1.vocab.size + tokens2.vocab.size - intersection
+    jaccard = intersection / union if union > 0 else 0.0
+
+    key_words = tokens1.key_vocab.size
+    key_overlap = _overlap(tokens1.key_vocab, tokens2.key_vocab) / key_words if key_words else 0.0
+
+    seq1, seq2 = tokens1.sequence, tokens2.sequence
+    shortest = min(seq1.size, seq2.size)
+    longest = max(seq1.size, seq2.size)
+    matches = np.count_nonzero(seq1[:shortest] == seq2[:shortest])
+    sequence_score = matches / longest if longest else 0.0
+
+    jaccard_weight, key_weight, sequence_weight = weights
+    return float(jaccard_weight * jaccard + key_weight * key_overlap + sequence_weight * sequence_score)
+
+
+class LatencyBudget:
+    """
+    Tracks a moving average of spaCy scoring latency. Once the average goes
+    over budget the "auto" scorer switches to the lexical tier, probing spaCy
+    every `probe_every` runs so it can switch back when load drops.
+    """
+
+    def __init__(self, budget_ms: float = DEFAULT_LATENCY_BUDGET_MS, probe_every: int = 20, alpha: float = 0.2):
+        self.budget_ms = budget_ms
+        self.probe_every = probe_every
+        self.alpha = alpha
+        self.average_ms: Optional[float] = None
+        self._skipped = 0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float):
+        with self._lock:
+            if self.average_ms is None:
+                self.average_ms = elapsed_ms
+            else:
+                self.average_ms = self.alpha * elapsed_ms + (1 - self.alpha) * self.average_ms
+
+    def exceeded(self) -> bool:
+        with self._lock:
+            if self.average_ms is None or self.average_ms <= self.budget_ms:
+                return False
+            self._skipped += 1
+            if self._skipped >= self.probe_every:
+                self._skipped = 0
+                return False
+            return True
+
+
+def choose_scorer(scorer: Optional[str], nlp, budget: LatencyBudget) -> str:
+    """Resolve a requested scorer ('auto', 'spacy' or 'lexical') to the tier that will run."""
+    scorer = scorer or 'auto'
+    if scorer not in SCORERS:
+        raise ValueError(f"Unknown similarity scorer: {scorer}. Expected one of {', '.join(SCORERS)}")
+    if nlp is None or scorer == 'lexical':
+        return 'lexical'
+    if scorer == 'auto' and budget.exceeded():
+        return 'lexical'
+    return 'spacy'
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    order = values.argsort()
+    ranks = np.empty(len(values), dtype=float)
+    ranks[order] = np.arange(len(values))
+    return ranks
+
+
+def score_agreement(reference_scores: Sequence[float], lexical_scores: Sequence[float]) -> Dict:
+    """Pearson/Spearman correlation and mean absolute difference between two scorers."""
+    reference = np.asarray(reference_scores, dtype=float)
+    lexical = np.asarray(lexical_scores, dtype=float)
+    if reference.size < 2:
+        return {'pairs': int(reference.size), 'pearson': None, 'spearman': None, 'mean_abs_diff': None}
+
+    return {
+        'pairs': int(reference.size),
+        'pearson': round(float(np.corrcoef(reference, lexical)[0, 1]), 3),
+        'spearman': round(float(np.corrcoef(_ranks(reference), _ranks(lexical))[0, 1]), 3),
+        'mean_abs_diff': round(float(np.mean(np.abs(reference - lexical))), 3)
+    }
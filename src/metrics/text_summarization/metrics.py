@@ -2,6 +2,13 @@ from typing import List, Dict
 import spacy
 import numpy as np
 from src.metrics.utils import calculate_efficiency_modifier
+from src.metrics.lexical import (
+    LatencyBudget,
+    SUMMARIZATION_WEIGHTS,
+    choose_scorer,
+    lexical_jaccard,
+    lexical_similarity
+)
 import time
 import logging
 
@@ -14,27 +21,14 @@ except Exception as e:
     logger.warning(f"Failed to load spacy model: {e}")
     nlp = None
 
-def calculate_similarity(text1: str, text2: str) -> float:
-    if nlp is None:
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        seq1 = text1.lower().split()
-        seq2 = text2.lower().split()
-        
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        jaccard = intersection / union if union > 0 else 0.0
-        
-        key_words1 = {w for w in words1 if len(w) > 4}
-        key_words2 = {w for w in words2 if len(w) > 4}
-        key_overlap = len(key_words1.intersection(key_words2)) / len(key_words1) if key_words1 else 0
-        
-        matches = sum(1 for i in range(min(len(seq1), len(seq2))) if seq1[i] == seq2[i])
-        sequence_score = matches / max(len(seq1), len(seq2))
-        
-        return 0.3 * jaccard + 0.5 * key_overlap + 0.2 * sequence_score
+_latency_budget = LatencyBudget()
+
+def calculate_similarity(text1: str, text2: str, scorer: str = "auto") -> float:
+    if choose_scorer(scorer, nlp, _latency_budget) == "lexical":
+        return lexical_similarity(text1, text2, SUMMARIZATION_WEIGHTS)
     
     try:
+        start = time.perf_counter()
         doc1 = nlp(text1.lower())
         doc2 = nlp(text2.lower())
         base_similarity = doc1.similarity(doc2)
@@ -42,16 +36,13 @@ def calculate_similarity(text1: str, text2: str) -> float:
         ents1 = set(ent.text.lower() for ent in doc1.ents)
         ents2 = set(ent.text.lower() for ent in doc2.ents)
         ent_score = len(ents1.intersection(ents2)) / len(ents1) if ents1 else 0
+        _latency_budget.record((time.perf_counter() - start) * 1000)
         
         return 0.6 * base_similarity + 0.4 * ent_score
         
     except Exception as e:
         logger.warning(f"Error in similarity calculation: {e}")
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        return intersection / union if union > 0 else 0.0
+        return lexical_jaccard(text1, text2)
 
 def calculate_length_penalty(expected_length: int, actual_length: int) -> float:
     ratio = actual_length / expected_length
@@ -94,8 +85,11 @@ def assess_quality(metrics: Dict) -> Dict:
 def calculate_summarization_metrics(
     expected_outputs: List[str],
     model_predictions: List[str],
-    system_prompt: str
+    system_prompt: str,
+    scorer: str = "auto"
 ) -> Dict:
+    # Resolve the scorer once so every example in a run is scored the same way
+    scorer = choose_scorer(scorer, nlp, _latency_budget)
     total_examples = len(expected_outputs)
     similarities = []
     individual_scores = []
@@ -104,7 +98,7 @@ def calculate_summarization_metrics(
 
     for i, (true_summary, model_summary) in enumerate(zip(expected_outputs, model_predictions)):
         try:
-            similarity = calculate_similarity(true_summary, model_summary)
+            similarity = calculate_similarity(true_summary, model_summary, scorer)
             expected_length = len(true_summary)
             actual_length = len(model_summary)
             length_penalty = calculate_length_penalty(expected_length, actual_length)
@@ -146,6 +140,7 @@ def calculate_summarization_metrics(
         'prompt_length_chars': len(system_prompt),
         'average_actual_length_chars': round(avg_actual_length, 1),
         'total_tests': total_examples,
+        'similarity_scorer': scorer,
         'individual_scores': individual_scores,
         'quality_assessment': assess_quality({
             'similarity': avg_similarity * 100,
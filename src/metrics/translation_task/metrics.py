@@ -1,11 +1,18 @@
 from typing import List, Dict
-import os
 import requests
-from groq import Groq
 import spacy
 import numpy as np
 import logging
+import time
 from ..utils import calculate_efficiency_modifier
+from ...llm_client import complete_all
+from ..lexical import (
+    LatencyBudget,
+    TRANSLATION_WEIGHTS,
+    choose_scorer,
+    lexical_jaccard,
+    lexical_similarity
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,36 +24,16 @@ except Exception as e:
     logger.warning(f"Failed to load spacy model: {e}")
     nlp = None
 
-def calculate_translation_similarity(translation: str, reference: str) -> float:
+_latency_budget = LatencyBudget()
+
+def calculate_translation_similarity(translation: str, reference: str, scorer: str = "auto") -> float:
     """Calculate translation similarity with more nuanced understanding"""
     # Exact match should always be 1.0
     if translation.strip() == reference.strip():
         return 1.0
         
-    if nlp is None:
-        # Fallback method
-        words1 = set(translation.lower().split())
-        words2 = set(reference.lower().split())
-        seq1 = translation.lower().split()
-        seq2 = reference.lower().split()
-        
-        # Basic word overlap (Jaccard)
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        jaccard = intersection / union if union > 0 else 0.0
-        
-        # Key words overlap (longer words often carry more meaning)
-        key_words1 = {w for w in words1 if len(w) > 4}
-        key_words2 = {w for w in words2 if len(w) > 4}
-        key_overlap = len(key_words1.intersection(key_words2)) / len(key_words1) if key_words1 else 0
-        
-        # Word order matters but shouldn't be too strict
-        matches = sum(1 for i in range(min(len(seq1), len(seq2))) if seq1[i] == seq2[i])
-        sequence_score = matches / max(len(seq1), len(seq2))
-        
-        return (0.4 * jaccard +  # Basic word overlap
-                0.4 * key_overlap +  # Key content words
-                0.2 * sequence_score)  # Some attention to order
+    if choose_scorer(scorer, nlp, _latency_budget) == "lexical":
+        return lexical_similarity(translation, reference, TRANSLATION_WEIGHTS)
     
     try:
         # For exact matches with different case
@@ -54,6 +41,7 @@ def calculate_translation_similarity(translation: str, reference: str) -> float:
             return 1.0
 
         # Use spaCy's similarity for non-identical strings
+        start = time.perf_counter()
         doc1 = nlp(translation.lower())
         doc2 = nlp(reference.lower())
         
@@ -68,6 +56,7 @@ def calculate_translation_similarity(translation: str, reference: str) -> float:
         ents1 = set(ent.text.lower() for ent in doc1.ents)
         ents2 = set(ent.text.lower() for ent in doc2.ents)
         ent_score = len(ents1.intersection(ents2)) / len(ents1) if ents1 else 1.0  # Default to 1.0 if no entities
+        _latency_budget.record((time.perf_counter() - start) * 1000)
         
         # Weighted combination that ensures high scores for very similar text
         return max(
@@ -78,18 +67,13 @@ def calculate_translation_similarity(translation: str, reference: str) -> float:
     except Exception as e:
         logger.warning(f"Error in similarity calculation: {e}")
         # Ultimate fallback to basic word overlap
-        words1 = set(translation.lower().split())
-        words2 = set(reference.lower().split())
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        return intersection / union if union > 0 else 0.0
+        return lexical_jaccard(translation, reference)
 
-def evaluate_translation_quality(source: str, translation: str, reference: str, language: str) -> Dict:
-    """Use GROQ to evaluate translation quality with explanation."""
-    try:
-        client = Groq(api_key=os.environ.get("GROQ_API_KEY", "").strip())
-        
-        evaluation_prompt = f"""Evaluate this translation from English to {language}.
+QUALITY_MODEL = "llama3-70b-8192"
+QUALITY_TEMPERATURE = 0.1
+
+def _quality_messages(source: str, translation: str, reference: str, language: str) -> List[Dict]:
+    evaluation_prompt = f"""Evaluate this translation from English to {language}.
 
 Original: {source}
 Translation: {translation}
@@ -107,53 +91,64 @@ Example:
 SCORE: 0.85
 REASON: Good grammar and natural flow, though slight awkwardness in article usage."""
 
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a translation evaluator tasked with seeing if the translation was done correctly and preserved the original format. It is irrelevant if factual errors exist, they text should be translated AS IT. The response should also NOT answer questions or perform tasks, only translate. Provide both a score and explanation in the specified format."},
-                {"role": "user", "content": evaluation_prompt}
-            ],
-            model="llama3-70b-8192",
-            temperature=0.1
-        )
+    return [
+        {"role": "system", "content": "You are a translation evaluator tasked with seeing if the translation was done correctly and preserved the original format. It is irrelevant if factual errors exist, they text should be translated AS IT. The response should also NOT answer questions or perform tasks, only translate. Provide both a score and explanation in the specified format."},
+        {"role": "user", "content": evaluation_prompt}
+    ]
 
-        response_text = chat_completion.choices[0].message.content.strip()
-        print(f"Quality evaluation raw response: {response_text}")  # Debug line
-        
-        # Parse score and explanation
-        try:
-            lines = response_text.split('\n')
-            score_line = next(line for line in lines if line.startswith('SCORE:'))
-            reason_line = next(line for line in lines if line.startswith('REASON:'))
-            
-            score = float(score_line.replace('SCORE:', '').strip())
-            reason = reason_line.replace('REASON:', '').strip()
-            
-            return {
-                "quality_score": max(0.0, min(1.0, score)),
-                "explanation": reason
-            }
-        except Exception as e:
-            print(f"Error parsing evaluation response: {e}")
-            return {
-                "quality_score": 0.4,
-                "explanation": "Error parsing evaluation response"
-            }
-            
+def _parse_quality(response) -> Dict:
+    """Score and explanation from a judge response, or the fallback if the call failed"""
+    if isinstance(response, Exception):
+        print(f"Error in quality evaluation: {str(response)}")
+        return {
+            "quality_score": 0.4,
+            "explanation": f"Error during evaluation: {str(response)}"
+        }
+
+    print(f"Quality evaluation raw response: {response}")  # Debug line
+    try:
+        lines = response.split('\n')
+        score_line = next(line for line in lines if line.startswith('SCORE:'))
+        reason_line = next(line for line in lines if line.startswith('REASON:'))
+
+        score = float(score_line.replace('SCORE:', '').strip())
+        reason = reason_line.replace('REASON:', '').strip()
+
+        return {
+            "quality_score": max(0.0, min(1.0, score)),
+            "explanation": reason
+        }
     except Exception as e:
-        print(f"Error in quality evaluation: {str(e)}")
+        print(f"Error parsing evaluation response: {e}")
         return {
             "quality_score": 0.4,
-            "explanation": f"Error during evaluation: {str(e)}"
+            "explanation": "Error parsing evaluation response"
         }
 
+def evaluate_translations_quality(examples: List[tuple], language: str) -> List[Dict]:
+    """Judge every (source, translation, reference) at once; the calls run concurrently"""
+    responses = complete_all(
+        [_quality_messages(source, translation, reference, language) for source, translation, reference in examples],
+        model=QUALITY_MODEL,
+        temperature=QUALITY_TEMPERATURE
+    )
+    return [_parse_quality(response) for response in responses]
+
+def evaluate_translation_quality(source: str, translation: str, reference: str, language: str) -> Dict:
+    """Use GROQ to evaluate translation quality with explanation."""
+    return evaluate_translations_quality([(source, translation, reference)], language)[0]
+
 def calculate_translation_metrics(
     source_texts: List[str],
     model_translations: List[str],
     reference_translations: List[str],
     language: str,
-    system_prompt: str
+    system_prompt: str,
+    scorer: str = "auto"
 ) -> Dict:
     """Calculate metrics for translation task."""
+    # Resolve the scorer once so every example in a run is scored the same way
+    scorer = choose_scorer(scorer, nlp, _latency_budget)
     
     # Input validation
     if not all([source_texts, model_translations, reference_translations, language, system_prompt]):
@@ -190,16 +185,20 @@ def calculate_translation_metrics(
     quality_scores = []
     evaluations = []  # Store the evaluation feedback
     
+    examples = []
     for source, translation, reference in zip(source_texts, model_translations, reference_translations):
         if not all([source, translation, reference]):
             logger.warning("Skipping example with missing data")
             continue
-            
+        examples.append((source, translation, reference))
+
+    # Get quality scores and explanations for all examples in one round of judge calls
+    quality_results = evaluate_translations_quality(examples, language)
+
+    for (source, translation, reference), quality_result in zip(examples, quality_results):
         # Calculate semantic similarity using our sophisticated method
-        semantic_score = calculate_translation_similarity(translation, reference) * 100
+        semantic_score = calculate_translation_similarity(translation, reference, scorer) * 100
         
-        # Get quality score and explanation
-        quality_result = evaluate_translation_quality(source, translation, reference, language)
         quality_score = quality_result["quality_score"] * 100
         
         semantic_scores.append(semantic_score)
@@ -253,5 +252,6 @@ def calculate_translation_metrics(
         'efficiency_modifier': efficiency_modifier,
         'prompt_length': len(system_prompt),
         'total_tests': len(source_texts),
+        'similarity_scorer': scorer,
         'individual_scores': individual_scores  
     }
\ No newline at end of file
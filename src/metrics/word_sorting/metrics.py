@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from ..utils import (
     extract_relevant_words,
     calculate_kendall_tau_distance,
@@ -6,16 +6,18 @@ from ..utils import (
     format_percentage
 )
 
-def calculate_word_sorting_metrics(expected_outputs: List[str], model_predictions: List[str], prompt: str) -> Dict:
+def calculate_word_sorting_metrics(expected_outputs: List[str], model_predictions: List[str], prompt: str,
+                                   expected_words: Optional[List[List[str]]] = None) -> Dict:
+    """`expected_words` are the pre-split targets from the dataset's target_words column, when available."""
     individual_scores = []
     all_exact_matches = []
     all_word_accuracies = []
     all_order_distances = []
 
     # Calculate individual scores FIRST
-    for exp, pred in zip(expected_outputs, model_predictions):
+    for i, (exp, pred) in enumerate(zip(expected_outputs, model_predictions)):
         processed_pred = extract_relevant_words(pred, exp)
-        exp_words = exp.strip().split()
+        exp_words = expected_words[i] if expected_words else exp.strip().split()
         pred_words = processed_pred.split()
         
         # Per-example calculations
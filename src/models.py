@@ -1,8 +1,88 @@
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import time
 from flask_sqlalchemy import SQLAlchemy
+from src.submission_codec import blob_dictionary_id, decode_json, dereference_inputs, encode_json, input_reference
 
 db = SQLAlchemy()
 
+class SubmissionDetails(db.Model):
+    """Large per-submission payloads, kept out of the hot leaderboard table"""
+    entry_id = db.Column(db.Integer, db.ForeignKey('leaderboard_entry.id', ondelete='CASCADE'), primary_key=True)
+    system_prompt = db.Column(db.Text)
+    # zlib-compressed JSON (src.submission_codec), read through LeaderboardEntry's properties
+    predictions_data = db.Column(db.LargeBinary)
+    # Inputs are a reference into the dataset when it reproduces them exactly, else compressed inline
+    inputs_ref = db.Column(db.JSON)
+    inputs_data = db.Column(db.LargeBinary)
+    # Evaluation settings, metrics and per-example scores, reused for identical seeded resubmissions
+    result_data = db.Column(db.LargeBinary)
+
+class CompressionDictionary(db.Model):
+    """Preset zlib dictionaries for submission payloads; rows are never changed once written"""
+    id = db.Column(db.Integer, primary_key=True)
+    dataset_type = db.Column(db.String(50), nullable=False, index=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Dictionaries by id (immutable) and the newest id per dataset (rechecked every DICTIONARY_TTL seconds)
+DICTIONARY_TTL = 300
+_dictionaries: Dict[int, bytes] = {0: b''}
+_current_dictionary: Dict[str, Tuple[float, int]] = {}
+
+def dictionary_data(dictionary_id: int) -> bytes:
+    if dictionary_id not in _dictionaries:
+        dictionary = db.session.get(CompressionDictionary, dictionary_id)
+        if dictionary is None:
+            raise ValueError(f"Compression dictionary {dictionary_id} is missing; "
+                             f"payloads written with it can't be decoded")
+        _dictionaries[dictionary_id] = dictionary.data
+    return _dictionaries[dictionary_id]
+
+def current_dictionary(dataset_type: str, refresh: bool = False) -> int:
+    checked = _current_dictionary.get(dataset_type)
+    if refresh or checked is None or time.monotonic() - checked[0] > DICTIONARY_TTL:
+        latest = db.session.query(db.func.max(CompressionDictionary.id)).filter_by(dataset_type=dataset_type).scalar()
+        checked = (time.monotonic(), latest or 0)
+        _current_dictionary[dataset_type] = checked
+    return checked[1]
+
+def encode_payload(dataset_type: str, value):
+    if value is None:
+        return None
+    dictionary_id = current_dictionary(dataset_type)
+    return encode_json(value, dictionary_id, dictionary_data(dictionary_id))
+
+def decode_payload(blob):
+    if blob is None:
+        return None
+    return decode_json(blob, dictionary_data(blob_dictionary_id(blob)))
+
+def _details(entry):
+    if entry.details is None:
+        entry.details = SubmissionDetails()
+    return entry.details
+
+def _detail_field(name):
+    """Proxy an attribute to the entry's SubmissionDetails row, creating it on first write"""
+    def getter(self):
+        return getattr(self.details, name) if self.details is not None else None
+
+    def setter(self, value):
+        setattr(_details(self), name, value)
+
+    return property(getter, setter)
+
+def _compressed_detail_field(name):
+    """Like _detail_field, for a JSON value stored compressed with the dataset's current dictionary"""
+    def getter(self):
+        return decode_payload(getattr(self.details, name)) if self.details is not None else None
+
+    def setter(self, value):
+        setattr(_details(self), name, encode_payload(self.dataset_type, value))
+
+    return property(getter, setter)
+
 class LeaderboardEntry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     dataset_type = db.Column(db.String(50), nullable=False)
@@ -26,18 +106,71 @@ class LeaderboardEntry(db.Model):
     target_language = db.Column(db.String(10))
     
     # General columns
-    system_prompt = db.Column(db.Text)
     is_production = db.Column(db.Boolean, default=False)
-    raw_predictions = db.Column(db.JSON)
-    inputs_used = db.Column(db.JSON)
     
+    # Prompt, predictions and inputs live in submission_details and are only
+    # loaded when accessed (to_dict(include_private=True))
+    details = db.relationship(SubmissionDetails, uselist=False, lazy='select', cascade='all, delete-orphan')
+    system_prompt = _detail_field('system_prompt')
+    raw_predictions = _compressed_detail_field('predictions_data')
+    result = _compressed_detail_field('result_data')
+    
+    # SHA-256 of the whitespace-normalized system prompt
+    prompt_hash = db.Column(db.String(64))
+    # Earlier entry by someone else whose prompt this one nearly copies (see src.prompt_index)
+    near_clone_of = db.Column(db.Integer)
+    # Entry whose stored result this one reused (identical seeded resubmission); its
+    # predictions and inputs are read from there instead of being stored again
+    reused_from = db.Column(db.Integer)
+    
+    # Sampling columns (seed + dataset positions of the examples used)
+    sample_seed = db.Column(db.Integer)
+    example_ids = db.Column(db.JSON)
+    
+    # Leaderboard reads filter by board and order by score desc; these let them
+    # stop after the first rows instead of sorting the whole partition
+    __table_args__ = (
+        db.Index('ix_leaderboard_entry_board_score', dataset_type, is_production, score.desc()),
+        db.Index('ix_leaderboard_entry_language_score', dataset_type, is_production, target_language, score.desc()),
+        # Filters of the paginated leaderboard API
+        db.Index('ix_leaderboard_entry_name_score', dataset_type, is_production, name, score.desc()),
+        db.Index('ix_leaderboard_entry_board_timestamp', dataset_type, is_production, timestamp),
+        db.Index('ix_leaderboard_entry_prompt_hash', dataset_type, prompt_hash),
+        # Id-ordered scans of a board (exports, near-duplicate index catch-up)
+        db.Index('ix_leaderboard_entry_board_id', dataset_type, is_production, id),
+    )
+    
+    @property
+    def payload_entry(self) -> 'LeaderboardEntry':
+        """The entry holding this one's predictions and inputs: its reuse source, if any, else itself"""
+        if self.reused_from is None:
+            return self
+        return db.session.get(LeaderboardEntry, self.reused_from) or self
+
+    @property
+    def inputs_used(self) -> Optional[List]:
+        if self.details is None:
+            return None
+        if self.details.inputs_ref is not None:
+            return dereference_inputs(self.dataset_type, self.details.inputs_ref)
+        return decode_payload(self.details.inputs_data)
+
+    def store_inputs(self, inputs: Optional[List], example_ids: Optional[List[int]]):
+        """Save the inputs a submission used, by reference when a retained dataset version reproduces them"""
+        if inputs is None:
+            return
+        details = _details(self)
+        details.inputs_ref = input_reference(self.dataset_type, example_ids, inputs)
+        details.inputs_data = encode_payload(self.dataset_type, inputs) if details.inputs_ref is None else None
+
     def to_dict(self, include_private=False):
         """Convert entry to dictionary, optionally including private data"""
         base_data = {
             'name': self.name,
             'score': self.score,
             'prompt_length': self.prompt_length,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'near_clone': self.near_clone_of is not None
         }
         
         # Add dataset-specific metrics
@@ -68,10 +201,28 @@ class LeaderboardEntry(db.Model):
             })
         
         if include_private:
+            payload = self.payload_entry
             base_data.update({
                 'system_prompt': self.system_prompt,
-                'raw_predictions': self.raw_predictions,
-                'inputs_used': self.inputs_used
+                'raw_predictions': payload.raw_predictions,
+                'inputs_used': payload.inputs_used,
+                'sample_seed': self.sample_seed,
+                'example_ids': self.example_ids,
+                'reused_from': self.reused_from
             })
             
-        return base_data
\ No newline at end of file
+        return base_data
+
+class LeaderboardTop(db.Model):
+    """
+    The current best entries of each board, maintained by the insert path so
+    leaderboard reads never sort the full history. target_language '' is the
+    all-languages board.
+    """
+    dataset_type = db.Column(db.String(50), primary_key=True)
+    is_production = db.Column(db.Boolean, primary_key=True)
+    target_language = db.Column(db.String(10), primary_key=True, default='')
+    entry_id = db.Column(db.Integer, db.ForeignKey('leaderboard_entry.id', ondelete='CASCADE'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+    
+    entry = db.relationship(LeaderboardEntry, lazy='joined')
@@ -0,0 +1,187 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import os
+import threading
+import time
+import numpy as np
+
+# 64 MinHash values split into 16 bands of 4: prompts with Jaccard similarity
+# around 0.5 collide in some band about half the time, above 0.8 almost always
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5  # characters
+
+# Newly committed entries from other workers are picked up at most this often,
+# and the whole index is reloaded from the database after REBUILD_INTERVAL
+SYNC_INTERVAL = float(os.environ.get('PROMPT_INDEX_SYNC_INTERVAL', 5))  # seconds
+REBUILD_INTERVAL = float(os.environ.get('PROMPT_INDEX_REBUILD_INTERVAL', 3600))  # seconds
+
+# Multiply-shift hash family; fixed seed so signatures agree across processes
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(0, np.iinfo(np.uint64).max, size=NUM_PERM, dtype=np.uint64, endpoint=True) | np.uint64(1)
+_B = _rng.integers(0, np.iinfo(np.uint64).max, size=NUM_PERM, dtype=np.uint64, endpoint=True)
+_SHIFT = np.uint64(32)
+
+
+def shingles(prompt: str) -> np.ndarray:
+    """Distinct character 5-grams of the lowercased, whitespace-normalized prompt, packed into integers"""
+    data = np.frombuffer(' '.join(prompt.lower().split()).encode('utf-8'), dtype=np.uint8)
+    if not data.size:
+        return np.empty(0, dtype=np.uint64)
+    if data.size < SHINGLE_SIZE:
+        data = np.pad(data, (0, SHINGLE_SIZE - data.size))
+    data = data.astype(np.uint64)
+    count = data.size - SHINGLE_SIZE + 1
+    packed = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        packed |= data[offset:offset + count] << np.uint64(8 * offset)
+    return np.unique(packed)
+
+
+def signature(prompt: str) -> Optional[np.ndarray]:
+    """MinHash signature of a prompt, or None if it has no text"""
+    values = shingles(prompt)
+    if not values.size:
+        return None
+    # uint64 arithmetic wraps, which is the mod 2**64 the hash family needs
+    hashed = (_A[:, None] * values[None, :] + _B[:, None]) >> _SHIFT
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def _band_keys(sig: np.ndarray) -> List[bytes]:
+    return [band.tobytes() for band in sig.reshape(BANDS, ROWS)]
+
+
+class MinHashLSH:
+    """
+    Banded LSH over MinHash signatures. Signatures are rows of one growing
+    array; each band maps its 4 values to the rows that share them, so a query
+    only scores the rows it collides with.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._signatures = np.empty((capacity, NUM_PERM), dtype=np.uint32)
+        self.ids: List[int] = []
+        self.names: List[str] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, entry_id: int, name: str, sig: np.ndarray):
+        row = len(self.ids)
+        if row == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[row] = sig
+        self.ids.append(entry_id)
+        self.names.append(name)
+        for band, key in enumerate(_band_keys(sig)):
+            self._buckets[band].setdefault(key, []).append(row)
+
+    def query(self, sig: np.ndarray, threshold: float, limit: int) -> List[Tuple[int, str, float]]:
+        """(entry_id, name, estimated Jaccard similarity), most similar first, earliest first on ties"""
+        rows = set()
+        for band, key in enumerate(_band_keys(sig)):
+            rows.update(self._buckets[band].get(key, ()))
+        if not rows:
+            return []
+        rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        similarities = (self._signatures[rows] == sig).mean(axis=1)
+        keep = similarities >= threshold
+        rows, similarities = rows[keep], similarities[keep]
+        order = np.lexsort((rows, -similarities))[:limit]
+        return [(self.ids[row], self.names[row], float(similarities[row_index]))
+                for row_index, row in zip(order, rows[order])]
+
+
+class _Board:
+    def __init__(self, built_at: float):
+        self.lsh = MinHashLSH()
+        self.last_id = 0
+        self.built_at = built_at
+        self.synced_at = 0.0
+
+
+class PromptIndex:
+    """
+    Per-dataset MinHashLSH indexes of stored system prompts, built in-process
+    from the database (at warm-up, or on first use).
+
+    load_rows(dataset_type, after_id) yields (entry_id, name, system_prompt) in
+    id order; sync() uses it to catch up on entries committed since the last
+    id seen, and add() indexes this worker's own inserts as they commit.
+    Entries whose ids commit out of order are picked up by the periodic rebuild.
+    Rows are loaded and hashed without holding the lock, so queries keep using
+    the current index while one thread catches up or rebuilds it.
+    """
+
+    def __init__(self, load_rows: Callable[[str, int], Iterable[Tuple[int, str, str]]],
+                 sync_interval: float = SYNC_INTERVAL, rebuild_interval: float = REBUILD_INTERVAL):
+        self.load_rows = load_rows
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._boards: Dict[str, _Board] = {}
+        self._loading: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def sync(self, dataset_type: str, force: bool = False) -> _Board:
+        now = time.monotonic()
+        with self._lock:
+            board = self._boards.get(dataset_type)
+            rebuild = board is None or now - board.built_at > self.rebuild_interval
+            if dataset_type in self._loading or (
+                    not rebuild and not force and now - board.synced_at < self.sync_interval):
+                # Another thread is loading this board; answer from what is indexed so far
+                return board if board is not None else _Board(now)
+            self._loading.add(dataset_type)
+            target = _Board(now) if rebuild else board
+            after_id = target.last_id
+        try:
+            loaded = [(entry_id, name, signature(prompt))
+                      for entry_id, name, prompt in self.load_rows(dataset_type, after_id) if prompt]
+            with self._lock:
+                for entry_id, name, sig in loaded:
+                    self._add(target, entry_id, name, sig)
+                target.synced_at = now
+                self._boards[dataset_type] = target
+        finally:
+            with self._lock:
+                self._loading.discard(dataset_type)
+        return target
+
+    def add(self, dataset_type: str, entry_id: int, name: str, prompt: Optional[str]):
+        sig = signature(prompt or '')
+        with self._lock:
+            board = self._boards.get(dataset_type)
+            if board is not None:
+                self._add(board, entry_id, name, sig)
+
+    def _add(self, board: _Board, entry_id: int, name: str, sig: Optional[np.ndarray]):
+        if entry_id <= board.last_id:
+            return  # already loaded by sync
+        if sig is not None:
+            board.lsh.add(entry_id, name, sig)
+        board.last_id = entry_id
+
+    def similar(self, dataset_type: str, prompt: str, threshold: float, limit: int,
+                sync: bool = True) -> List[Tuple[int, str, float]]:
+        """Indexed entries whose prompts are at least threshold similar; sync=False only reads what is loaded"""
+        sig = signature(prompt or '')
+        if sig is None:
+            return []
+        if sync:
+            board = self.sync(dataset_type)
+        else:
+            with self._lock:
+                board = self._boards.get(dataset_type)
+            if board is None:
+                return []
+        with self._lock:
+            return board.lsh.query(sig, threshold, limit)
+
+    def reset(self, dataset_type: Optional[str] = None):
+        with self._lock:
+            if dataset_type is None:
+                self._boards.clear()
+            else:
+                self._boards.pop(dataset_type, None)
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import threading
+
+BASE_DIR = Path(__file__).parent.parent
+CACHE_DIR = Path(os.environ.get('DATASET_CACHE_DIR', BASE_DIR / 'data' / '.cache'))
+URL_INDEX = 'urls.json'
+
+_lock = threading.Lock()
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    tmp_path.replace(path)
+
+
+def _load_url_index(cache_dir: Path) -> dict:
+    try:
+        with open(cache_dir / URL_INDEX) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _cached_blob(cache_dir: Path, digest: str) -> Optional[bytes]:
+    """Return the blob stored under digest if it is present and intact."""
+    try:
+        with open(cache_dir / f"{digest}.blob", 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    return data if hashlib.sha256(data).hexdigest() == digest else None
+
+
+def fetch_bytes(url: str, cache_dir: Path = CACHE_DIR, refresh: bool = False) -> bytes:
+    """
+    Fetch a remote file through a local content-addressed cache.
+
+    Blobs are stored under the SHA-256 of their content and a small url -> digest
+    index records which blob a URL resolved to, so repeated calls (and identical
+    content behind different URLs) never hit the network or the disk twice.
+    """
+    with _lock:
+        if not refresh:
+            digest = _load_url_index(cache_dir).get(url)
+            if digest:
+                data = _cached_blob(cache_dir, digest)
+                if data is not None:
+                    return data
+
+        import requests  # only needed on a cache miss
+
+        print(f"DEBUG: Downloading {url}")
+        response = requests.get(url, timeout=60)
+        response.raise_for_status()
+        data = response.content
+        digest = hashlib.sha256(data).hexdigest()
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        if _cached_blob(cache_dir, digest) is None:
+            _write_atomic(cache_dir / f"{digest}.blob", data)
+        index = _load_url_index(cache_dir)
+        index[url] = digest
+        _write_atomic(cache_dir / URL_INDEX, json.dumps(index, indent=2).encode('utf-8'))
+        return data
+
+
+def fetch_json(url: str, cache_dir: Path = CACHE_DIR, refresh: bool = False) -> Any:
+    return json.loads(fetch_bytes(url, cache_dir, refresh))
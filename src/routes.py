@@ -1,13 +1,10 @@
-from flask import Flask, Blueprint, request, jsonify, render_template, send_from_directory, current_app
+from flask import Flask, Blueprint, Response, request, jsonify, render_template, stream_with_context
 import requests
-from .models import db, LeaderboardEntry
-from groq import Groq
 import datetime
 from flask.cli import click
 from pathlib import Path 
-import random
+import hmac
 import json
-import os
 from src.config import get_config
 from src.metrics import (
     calculate_word_sorting_metrics,
@@ -22,25 +19,54 @@ from src.metrics.utils import (
     calculate_kendall_tau_distance
 )
 from src.dataset_manager import DatasetManager
+from src.warmup import memory_report
+from src.static_cache import PayloadCache, file_version, load_json_file, payload_response
+from src.leaderboard import (
+    LEADERBOARD_SIZE,
+    RANK_NEIGHBOURS,
+    find_cached_result,
+    leaderboard_payload,
+    parse_fields,
+    query_leaderboard,
+    rank_entry,
+    similar_entries,
+    submit_entry
+)
+from src.leaderboard_export import EXPORT_FORMATS, export_chunks
+from src.leaderboard_stats import leaderboard_stats
+from src.llm_client import complete, complete_all
+from src.submission_codec import compact_result, expand_result, inputs_fingerprint, set_input_resolver
 # Create blueprint
 api = Blueprint('api', __name__)
 
-# Add this near the top with other constants
-IS_PRODUCTION = os.environ.get('GAE_ENV', '').startswith('standard')
-
 # Get configuration
 config = get_config()
 
 # Initialize dataset manager
 dataset_manager = DatasetManager()
+# Stored submissions reference dataset examples instead of copying their inputs
+set_input_resolver(dataset_manager.resolve_inputs, dataset_manager.dataset_version)
+
+# Serialized + gzipped JSON payloads for static data endpoints
+payload_cache = PayloadCache()
 
 def float_convert(value):
     if hasattr(value, 'item'):  # Check if it's a numpy type
         return value.item()
     return float(value) if value is not None else 0.
 
-def initialize_groq_client():
-    return Groq(api_key=os.environ.get("GROQ_API_KEY", "").strip())
+def parse_seed(value):
+    """Validate an optional sampling seed supplied by the client"""
+    if value is None:
+        return None
+    seed = int(value)
+    if not 0 <= seed < 2 ** 31:
+        raise ValueError("seed must be between 0 and 2147483647")
+    return seed
+
+def sample_info(dataset):
+    """Seed and example ids of a sampled dataset, for responses and leaderboard entries"""
+    return {'seed': dataset['seed'], 'example_ids': dataset['example_ids']}
 
 @api.route('/')
 def home():
@@ -48,8 +74,16 @@ def home():
 
 @api.route('/config/datasets.json', methods=['GET'])
 def serve_datasets_json():
-    config_directory = os.path.join(os.getcwd(), 'config')
-    return send_from_directory(config_directory, 'datasets.json')
+    # Serve the validated config the dataset manager is using, not the raw file
+    version, config_snapshot = dataset_manager.config_snapshot()
+    payload = payload_cache.get('datasets_config', version, lambda: config_snapshot)
+    return payload_response(payload)
+
+@api.route('/api/health/memory', methods=['GET'])
+def worker_memory():
+    if not is_admin_request():
+        return jsonify({'error': 'Memory reports require an admin token'}), 403
+    return jsonify(memory_report())
 
 @api.route('/leaderboard')
 def leaderboard_page():
@@ -62,86 +96,143 @@ def add_leaderboard_entry(dataset_type):
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        metrics = data['metrics']
-        
-        # Create new entry
-        new_entry = LeaderboardEntry(
-            dataset_type=dataset_type,
-            name=data.get('name', 'Anonymous'),
-            prompt_length=metrics.get('prompt_length_chars', metrics.get('prompt_length', 0)),
-            is_production=IS_PRODUCTION,  # Keep this to differentiate environments
-            system_prompt=data.get('system_prompt'),
-            raw_predictions=data.get('raw_predictions'),
-            inputs_used=data.get('inputs_used')
-        )
-
-        if dataset_type == "word_sorting":
-            efficiency = float(metrics.get('efficiency_modifier', 0)) * 100
-            new_entry.score = float(metrics.get('combined_score', 0))
-            new_entry.accuracy = float(metrics.get('accuracy', 0))
-            new_entry.word_accuracy = float(metrics.get('word_accuracy', 0))
-            new_entry.efficiency = efficiency
-
-        elif dataset_type == "text_summarization":
-            new_entry.score = float(metrics.get('final_score', 0))
-            new_entry.similarity = float(metrics.get('similarity', 0))
-            new_entry.length_penalty_avg = float(metrics.get('length_penalty_avg', 0))
-            new_entry.prompt_efficiency = float(metrics.get('prompt_efficiency', 0))
-
-        elif dataset_type == "causal_judgement":
-            new_entry.score = float(metrics.get('final_score', 0))
-            new_entry.accuracy = float(metrics.get('accuracy', 0))
-            new_entry.base_accuracy = float(metrics.get('base_accuracy', 0))
-            new_entry.efficiency = float(metrics.get('efficiency', 0))
-
-        elif dataset_type == "translation_task":
-            new_entry.score = float(metrics.get('final_score', 0))
-            new_entry.semantic_similarity = float(metrics.get('semantic_similarity', 0))
-            new_entry.language_quality = float(metrics.get('language_quality', 0))
-            new_entry.efficiency = float(metrics.get('efficiency', 0))
-            new_entry.target_language = request.json.get('target_language', '')
-
-        
-
-        db.session.add(new_entry)
-        db.session.commit()
-        print(f"Added entry ID: {new_entry.id} for {dataset_type}")
-        
+        submit_entry(dataset_type, data)
         return jsonify({'success': True})
         
     except Exception as e:
         print("Error in add_leaderboard_entry:", str(e))
-        db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+def board_error(dataset_type, target_language=None):
+    """An error response for a board that doesn't exist (unknown dataset or language), else None"""
+    dataset = dataset_manager.config.get(dataset_type)
+    if dataset is None:
+        return jsonify({'error': f"Unknown dataset type: {dataset_type}"}), 404
+    if target_language and target_language not in dataset.get('languages', []):
+        return jsonify({'error': f"Unknown target language for {dataset_type}: {target_language}"}), 400
+    return None
+
 @api.route('/api/leaderboard/<dataset_type>', methods=['GET'])
 def get_leaderboard(dataset_type):
+    # Unknown boards are rejected before they reach the cache, which keeps one file per key
+    error = board_error(dataset_type, request.args.get('target_language'))
+    if error:
+        return error
+
+    # Board views (optionally per language) get the cached top entries; paging/filters query the database
+    if set(request.args) <= {'target_language'}:
+        try:
+            payload = leaderboard_payload(dataset_type, request.args.get('target_language', ''))
+            return Response(payload, mimetype='application/json')
+        except Exception as e:
+            print(f"Error getting leaderboard: {str(e)}")
+            return jsonify([])
+
     try:
-        entries = LeaderboardEntry.query.filter_by(
-            dataset_type=dataset_type,
-            is_production=IS_PRODUCTION
-        ).order_by(
-            LeaderboardEntry.score.desc()
-        ).limit(20).all()
-        
-        return jsonify([entry.to_dict() for entry in entries])
+        since = request.args.get('since')
+        until = request.args.get('until')
+        entries, next_cursor = query_leaderboard(
+            dataset_type,
+            limit=request.args.get('limit', LEADERBOARD_SIZE, type=int),
+            cursor=request.args.get('cursor'),
+            target_language=request.args.get('target_language'),
+            since=datetime.datetime.fromisoformat(since) if since else None,
+            until=datetime.datetime.fromisoformat(until) if until else None,
+            name=request.args.get('name'),
+            fields=parse_fields(request.args.get('fields'))
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error getting leaderboard: {str(e)}")
         return jsonify([])
 
+    # The body stays a plain list; the cursor for the next page travels in a header
+    response = jsonify(entries)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def is_admin_request():
+    """Whether the request carries the ADMIN_TOKEN as a bearer token (never true if no token is configured)"""
+    if not config.ADMIN_TOKEN:
+        return False
+    auth = request.headers.get('Authorization', '')
+    return auth.startswith('Bearer ') and hmac.compare_digest(auth[len('Bearer '):], config.ADMIN_TOKEN)
+
+@api.route('/api/leaderboard/<dataset_type>/export', methods=['GET'])
+def export_leaderboard(dataset_type):
+    """Stream every entry of a dataset as CSV or JSON lines, in constant memory"""
+    export_format = request.args.get('format', 'csv')
+    include_private = request.args.get('private', 'false').lower() == 'true'
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    if include_private and not is_admin_request():
+        return jsonify({'error': 'Private fields require an admin token'}), 403
+
+    chunks = export_chunks(dataset_type, export_format, include_private)
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{dataset_type}.{export_format}"'
+    return response
+
+@api.route('/api/leaderboard/<dataset_type>/rank', methods=['GET'])
+def get_leaderboard_rank(dataset_type):
+    """Where a score places on a board, with its neighbours"""
+    error = board_error(dataset_type, request.args.get('target_language'))
+    if error:
+        return error
+    try:
+        score = request.args.get('score', type=float)
+        if score is None:
+            raise ValueError("score is required")
+        return jsonify(rank_entry(
+            dataset_type,
+            score,
+            target_language=request.args.get('target_language'),
+            neighbours=request.args.get('neighbours', RANK_NEIGHBOURS, type=int)
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error getting leaderboard rank: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def submission_rank(dataset_type, entry):
+    """Rank of a just-submitted entry for the test response (None if it couldn't be saved)"""
+    if entry is None or entry.score is None:
+        return None
+    try:
+        return rank_entry(dataset_type, entry.score, entry_id=entry.id,
+                          target_language=entry.target_language)
+    except Exception as e:
+        print(f"Error ranking submission: {str(e)}")
+        return None
+
+@api.route('/api/leaderboard/<dataset_type>/stats', methods=['GET'])
+def get_leaderboard_stats(dataset_type):
+    """Score, prompt length and metric distributions of a board, aggregated in the database"""
+    error = board_error(dataset_type, request.args.get('target_language'))
+    if error:
+        return error
+    try:
+        payload = leaderboard_stats(dataset_type, request.args.get('target_language', ''))
+        return Response(payload, mimetype='application/json')
+    except Exception as e:
+        print(f"Error getting leaderboard stats: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @api.route('/api/complex_practice', methods=['GET'])
 def get_complex_practice_data():
+    return serve_data_file('complex_practice.json')
+
+def serve_data_file(file_name):
+    """Serve a JSON file from the data directory via the payload cache"""
     try:
-        # Path to the JSON file
-        json_path = os.path.join(os.getcwd(), 'data', 'complex_practice.json')
-        
-        # Load the data from the file
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-        
-        return jsonify(data)
+        json_path = dataset_manager.data_dir / file_name
+        payload = payload_cache.get(file_name, file_version(json_path), load_json_file(json_path))
+        return payload_response(payload)
     except Exception as e:
-        print(f"Error loading complex practice data: {str(e)}")
+        print(f"Error loading {file_name}: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @api.route('/api/pretest', methods=['POST'])
@@ -151,9 +242,11 @@ def pretest():
         show_details = request.json.get('show_details', False)
         target_language = request.json.get('target_language', None)
         system_prompt = request.json.get('system_prompt', '')
+        scorer = request.json.get('scorer', 'auto')
+        seed = parse_seed(request.json.get('seed'))
 
         # Load dataset
-        dataset = dataset_manager.load_dataset(dataset_type, mode="practice")
+        dataset = dataset_manager.load_dataset(dataset_type, mode="practice", seed=seed)
         if dataset is None:
             return jsonify({'error': 'Failed to load dataset'}), 400
 
@@ -161,9 +254,6 @@ def pretest():
         if not config.GROQ_API_KEY:
             return jsonify({'error': 'GROQ_API_KEY not found'}), 400
 
-        # Initialize the Groq client
-        client = initialize_groq_client()
-
         # Handle "complex_transformation" dataset type
         if dataset_type == "complex_transformation":
             if 'examples' not in dataset:
@@ -183,16 +273,11 @@ def pretest():
                     print(f"DEBUG - Combined input for Turn 3: {combined_input}")
 
                     # Send combined input to the model
-                    chat_completion = client.chat.completions.create(
-                        messages=[
-                            {"role": "system", "content": combined_input}
-                        ],
+                    model_response = complete(
+                        [{"role": "system", "content": combined_input}],
                         model=config.MODEL_NAME,
                         temperature=config.TEMPERATURE
                     )
-
-                    # Get model response
-                    model_response = chat_completion.choices[0].message.content.strip()
                     print(f"DEBUG - Turn 3 model response: {model_response}")
 
                     # Evaluate the final output for Turn 3
@@ -228,7 +313,8 @@ def pretest():
                             'completeness': metrics.get('completeness', 0),
                             'format_score': metrics.get('format_score', 0),
                             'explanation': explanation
-                        }]
+                        }],
+                        **sample_info(dataset)
                     }
                     
                     print(f"DEBUG - Sending response data for Turn 3: {response_data}")
@@ -244,13 +330,7 @@ def pretest():
 
                 print(f"DEBUG - Sending messages to GROQ for Turn {turn}: {messages}")
 
-                chat_completion = client.chat.completions.create(
-                    messages=messages,
-                    model=config.MODEL_NAME,
-                    temperature=config.TEMPERATURE
-                )
-                
-                model_response = chat_completion.choices[0].message.content.strip()
+                model_response = complete(messages, model=config.MODEL_NAME, temperature=config.TEMPERATURE)
                 print(f"DEBUG - Got model response for Turn {turn}: {model_response[:100]}...")
                 
                 if not model_response:
@@ -262,7 +342,8 @@ def pretest():
                         'display_reference': inputs[0]['evaluation_reference'],
                         'raw_prediction': model_response,
                         'processed_prediction': model_response
-                    }]
+                    }],
+                    **sample_info(dataset)
                 })
                     
             except Exception as e:
@@ -285,27 +366,21 @@ def pretest():
             inputs = dataset['inputs']
             expected_outputs = dataset['targets']
 
-        # Process each input
-        for i, full_input in enumerate(inputs):
-            try:
-                messages = [{"role": "system", "content": system_prompt}]
-                
-                input_content = full_input['input'] if isinstance(full_input, dict) else full_input
-                messages.append({"role": "user", "content": input_content})
-
-                chat_completion = client.chat.completions.create(
-                    messages=messages,
-                    model=config.MODEL_NAME,
-                    temperature=config.TEMPERATURE
-                )
-                model_response = chat_completion.choices[0].message.content.strip()
-                raw_predictions.append(model_response)
-                model_predictions.append(model_response)
-                inputs_used.append(full_input)
-            except Exception as e:
-                print(f"Error in chat completion {i}: {str(e)}")
+        # Process all inputs concurrently
+        responses = complete_all([
+            [{"role": "system", "content": system_prompt},
+             {"role": "user", "content": full_input['input'] if isinstance(full_input, dict) else full_input}]
+            for full_input in inputs
+        ], model=config.MODEL_NAME, temperature=config.TEMPERATURE)
+        for i, (full_input, model_response) in enumerate(zip(inputs, responses)):
+            if isinstance(model_response, Exception):
+                print(f"Error in chat completion {i}: {str(model_response)}")
                 raw_predictions.append("")
                 model_predictions.append("")
+                continue
+            raw_predictions.append(model_response)
+            model_predictions.append(model_response)
+            inputs_used.append(full_input)
 
         # Get metrics response
         response_data = get_metrics_response(
@@ -315,8 +390,11 @@ def pretest():
             system_prompt=system_prompt,
             inputs_used=inputs_used,
             raw_predictions=raw_predictions,
-            show_details=show_details
+            show_details=show_details,
+            scorer=scorer,
+            expected_words=dataset.get('target_words')
         )
+        response_data.update(sample_info(dataset))
 
         return jsonify(response_data)
 
@@ -326,18 +404,7 @@ def pretest():
 
 @api.route('/api/complex_test', methods=['GET'])
 def get_complex_test_data():
-    try:
-        # Path to the test JSON file
-        json_path = os.path.join(os.getcwd(), 'data', 'complex_test.json')
-        
-        # Load the data from the file
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-        
-        return jsonify(data)
-    except Exception as e:
-        print(f"Error loading complex test data: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+    return serve_data_file('complex_test.json')
 
 @api.route('/api/test_prompt', methods=['POST'])
 def test_prompt():
@@ -348,6 +415,8 @@ def test_prompt():
         target_language = request.json.get('target_language')
         turn = request.json.get('turn', 1)
         previous_outputs = request.json.get('previous_outputs', [])
+        scorer = request.json.get('scorer', 'auto')
+        seed = parse_seed(request.json.get('seed'))
         
         print(f"Debug - Received name: {submitted_name}")
         print(f"Debug - Turn: {turn}")
@@ -356,11 +425,9 @@ def test_prompt():
         if not config.GROQ_API_KEY:
             return jsonify({'error': 'GROQ_API_KEY not found'}), 400
 
-        # Initialize the Groq client
-        client = initialize_groq_client()
-
         # Load dataset using dataset manager with test mode
-        dataset = dataset_manager.load_dataset(dataset_type, mode="test")
+        NUM_EXAMPLES = 10
+        dataset = dataset_manager.load_dataset(dataset_type, mode="test", num_examples=NUM_EXAMPLES, seed=seed)
         if dataset is None:
             return jsonify({'error': 'Failed to load dataset'}), 400
 
@@ -378,15 +445,11 @@ def test_prompt():
                     combined_input = f"{previous_outputs[-1]}\n\n{system_prompt}"
                     print(f"DEBUG - Combined input for Turn 3: {combined_input}")
 
-                    chat_completion = client.chat.completions.create(
-                        messages=[
-                            {"role": "system", "content": combined_input}
-                        ],
+                    model_response = complete(
+                        [{"role": "system", "content": combined_input}],
                         model=config.MODEL_NAME,
                         temperature=config.TEMPERATURE
                     )
-
-                    model_response = chat_completion.choices[0].message.content.strip()
                     print(f"DEBUG - Turn 3 model response: {model_response}")
 
                     # Evaluate final output using full evaluation reference
@@ -412,14 +475,15 @@ def test_prompt():
                             'task_description': example['task_description'],
                             'evaluation_guide': example['evaluation_guide'],
                             'evaluation_reference': example['evaluation_reference']
-                        }]
+                        }],
+                        'sample_seed': dataset['seed'],
+                        'example_ids': dataset['example_ids']
                     }
                     
-                    result = current_app.test_client().post(
-                        f'/api/leaderboard/{dataset_type}',
-                        json=leaderboard_entry
-                    )
-                    print("Debug - Leaderboard save result:", result.data)
+                    try:
+                        submit_entry(dataset_type, leaderboard_entry)
+                    except Exception as e:
+                        print("Debug - Error saving to leaderboard:", str(e))
 
                     # Return final results with complete information
                     return jsonify({
@@ -430,7 +494,8 @@ def test_prompt():
                             'raw_prediction': model_response,
                             'processed_prediction': model_response,
                             'explanation': metrics['individual_scores'][0].get('explanation', '')
-                        }]
+                        }],
+                        **sample_info(dataset)
                     })
 
                 # For Turns 1 and 2, get model response
@@ -441,13 +506,7 @@ def test_prompt():
                         {"role": "user", "content": system_prompt}
                     ])
 
-                chat_completion = client.chat.completions.create(
-                    messages=messages,
-                    model=config.MODEL_NAME,
-                    temperature=config.TEMPERATURE
-                )
-                
-                model_response = chat_completion.choices[0].message.content.strip()
+                model_response = complete(messages, model=config.MODEL_NAME, temperature=config.TEMPERATURE)
                 print(f"DEBUG - Got model response for Turn {turn}: {model_response[:100]}...")
                 
                 # For turns 1 & 2, return display_reference (shorter version)
@@ -457,51 +516,75 @@ def test_prompt():
                         'display_reference': example['display_reference'],
                         'raw_prediction': model_response,
                         'processed_prediction': model_response
-                    }]
+                    }],
+                    **sample_info(dataset)
                 })
                     
             except Exception as e:
                 print(f"DEBUG - Error in complex transformation: {str(e)}")
                 return jsonify({'error': str(e)}), 400
 
-        # Handle non-complex tasks
-        NUM_EXAMPLES = 10
+        # Closest previous submissions, so near-identical prompts show their stored scores
+        similar_submissions = similar_entries(dataset_type, system_prompt)
+
+        # Handle non-complex tasks (the dataset manager has already sampled NUM_EXAMPLES)
         expected_outputs, model_predictions, inputs_used, raw_predictions = [], [], [], []
+        completion_errors = 0
 
         if dataset_type == 'translation_task':
-            all_examples = dataset['examples']
-            selected_indices = random.sample(range(len(all_examples)), NUM_EXAMPLES)
-            
-            for idx in selected_indices:
-                example = all_examples[idx]
+            for example in dataset['examples']:
                 inputs_used.append(example['input'])
                 expected_outputs.append(example['translations'][target_language])
         else:
-            total_examples = len(dataset['inputs'])
-            selected_indices = random.sample(range(total_examples), NUM_EXAMPLES)
-            
-            for idx in selected_indices:
-                inputs_used.append(dataset['inputs'][idx])
-                expected_outputs.append(dataset['targets'][idx])
-
-        # Process each input for non-complex tasks
-        for i, full_input in enumerate(inputs_used):
-            try:
-                chat_completion = client.chat.completions.create(
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": full_input}
-                    ],
-                    model=config.MODEL_NAME,
-                    temperature=config.TEMPERATURE
-                )
-                model_response = chat_completion.choices[0].message.content.strip()
-                raw_predictions.append(model_response)
-                model_predictions.append(model_response)
-            except Exception as e:
-                print(f"Error in chat completion {i}: {str(e)}")
+            inputs_used.extend(dataset['inputs'])
+            expected_outputs.extend(dataset['targets'])
+
+        # Identical prompts resubmitted with the same seed reuse the stored result instead of calling the model.
+        # The sample's content is part of the key: after a dataset edit the same ids select different examples.
+        evaluation = {'model': config.MODEL_NAME, 'temperature': config.TEMPERATURE, 'scorer': scorer,
+                      'sample_sha256': inputs_fingerprint([inputs_used, expected_outputs])}
+        entry_language = target_language if dataset_type == 'translation_task' else None
+        if seed is not None and request.json.get('reuse', True):
+            previous = find_cached_result(dataset_type, system_prompt, seed, dataset['example_ids'],
+                                          entry_language, evaluation)
+            if previous is not None:
+                print(f"Debug - Reusing result of leaderboard entry {previous.id}")
+                # Same sample, so the inputs and expected outputs are this request's own
+                response_data = expand_result(previous.result, inputs_used, expected_outputs,
+                                              previous.raw_predictions)
+                response_data.update(sample_info(dataset))
+                entry = None
+                try:
+                    # The new entry points at the source instead of copying its predictions and inputs
+                    entry = submit_entry(dataset_type, {
+                        'name': submitted_name,
+                        'metrics': response_data['metrics'],
+                        'system_prompt': system_prompt,
+                        'target_language': entry_language,
+                        'sample_seed': seed,
+                        'example_ids': dataset['example_ids'],
+                        'reused_from': previous.id
+                    })
+                except Exception as e:
+                    print("Debug - Error saving to leaderboard:", str(e))
+                return jsonify(dict(response_data, cached=True, similar_submissions=similar_submissions,
+                                    rank=submission_rank(dataset_type, entry)))
+
+        # Process all inputs for non-complex tasks concurrently
+        responses = complete_all([
+            [{"role": "system", "content": system_prompt},
+             {"role": "user", "content": full_input}]
+            for full_input in inputs_used
+        ], model=config.MODEL_NAME, temperature=config.TEMPERATURE)
+        for i, model_response in enumerate(responses):
+            if isinstance(model_response, Exception):
+                print(f"Error in chat completion {i}: {str(model_response)}")
                 raw_predictions.append("")
                 model_predictions.append("")
+                completion_errors += 1
+                continue
+            raw_predictions.append(model_response)
+            model_predictions.append(model_response)
 
         # Get metrics response for non-complex tasks
         response_data = get_metrics_response(
@@ -511,13 +594,21 @@ def test_prompt():
             system_prompt=system_prompt,
             inputs_used=inputs_used,
             raw_predictions=raw_predictions,
-            show_details=True
+            show_details=True,
+            scorer=scorer,
+            expected_words=dataset.get('target_words')
         )
 
         if dataset_type == 'translation_task':
             response_data['metrics']['target_language'] = target_language
-
-        # Save to leaderboard
+        response_data.update(sample_info(dataset))
+
+        # Save to leaderboard; a score with failed (e.g. rate-limited) completions isn't the prompt's
+        entry = None
+        if completion_errors:
+            print(f"Debug - Not saving to leaderboard: {completion_errors} completion(s) failed")
+            response_data['completion_errors'] = completion_errors
+            return jsonify(dict(response_data, similar_submissions=similar_submissions, rank=None))
         try:
             leaderboard_entry = {
                 'name': submitted_name,
@@ -525,30 +616,32 @@ def test_prompt():
                 'system_prompt': system_prompt,
                 'raw_predictions': raw_predictions,
                 'inputs_used': inputs_used,
-                'target_language': target_language if dataset_type == 'translation_task' else None
+                'target_language': entry_language,
+                'sample_seed': dataset['seed'],
+                'example_ids': dataset['example_ids'],
+                'result': compact_result(evaluation, response_data)
             }
             
-            result = current_app.test_client().post(
-                f'/api/leaderboard/{dataset_type}',
-                json=leaderboard_entry
-            )
-            print("Debug - Leaderboard save result:", result.data)
+            entry = submit_entry(dataset_type, leaderboard_entry)
             
         except Exception as e:
             print("Debug - Error saving to leaderboard:", str(e))
 
-        return jsonify(response_data)
+        return jsonify(dict(response_data, similar_submissions=similar_submissions,
+                            rank=submission_rank(dataset_type, entry)))
 
     except Exception as e:
         print("Error in test_prompt:", str(e))
         return jsonify({'error': str(e)}), 400
 
 def get_metrics_response(dataset_type, expected_outputs, model_predictions, system_prompt,
-                       inputs_used, raw_predictions, show_details, task_descriptions=None):
+                       inputs_used, raw_predictions, show_details, task_descriptions=None, scorer='auto',
+                       expected_words=None):
    """Helper function to generate metrics response based on dataset type"""
    try:
        if dataset_type == "word_sorting":
-           metrics = calculate_word_sorting_metrics(expected_outputs, model_predictions, system_prompt)
+           metrics = calculate_word_sorting_metrics(expected_outputs, model_predictions, system_prompt,
+                                                    expected_words)
            examples = [
                {
                    'input': inp,
@@ -600,7 +693,7 @@ def get_metrics_response(dataset_type, expected_outputs, model_predictions, syst
            ] if show_details else []
        
        elif dataset_type == "text_summarization":
-           metrics = calculate_summarization_metrics(expected_outputs, model_predictions, system_prompt)
+           metrics = calculate_summarization_metrics(expected_outputs, model_predictions, system_prompt, scorer=scorer)
            examples = [
                {
                    'input': inp,
@@ -625,7 +718,8 @@ def get_metrics_response(dataset_type, expected_outputs, model_predictions, syst
                model_translations=model_predictions,
                reference_translations=expected_outputs,
                system_prompt=system_prompt,
-               language=request.json.get('target_language')
+               language=request.json.get('target_language'),
+               scorer=scorer
            )
            
            examples = [
@@ -0,0 +1,75 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Tuple
+import gzip
+import hashlib
+import json
+import threading
+from flask import Response, request
+
+
+class Payload(NamedTuple):
+    body: bytes     # serialized JSON
+    gzipped: bytes  # body, gzip-compressed
+    etag: str       # strong ETag of the identity encoding (gzip adds a suffix)
+
+
+class PayloadCache:
+    """
+    Pre-serialized, pre-gzipped JSON payloads. Each entry is keyed by name and
+    rebuilt only when the caller's version stamp (file mtime, config version, ...)
+    changes.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Hashable, Payload]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, version: Hashable, build: Callable[[], Any]) -> Payload:
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            body = json.dumps(build(), ensure_ascii=False, indent=4).encode('utf-8')
+            payload = Payload(
+                body=body,
+                gzipped=gzip.compress(body, mtime=0),
+                etag=hashlib.sha256(body).hexdigest()[:32]
+            )
+            self._entries[name] = (version, payload)
+            return payload
+
+
+def file_version(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_json_file(path: Path) -> Callable[[], Any]:
+    def build():
+        with open(path) as f:
+            return json.load(f)
+    return build
+
+
+def payload_response(payload: Payload) -> Response:
+    """Serve a payload, answering If-None-Match with 304 and gzip-capable clients with the gzipped bytes."""
+    use_gzip = request.accept_encodings['gzip'] > 0
+    etag = f"{payload.etag}-gzip" if use_gzip else payload.etag
+
+    if request.if_none_match.contains(payload.etag) or request.if_none_match.contains(f"{payload.etag}-gzip"):
+        response = Response(status=304)
+    elif use_gzip:
+        response = Response(payload.gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(payload.body, mimetype='application/json')
+
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Always revalidate so clients pick up file changes immediately (a 304 costs no body)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
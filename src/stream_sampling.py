@@ -0,0 +1,178 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+import json
+import random
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _StreamDecoder:
+    """
+    Minimal incremental JSON reader: walks the top-level structure of a document
+    and decodes one value at a time with json.JSONDecoder.raw_decode, keeping
+    only a small window of the file in memory.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = CHUNK_SIZE) -> bool:
+        """Read at least size more characters (fewer at the end of the file)"""
+        if self.eof:
+            return False
+        chunks, read = [], 0
+        while read < size:
+            chunk = self.f.read(max(CHUNK_SIZE, size - read))
+            if not chunk:
+                self.eof = True
+                break
+            chunks.append(chunk)
+            read += len(chunk)
+        if not chunks:
+            return False
+        # Drop what has already been consumed before growing the window
+        self.buf = self.buf[self.pos:] + ''.join(chunks)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}, found '{self.buf[self.pos]}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A value that runs to the end of the window (e.g. a number) may be cut short
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Double the window so a value spanning many chunks is decoded O(log n) times, not once per chunk
+            self._fill(max(CHUNK_SIZE, len(self.buf) - self.pos))
+
+    def items(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' in array, found '{separator}'")
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of the object starting at the current position; the caller consumes each value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' in object, found '{separator}'")
+
+
+class Reservoir:
+    """Algorithm R: a uniform sample of k items from a stream of unknown length."""
+
+    def __init__(self, k: int, rng: random.Random):
+        self.k = k
+        self.rng = rng
+        self.seen = 0
+        self.positions: List[int] = []
+        self.items: List[Any] = []
+
+    def offer(self, item: Any):
+        position = self.seen
+        self.seen += 1
+        if len(self.items) < self.k:
+            self.positions.append(position)
+            self.items.append(item)
+            return
+        slot = self.rng.randrange(self.seen)
+        if slot < self.k:
+            self.positions[slot] = position
+            self.items[slot] = item
+
+
+def reservoir_sample_json(file_path: Path, k: int, rng: random.Random,
+                          columns: Sequence[str]) -> Tuple[int, List[int], Dict[str, List[Any]]]:
+    """
+    Sample k elements from a large JSON document in a single streaming pass.
+
+    - A top-level array is treated as a list of records, returned under 'records'.
+    - A top-level object is read as parallel arrays named by `columns` (e.g.
+      ('inputs', 'targets') or ('examples',)); positions are reservoir-sampled on
+      the first column seen and the same positions are picked from the others.
+      Other members are skipped.
+
+    Returns (total_count, positions, {name: sampled values}).
+    """
+    with open(file_path, encoding='utf-8') as f:
+        stream = _StreamDecoder(f)
+
+        if stream.peek() == '[':
+            reservoir = Reservoir(k, rng)
+            for record in stream.items():
+                reservoir.offer(record)
+            return reservoir.seen, reservoir.positions, {'records': reservoir.items}
+
+        wanted = set(columns)
+        reservoir = None
+        selected: Dict[str, List[Any]] = {}
+        slot_of: Dict[int, int] = {}
+        for key in stream.members():
+            if key not in wanted:
+                stream.value()  # skip unrelated members
+                continue
+            if reservoir is None:
+                reservoir = Reservoir(k, rng)
+                for element in stream.items():
+                    reservoir.offer(element)
+                selected[key] = reservoir.items
+                slot_of = {position: slot for slot, position in enumerate(reservoir.positions)}
+            else:
+                values: List[Any] = [None] * len(slot_of)
+                count = 0
+                for position, element in enumerate(stream.items()):
+                    count = position + 1
+                    slot = slot_of.get(position)
+                    if slot is not None:
+                        values[slot] = element
+                if count != reservoir.seen:
+                    raise ValueError(f"Column {key} has {count} entries, expected {reservoir.seen}")
+                selected[key] = values
+
+    missing = wanted - set(selected)
+    if missing:
+        raise ValueError(f"Dataset {file_path} is missing {', '.join(sorted(missing))}")
+    return reservoir.seen, reservoir.positions, selected
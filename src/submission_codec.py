@@ -0,0 +1,158 @@
+from collections import Counter
+from typing import Any, Callable, Iterable, List, Optional
+import hashlib
+import json
+import struct
+import zlib
+
+# Stored blobs: format version, id of the preset dictionary (0 = none), then a zlib stream
+CODEC_VERSION = 1
+_HEADER = struct.Struct('<BI')
+COMPRESSION_LEVEL = 9
+# zlib only looks back 32KB, so a larger preset dictionary would never be used
+MAX_DICTIONARY_SIZE = 32 * 1024
+DICTIONARY_NGRAM = 3
+
+# Inputs are stored as a reference into the dataset they were sampled from
+INPUTS_MODE = 'test'
+
+# (dataset_type, mode, example_ids, version) -> inputs and (dataset_type, mode) -> retained version,
+# registered by whoever owns the DatasetManager
+_input_resolver: Optional[Callable[[str, str, List[int], Optional[str]], Optional[List]]] = None
+_version_resolver: Optional[Callable[[str, str], Optional[str]]] = None
+
+def encode_json(value: Any, dictionary_id: int = 0, dictionary: bytes = b'') -> bytes:
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=dictionary) if dictionary \
+        else zlib.compressobj(COMPRESSION_LEVEL)
+    data = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return _HEADER.pack(CODEC_VERSION, dictionary_id) + compressor.compress(data) + compressor.flush()
+
+
+def blob_dictionary_id(blob: bytes) -> int:
+    version, dictionary_id = _HEADER.unpack_from(blob)
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported submission blob version {version}")
+    return dictionary_id
+
+
+def decode_json(blob: bytes, dictionary: bytes = b'') -> Any:
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    data = decompressor.decompress(blob[_HEADER.size:]) + decompressor.flush()
+    return json.loads(data)
+
+
+def train_dictionary(samples: Iterable[Any], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """
+    A zlib preset dictionary of the word n-grams that recur across sample
+    payloads (serialized as they are stored), most valuable last since zlib
+    reaches the end of the dictionary with the shortest distances.
+    """
+    counts = Counter()
+    for sample in samples:
+        words = json.dumps(sample, separators=(',', ':')).split(' ')
+        counts.update({' '.join(words[i:i + DICTIONARY_NGRAM]) + ' '
+                       for i in range(max(1, len(words) - DICTIONARY_NGRAM + 1))})
+
+    # Rank by bytes saved: each sample that repeats an n-gram saves roughly its length
+    ranked = sorted((ngram for ngram, count in counts.items() if count > 1),
+                    key=lambda ngram: counts[ngram] * len(ngram), reverse=True)
+    chosen, total = [], 0
+    for ngram in ranked:
+        encoded = ngram.encode('utf-8')
+        if total + len(encoded) > size:
+            break
+        chosen.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(chosen))
+
+
+def inputs_fingerprint(inputs: List) -> str:
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def set_input_resolver(resolver: Callable[[str, str, List[int], Optional[str]], Optional[List]],
+                       version_resolver: Optional[Callable[[str, str], Optional[str]]] = None):
+    global _input_resolver, _version_resolver
+    _input_resolver = resolver
+    _version_resolver = version_resolver
+
+
+def resolve_inputs(dataset_type: str, mode: str, example_ids: List[int],
+                   version: Optional[str] = None) -> Optional[List]:
+    if _input_resolver is None or not example_ids:
+        return None
+    try:
+        return _input_resolver(dataset_type, mode, example_ids, version)
+    except Exception as e:
+        print(f"Error resolving inputs of {dataset_type} {mode}: {str(e)}")
+        return None
+
+
+def dataset_version(dataset_type: str, mode: str) -> Optional[str]:
+    if _version_resolver is None:
+        return None
+    try:
+        return _version_resolver(dataset_type, mode)
+    except Exception as e:
+        print(f"Error getting the version of {dataset_type} {mode}: {str(e)}")
+        return None
+
+
+def input_reference(dataset_type: str, example_ids: Optional[List[int]], inputs: List) -> Optional[dict]:
+    """
+    A reference to the examples of a retained dataset version that reproduce
+    inputs exactly, or None (store the inputs inline) if there is no such version.
+    """
+    if not example_ids:
+        return None
+    version = dataset_version(dataset_type, INPUTS_MODE)
+    if version is None or resolve_inputs(dataset_type, INPUTS_MODE, example_ids, version) != inputs:
+        return None
+    return {'mode': INPUTS_MODE, 'example_ids': list(example_ids), 'sha256': inputs_fingerprint(inputs),
+            'dataset_sha256': version}
+
+
+def dereference_inputs(dataset_type: str, reference: dict) -> Optional[List]:
+    """
+    Inputs behind a reference, read from the dataset version it pins. References
+    stored before versions were pinned (no dataset_sha256) read the current
+    dataset. None if the examples can't be found or no longer match.
+    """
+    inputs = resolve_inputs(dataset_type, reference['mode'], reference['example_ids'],
+                            reference.get('dataset_sha256'))
+    if inputs is None or inputs_fingerprint(inputs) != reference['sha256']:
+        print(f"Error - Stored inputs of {dataset_type} no longer match the dataset")
+        return None
+    return inputs
+
+
+# Per-example response fields that repeat the entry's own inputs, expected outputs and predictions
+_EXAMPLE_PAYLOAD_FIELDS = ('input', 'expected', 'raw_prediction')
+
+
+def compact_result(evaluation: dict, response: dict) -> dict:
+    """
+    What a test result stores for reuse: evaluation settings, metrics and the
+    per-example scores. Inputs, expected outputs and predictions are left out
+    since the entry already stores (or references) them; a processed prediction
+    is only kept when it differs from the raw one (e.g. a standardized label).
+    """
+    scores = []
+    for example in response.get('examples', []):
+        example_scores = {key: value for key, value in example.items() if key not in _EXAMPLE_PAYLOAD_FIELDS}
+        if example_scores.get('processed_prediction') == example.get('raw_prediction'):
+            example_scores.pop('processed_prediction', None)
+        scores.append(example_scores)
+    return {'evaluation': evaluation, 'metrics': response['metrics'], 'scores': scores}
+
+
+def expand_result(result: dict, inputs: List, expected_outputs: List, raw_predictions: List) -> dict:
+    """The test response a compact result was made from, given the entry's inputs and predictions"""
+    if 'response' in result:  # stored before results were compacted
+        return result['response']
+    examples = []
+    for inp, expected, raw, scores in zip(inputs, expected_outputs, raw_predictions, result['scores']):
+        example = {'input': inp, 'expected': expected, 'raw_prediction': raw, 'processed_prediction': raw}
+        example.update(scores)
+        examples.append(example)
+    return {'metrics': result['metrics'], 'examples': examples}
@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+from src.models import (
+    db, CompressionDictionary, LeaderboardEntry, SubmissionDetails, current_dictionary, encode_payload
+)
+from src.submission_codec import train_dictionary
+
+# Recent submissions a dictionary is trained on, and rows re-encoded per transaction
+DICTIONARY_SAMPLE_SIZE = 2000
+RECOMPRESS_BATCH_SIZE = 500
+
+
+def _payload_bytes(details: SubmissionDetails) -> int:
+    return sum(len(blob) for blob in (details.predictions_data, details.inputs_data, details.result_data) if blob)
+
+
+def train_compression_dictionary(dataset_type: str) -> Optional[int]:
+    """
+    Train a preset dictionary on the dataset's most recent predictions and
+    results and make it the one new payloads are written with. Returns its id,
+    or None if there is nothing to train on.
+    """
+    entries = LeaderboardEntry.query.filter_by(dataset_type=dataset_type).join(SubmissionDetails).order_by(
+        LeaderboardEntry.id.desc()
+    ).limit(DICTIONARY_SAMPLE_SIZE).all()
+    samples = [payload for entry in entries for payload in (entry.raw_predictions, entry.result) if payload]
+    if not samples:
+        return None
+
+    dictionary = CompressionDictionary(dataset_type=dataset_type, data=train_dictionary(samples))
+    db.session.add(dictionary)
+    db.session.commit()
+    current_dictionary(dataset_type, refresh=True)
+    return dictionary.id
+
+
+def recompress_submissions(dataset_type: str) -> Dict[str, int]:
+    """
+    Re-encode every stored payload of a dataset with its current dictionary,
+    replacing inline inputs by references to the current dataset version
+    where it is retained and matches. Works in
+    id-ordered batches, one transaction each. Returns row and byte counts.
+    """
+    stats = {'rows': 0, 'bytes_before': 0, 'bytes_after': 0, 'inputs_referenced': 0}
+    last_id = 0
+    while True:
+        entries = LeaderboardEntry.query.filter(
+            LeaderboardEntry.dataset_type == dataset_type,
+            LeaderboardEntry.id > last_id
+        ).join(SubmissionDetails).order_by(LeaderboardEntry.id).limit(RECOMPRESS_BATCH_SIZE).all()
+        if not entries:
+            return stats
+
+        for entry in entries:
+            details = entry.details
+            stats['bytes_before'] += _payload_bytes(details)
+            predictions, result, inputs = entry.raw_predictions, entry.result, entry.inputs_used
+            details.predictions_data = encode_payload(dataset_type, predictions)
+            details.result_data = encode_payload(dataset_type, result)
+            # References stored before versions were pinned are re-pinned (or inlined) while still readable
+            if details.inputs_ref is None or 'dataset_sha256' not in details.inputs_ref:
+                entry.store_inputs(inputs, entry.example_ids)
+            stats['inputs_referenced'] += details.inputs_ref is not None
+            stats['bytes_after'] += _payload_bytes(details)
+        stats['rows'] += len(entries)
+        last_id = entries[-1].id
+        db.session.commit()
+        db.session.expunge_all()
@@ -0,0 +1,225 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import atexit
+import fcntl
+import json
+import os
+import threading
+import uuid
+
+BATCH_SIZE = int(os.environ.get('LEADERBOARD_BATCH_SIZE', 100))
+FLUSH_INTERVAL = float(os.environ.get('LEADERBOARD_FLUSH_INTERVAL', 0.5))  # seconds
+JOURNAL_SUFFIX = '.jsonl'
+# Serializes replays of a journal directory across processes
+REPLAY_LOCK = '.replay.lock'
+
+
+class PartialFlushError(Exception):
+    """
+    Raised by a flush_batch that handled only the first `flushed` items of its
+    batch before failing. Those items are marked done; the rest stay queued.
+    """
+
+    def __init__(self, flushed: int, cause: Exception):
+        super().__init__(str(cause))
+        self.flushed = flushed
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):  # numpy scalars in metrics
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class WriteBehindQueue:
+    """
+    In-process buffer of pending writes, committed by a background thread in
+    batches of up to batch_size every `interval` seconds (sooner once a full
+    batch is waiting).
+
+    Items stay visible through pending() until their batch has been committed,
+    so readers can merge them in. With a journal_dir every item is appended
+    (and fsynced) to a per-process journal before enqueue returns; journals left
+    behind by a crashed process are committed by replay_journals() when the app
+    or a replacement worker starts. Pending items are flushed at interpreter exit.
+    """
+
+    def __init__(self, flush_batch: Callable[[List[Dict]], None], journal_dir: Optional[Path] = None,
+                 batch_size: int = BATCH_SIZE, interval: float = FLUSH_INTERVAL):
+        self.flush_batch = flush_batch
+        self.journal_dir = journal_dir
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: List[Dict] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._owner_pid: Optional[int] = None
+        self._journal = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def pending(self) -> List[Dict]:
+        with self._cond:
+            return list(self._pending)
+
+    def enqueue(self, item: Dict):
+        with self._cond:
+            self._ensure_started()
+            item = dict(item, journal_id=uuid.uuid4().hex)
+            if self._journal is not None:
+                self._journal.write(json.dumps(item, default=_json_default) + '\n')
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            self._pending.append(item)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._owner_pid == pid:
+            return
+        # First use in this process; threads and queued items don't carry over a fork
+        self._owner_pid = pid
+        self._pending = []
+        if self.journal_dir is not None:
+            self.journal_dir.mkdir(parents=True, exist_ok=True)
+            # Unique per process start: a recycled pid must not append to a journal awaiting replay
+            self._journal = open(self.journal_dir / f"{pid}-{uuid.uuid4().hex[:8]}{JOURNAL_SUFFIX}", 'a')
+            # Held for the life of the process so replay_journals skips live journals
+            fcntl.flock(self._journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._thread = threading.Thread(target=self._run, name='leaderboard-write-behind', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            with self._cond:
+                self._cond.wait(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Commit everything pending now. A failed batch stays queued for the next attempt."""
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    batch = self._pending[:self.batch_size]
+                if not batch:
+                    return
+                try:
+                    self.flush_batch(batch)
+                except PartialFlushError as e:
+                    print(f"Error flushing queued leaderboard writes after {e.flushed} of {len(batch)}: {str(e)}")
+                    if e.flushed:
+                        with self._cond:
+                            del self._pending[:e.flushed]
+                            self._mark_done(batch[:e.flushed])
+                    return
+                except Exception as e:
+                    print(f"Error flushing {len(batch)} queued leaderboard writes: {str(e)}")
+                    return
+                with self._cond:
+                    del self._pending[:len(batch)]
+                    self._mark_done(batch)
+
+    def _mark_done(self, batch: List[Dict]):
+        if self._journal is None:
+            return
+        if not self._pending:
+            # Everything is committed: start the journal over
+            self._journal.truncate(0)
+            self._journal.seek(0)
+        else:
+            self._journal.write(json.dumps({'done': [item['journal_id'] for item in batch]}) + '\n')
+            self._journal.flush()
+
+    def close(self):
+        if self._owner_pid != os.getpid():
+            return
+        self._closed = True
+        with self._cond:
+            self._cond.notify()
+        self.flush()
+        if self._journal is not None and not self._pending:
+            os.unlink(self._journal.name)
+            self._journal.close()
+            self._journal = None
+
+
+def _read_journal(f) -> List[Dict]:
+    """Items of a journal not yet marked done, in the order they were written"""
+    items: Dict[str, Dict] = {}
+    for line in f:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # torn final line from a crash mid-write
+        if 'done' in record:
+            for journal_id in record['done']:
+                items.pop(journal_id, None)
+        else:
+            items[record['journal_id']] = record
+    return list(items.values())
+
+
+def _write_done(f, batch: List[Dict]):
+    if batch:
+        f.write(json.dumps({'done': [item['journal_id'] for item in batch]}) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _replay_journal(path: Path, flush_batch: Callable[[List[Dict]], None], batch_size: int) -> int:
+    """
+    Commit the pending items of one journal and delete it. Each committed batch
+    is marked done in the journal first, so a replay that fails part way keeps
+    the file and resumes after the last committed batch.
+    """
+    with open(path, 'r+') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0  # journal of a live process
+        try:
+            if os.stat(path).st_ino != os.fstat(f.fileno()).st_ino:
+                return 0  # replayed and deleted while we waited for the lock
+        except FileNotFoundError:
+            return 0
+        content = f.read()
+        pending = _read_journal(content.splitlines(keepends=True))
+        if content and not content.endswith('\n'):
+            f.write('\n')  # keep the done markers off a torn final line
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                flush_batch(batch)
+            except PartialFlushError as e:
+                _write_done(f, batch[:e.flushed])
+                raise
+            _write_done(f, batch)
+        path.unlink()
+    return len(pending)
+
+
+def replay_journals(journal_dir: Path, flush_batch: Callable[[List[Dict]], None],
+                    batch_size: int = BATCH_SIZE) -> int:
+    """
+    Commit items left in journals of processes that are gone. Returns the number
+    replayed. Only one process replays a directory at a time; others skip it.
+    A journal whose replay fails is logged and kept for the next attempt.
+    """
+    if not journal_dir.is_dir():
+        return 0
+    replayed = 0
+    with open(journal_dir / REPLAY_LOCK, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+        for path in sorted(journal_dir.glob(f"*{JOURNAL_SUFFIX}")):
+            try:
+                replayed += _replay_journal(path, flush_batch, batch_size)
+            except Exception as e:
+                print(f"Error replaying leaderboard journal {path.name}, keeping it: {str(e)}")
+    if replayed:
+        print(f"Debug - Replayed {replayed} journaled leaderboard writes")
+    return replayed
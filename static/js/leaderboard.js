@@ -226,6 +226,13 @@ function renderLeaderboard() {
                                 <span class="text-sm ${
                                     key === 'score' ? 'font-medium text-gray-900' : 'text-gray-600'
                                 }">${formatValue(entry[key], key)}</span>
+                                ${
+                                    key === 'name' && entry.near_clone
+                                        ? `<span class="ml-2 text-gray-400" title="Near copy of an earlier submission">
+                                            <i class="fas fa-clone"></i>
+                                        </span>`
+                                        : ''
+                                }
                             </div>
                         </td>
                     `).join('')}
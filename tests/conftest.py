@@ -0,0 +1,11 @@
+from pathlib import Path
+import os
+import sys
+import tempfile
+
+# Unit tests run against the testing config: in-memory SQLite, no dataset preload
+os.environ.setdefault('FLASK_ENV', 'testing')
+os.environ.setdefault('PRELOAD_DATASETS', 'false')
+os.environ.setdefault('LEADERBOARD_CACHE_DIR', tempfile.mkdtemp(prefix='prompt_game_test_cache_'))
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """Point the app's dataset manager at a copy of config/datasets.json"""
+    from src import routes
+
+    manager = routes.dataset_manager
+    path = tmp_path / 'datasets.json'
+    path.write_text(manager.config_path.read_text())
+    monkeypatch.setattr(manager, 'config_path', path)
+    manager.load_config()
+    yield path
+    monkeypatch.undo()
+    manager.load_config()
+
+
+def test_snapshot_pairs_each_config_with_its_version(config_file):
+    from src.routes import dataset_manager
+
+    version, config = dataset_manager.config_snapshot()
+    assert 'word_sorting' in config
+
+    edited = json.loads(config_file.read_text())
+    del edited['word_sorting']
+    config_file.write_text(json.dumps(edited))
+    assert dataset_manager.load_config()
+
+    new_version, new_config = dataset_manager.config_snapshot()
+    assert new_version == version + 1
+    assert new_config == edited
+    assert 'word_sorting' in config  # a snapshot taken earlier is never changed in place
+
+
+def test_served_config_follows_reloads(config_file):
+    from src.app import app
+    from src.routes import dataset_manager
+
+    http = app.test_client()
+    assert 'word_sorting' in http.get('/config/datasets.json').get_json()
+
+    edited = json.loads(config_file.read_text())
+    del edited['word_sorting']
+    config_file.write_text(json.dumps(edited))
+    dataset_manager.load_config()
+    assert http.get('/config/datasets.json').get_json() == edited
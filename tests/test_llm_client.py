@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import RateLimitError
+
+from src import llm_client
+
+
+def _rate_limit_error(headers=None):
+    request = httpx.Request('POST', 'https://api.groq.com/openai/v1/chat/completions')
+    return RateLimitError("rate limited", response=httpx.Response(429, headers=headers or {}, request=request),
+                          body=None)
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _Completions:
+    """Rate-limits the first `limited` calls of each message, then echoes it back"""
+
+    def __init__(self, limited):
+        self.limited = limited
+        self.calls = {}
+
+    def _create(self, messages):
+        content = messages[-1]['content']
+        self.calls[content] = self.calls.get(content, 0) + 1
+        if self.calls[content] <= self.limited:
+            raise _rate_limit_error()
+        return _completion(content)
+
+    def create(self, messages, **kwargs):
+        return self._create(messages)
+
+
+class _AsyncCompletions(_Completions):
+    async def create(self, messages, **kwargs):
+        return self._create(messages)
+
+
+@pytest.fixture
+def stub_groq(monkeypatch):
+    monkeypatch.setattr(llm_client, 'RATE_LIMIT_RETRIES', 2)
+    monkeypatch.setattr(llm_client, 'RATE_LIMIT_BACKOFF', 0.0)
+    monkeypatch.setattr(llm_client, '_loop', None)
+
+    def install(limited, async_completions):
+        completions = (_AsyncCompletions if async_completions else _Completions)(limited)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        monkeypatch.setattr(llm_client, 'ASYNC_COMPLETIONS', async_completions)
+        monkeypatch.setattr(llm_client, 'initialize_client', lambda: client)
+        monkeypatch.setattr(llm_client, 'initialize_async_client', lambda: client)
+        return completions
+    return install
+
+
+def _requests(*contents):
+    return [[{'role': 'user', 'content': content}] for content in contents]
+
+
+@pytest.mark.parametrize('async_completions', [True, False])
+def test_rate_limited_calls_are_retried(stub_groq, async_completions):
+    completions = stub_groq(limited=2, async_completions=async_completions)
+    assert llm_client.complete_all(_requests('a', 'b'), model='m', temperature=0) == ['a', 'b']
+    assert completions.calls == {'a': 3, 'b': 3}
+
+
+@pytest.mark.parametrize('async_completions', [True, False])
+def test_rate_limit_error_is_returned_after_the_last_retry(stub_groq, async_completions):
+    completions = stub_groq(limited=3, async_completions=async_completions)
+    responses = llm_client.complete_all(_requests('a'), model='m', temperature=0)
+    assert isinstance(responses[0], RateLimitError)
+    assert completions.calls == {'a': 3}
+    with pytest.raises(RateLimitError):
+        llm_client.complete(_requests('b')[0], model='m', temperature=0)
+
+
+def test_retry_after_header_sets_the_delay():
+    assert llm_client._rate_limit_delay(_rate_limit_error({'retry-after': '2'}), 0) == 2.0
+    assert llm_client._rate_limit_delay(_rate_limit_error({'retry-after': '600'}), 0) == llm_client.MAX_RATE_LIMIT_DELAY
+    assert llm_client._rate_limit_delay(_rate_limit_error(), 3) == llm_client.RATE_LIMIT_BACKOFF * 8
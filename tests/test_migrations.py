@@ -0,0 +1,161 @@
+from contextlib import contextmanager
+from pathlib import Path
+import json
+
+import pytest
+import sqlalchemy as sa
+
+from src import submission_codec
+from src.submission_codec import decode_json, inputs_fingerprint
+
+MIGRATIONS = str(Path(__file__).parent.parent / 'migrations')
+BEFORE_COMPRESSION = '5b8e2c4f7a93'
+COMPRESSION = '9c1d5e7a3b64'
+
+# leaderboard_entry as it was before the first migration, with its payloads inline
+LEGACY_SCHEMA = """
+CREATE TABLE leaderboard_entry (
+    id INTEGER PRIMARY KEY, dataset_type VARCHAR(50) NOT NULL, name VARCHAR(100) NOT NULL,
+    score FLOAT NOT NULL, prompt_length INTEGER, timestamp DATETIME, accuracy FLOAT, word_accuracy FLOAT,
+    efficiency FLOAT, similarity FLOAT, length_penalty_avg FLOAT, prompt_efficiency FLOAT, base_accuracy FLOAT,
+    semantic_similarity FLOAT, language_quality FLOAT, target_language VARCHAR(10), system_prompt TEXT,
+    is_production BOOLEAN, raw_predictions JSON, inputs_used JSON
+)
+"""
+# entry id -> (raw predictions, inputs)
+LEGACY_ENTRIES = {
+    1: (['apple banana'], ['banana apple']),
+    2: (['cat dog', 'ant bee'], ['dog cat', 'bee ant']),
+}
+
+
+class _Database:
+    def __init__(self, db):
+        self.db = db
+
+    def upgrade(self, revision):
+        from flask_migrate import upgrade
+        self.db.session.remove()
+        upgrade(directory=MIGRATIONS, revision=revision)
+
+    def downgrade(self, revision):
+        from flask_migrate import downgrade
+        self.db.session.remove()
+        downgrade(directory=MIGRATIONS, revision=revision)
+
+    def execute(self, statement, **params):
+        with self.db.engine.begin() as connection:
+            connection.execute(sa.text(statement), params)
+
+    def rows(self, columns):
+        with self.db.engine.connect() as connection:
+            return {row[0]: tuple(row[1:]) for row in connection.execute(
+                sa.text(f"SELECT entry_id, {columns} FROM submission_details ORDER BY entry_id"))}
+
+    def columns(self):
+        return {column['name'] for column in sa.inspect(self.db.engine).get_columns('submission_details')}
+
+
+@contextmanager
+def _legacy_database(create_all=False):
+    from src.app import app
+    from src.models import db
+
+    with app.app_context():
+        db.drop_all()
+        database = _Database(db)
+        database.execute(LEGACY_SCHEMA)
+        for entry_id, (predictions, inputs) in LEGACY_ENTRIES.items():
+            database.execute(
+                "INSERT INTO leaderboard_entry (id, dataset_type, name, score, is_production, system_prompt, "
+                "raw_predictions, inputs_used, timestamp) VALUES (:id, 'word_sorting', 'test', 50, 0, 'Sort', "
+                ":predictions, :inputs, '2024-01-01 00:00:00')",
+                id=entry_id, predictions=json.dumps(predictions), inputs=json.dumps(inputs)
+            )
+        if create_all:
+            # As create_app() does on startup, before `flask db upgrade` runs the migrations
+            db.create_all()
+        yield database
+
+        # Leave the schema the other tests expect
+        db.session.remove()
+        db.drop_all()
+        database.execute("DROP TABLE IF EXISTS alembic_version")
+        db.create_all()
+
+
+@pytest.fixture
+def legacy_db():
+    """The test database at the revision before compression, holding LEGACY_ENTRIES"""
+    with _legacy_database() as database:
+        database.upgrade(BEFORE_COMPRESSION)
+        yield database
+
+
+@pytest.fixture
+def started_legacy_db():
+    """A database from before the migrations, after the app's db.create_all() added the newer tables"""
+    with _legacy_database(create_all=True) as database:
+        yield database
+
+
+@pytest.fixture
+def retained_version(monkeypatch):
+    """Entry 2's inputs are examples 3 and 4 of dataset version 'v1'; no other version is retained"""
+    examples = dict(zip([3, 4], LEGACY_ENTRIES[2][1]))
+
+    def resolve(dataset_type, mode, example_ids, version):
+        return [examples[i] for i in example_ids] if version == 'v1' else None
+
+    monkeypatch.setattr(submission_codec, '_input_resolver', resolve)
+    monkeypatch.setattr(submission_codec, '_version_resolver', lambda dataset_type, mode: 'v1')
+
+
+def _reference_inputs(database, version):
+    reference = {'mode': 'test', 'example_ids': [3, 4], 'sha256': inputs_fingerprint(LEGACY_ENTRIES[2][1]),
+                 'dataset_sha256': version}
+    database.execute("UPDATE submission_details SET inputs_data = NULL, inputs_ref = :reference WHERE entry_id = 2",
+                     reference=json.dumps(reference))
+
+
+def test_upgrade_compresses_payloads(legacy_db):
+    legacy_db.upgrade(COMPRESSION)
+    columns = legacy_db.columns()
+    assert {'predictions_data', 'inputs_data', 'result_data', 'inputs_ref'} <= columns
+    assert not {'raw_predictions', 'inputs_used', 'result'} & columns
+
+    rows = legacy_db.rows('predictions_data, inputs_data, result_data, inputs_ref')
+    for entry_id, (predictions, inputs) in LEGACY_ENTRIES.items():
+        predictions_data, inputs_data, result_data, inputs_ref = rows[entry_id]
+        assert decode_json(predictions_data) == predictions
+        assert decode_json(inputs_data) == inputs
+        assert result_data is None and inputs_ref is None
+
+
+def test_downgrade_restores_inline_and_referenced_inputs(legacy_db, retained_version):
+    legacy_db.upgrade(COMPRESSION)
+    _reference_inputs(legacy_db, 'v1')
+    legacy_db.downgrade(BEFORE_COMPRESSION)
+
+    columns = legacy_db.columns()
+    assert {'raw_predictions', 'inputs_used', 'result'} <= columns
+    assert not {'predictions_data', 'inputs_data', 'result_data', 'inputs_ref'} & columns
+    rows = legacy_db.rows('raw_predictions, inputs_used')
+    assert {entry_id: tuple(json.loads(value) for value in row) for entry_id, row in rows.items()} == LEGACY_ENTRIES
+
+
+def test_downgrade_stops_when_referenced_inputs_are_unreadable(legacy_db, retained_version):
+    legacy_db.upgrade(COMPRESSION)
+    _reference_inputs(legacy_db, 'v0')
+    with pytest.raises(ValueError, match="leaderboard entry 2"):
+        legacy_db.downgrade(BEFORE_COMPRESSION)
+
+
+def test_upgrade_after_create_all_backfills_compressed_columns(started_legacy_db):
+    started_legacy_db.upgrade('head')
+    rows = started_legacy_db.rows('system_prompt, predictions_data, inputs_data')
+    for entry_id, (predictions, inputs) in LEGACY_ENTRIES.items():
+        system_prompt, predictions_data, inputs_data = rows[entry_id]
+        assert system_prompt == 'Sort'
+        assert decode_json(predictions_data) == predictions
+        assert decode_json(inputs_data) == inputs
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src import llm_client
+
+PROMPT = 'Sort the given words alphabetically and reply with them separated by spaces.'
+SEED = 1234
+
+
+class _EchoCompletions:
+    """Answers every example with its own input, counting the calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=messages[-1]['content']))])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from src import routes
+    from src.app import app
+
+    completions = _EchoCompletions()
+    monkeypatch.setattr(llm_client, '_loop', None)
+    monkeypatch.setattr(llm_client, 'initialize_async_client',
+                        lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(routes.config, 'GROQ_API_KEY', 'test')
+    return app.test_client(), completions
+
+
+def _edit_dataset(monkeypatch):
+    """Make the dataset's examples change in place: the same seed and ids now select swapped contents"""
+    from src import routes
+
+    load_dataset = routes.dataset_manager.load_dataset
+
+    def edited(*args, **kwargs):
+        dataset = load_dataset(*args, **kwargs)
+        for column in ('inputs', 'targets', 'input_lengths', 'target_lengths', 'target_words'):
+            dataset[column] = dataset[column][1:] + dataset[column][:1]
+        return dataset
+
+    monkeypatch.setattr(routes.dataset_manager, 'load_dataset', edited)
+
+
+def _test(http, name):
+    response = http.post('/api/test_prompt', json={'dataset_type': 'word_sorting', 'system_prompt': PROMPT,
+                                                   'name': name, 'seed': SEED})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_resubmitted_prompt_reuses_the_stored_result(client):
+    http, completions = client
+    first = _test(http, 'first')
+    calls = completions.calls
+
+    second = _test(http, 'second')
+    assert second['cached'] is True
+    assert completions.calls == calls
+    assert second['examples'] == first['examples']
+
+
+def test_edited_dataset_forces_a_new_evaluation(client, monkeypatch):
+    http, completions = client
+    first = _test(http, 'before edit')
+    calls = completions.calls
+
+    _edit_dataset(monkeypatch)
+    second = _test(http, 'after edit')
+    assert not second.get('cached')
+    assert completions.calls > calls
+    assert second['example_ids'] == first['example_ids']
+    assert [example['input'] for example in second['examples']] != \
+        [example['input'] for example in first['examples']]
@@ -0,0 +1,81 @@
+import pytest
+
+from src import submission_codec
+from src.submission_codec import (
+    blob_dictionary_id, decode_json, dereference_inputs, encode_json, input_reference, inputs_fingerprint,
+    train_dictionary
+)
+
+PAYLOAD = {'metrics': {'accuracy': 0.5}, 'predictions': ['apple banana cherry', 'dog elephant fox', None]}
+
+
+class _Datasets:
+    """A dataset per version, of which only `retained` are kept"""
+
+    def __init__(self, versions, current, retained):
+        self.versions, self.current, self.retained = versions, current, retained
+
+    def resolve(self, dataset_type, mode, example_ids, version):
+        if version is not None and version not in self.retained:
+            return None
+        inputs = self.versions[version or self.current]
+        return [inputs[i] for i in example_ids]
+
+    def version(self, dataset_type, mode):
+        return self.current if self.current in self.retained else None
+
+
+@pytest.fixture
+def datasets(monkeypatch):
+    datasets = _Datasets({'v1': ['a b', 'c d', 'e f'], 'v2': ['a b', 'changed', 'e f']}, 'v1', {'v1'})
+    monkeypatch.setattr(submission_codec, '_input_resolver', datasets.resolve)
+    monkeypatch.setattr(submission_codec, '_version_resolver', datasets.version)
+    return datasets
+
+
+def test_round_trip_without_dictionary():
+    blob = encode_json(PAYLOAD)
+    assert blob_dictionary_id(blob) == 0
+    assert decode_json(blob) == PAYLOAD
+
+
+def test_round_trip_with_dictionary():
+    dictionary = train_dictionary([PAYLOAD, dict(PAYLOAD, metrics={'accuracy': 1.0})])
+    assert dictionary
+    blob = encode_json(PAYLOAD, 7, dictionary)
+    assert blob_dictionary_id(blob) == 7
+    assert decode_json(blob, dictionary) == PAYLOAD
+    assert len(blob) < len(encode_json(PAYLOAD))
+
+
+def test_unknown_blob_version_is_rejected():
+    blob = bytes([2]) + encode_json(PAYLOAD)[1:]
+    with pytest.raises(ValueError):
+        blob_dictionary_id(blob)
+
+
+def test_reference_pins_the_dataset_version(datasets):
+    reference = input_reference('word_sorting', [0, 1], ['a b', 'c d'])
+    assert reference == {'mode': 'test', 'example_ids': [0, 1], 'sha256': inputs_fingerprint(['a b', 'c d']),
+                         'dataset_sha256': 'v1'}
+
+    # The source changes; the reference still reads the version it was made against
+    datasets.current = 'v2'
+    assert dereference_inputs('word_sorting', reference) == ['a b', 'c d']
+
+
+def test_inputs_are_inline_when_the_version_is_not_retained(datasets):
+    datasets.current = 'v2'
+    assert input_reference('word_sorting', [0, 1], ['a b', 'changed']) is None
+
+
+def test_inputs_that_do_not_match_the_examples_are_inline(datasets):
+    assert input_reference('word_sorting', [0, 1], ['a b', 'something else']) is None
+    assert input_reference('word_sorting', None, ['a b']) is None
+
+
+def test_unpinned_reference_reads_the_current_dataset(datasets):
+    reference = {'mode': 'test', 'example_ids': [1], 'sha256': inputs_fingerprint(['c d'])}
+    assert dereference_inputs('word_sorting', reference) == ['c d']
+    datasets.current = 'v2'
+    assert dereference_inputs('word_sorting', reference) is None
@@ -0,0 +1,167 @@
+import json
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from src.write_behind import JOURNAL_SUFFIX, PartialFlushError, WriteBehindQueue, replay_journals
+
+
+def _failing_flush(batch):
+    raise ConnectionError("database unavailable")
+
+
+def _crash(queue):
+    """Leave the journal behind as a killed process would: unflushed, lock released"""
+    queue._closed = True
+    queue._journal.close()
+    queue._journal = None
+    queue._owner_pid = None
+
+
+def _journal(tmp_path, name, records, tail=''):
+    path = tmp_path / f"{name}{JOURNAL_SUFFIX}"
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records) + tail)
+    return path
+
+
+def test_enqueued_items_are_journaled_and_replayed_in_order(tmp_path):
+    queue = WriteBehindQueue(_failing_flush, tmp_path, interval=3600)
+    for i in range(3):
+        queue.enqueue({'n': i})
+    journals = list(tmp_path.glob(f"*{JOURNAL_SUFFIX}"))
+    assert len(journals) == 1
+    assert len(journals[0].read_text().splitlines()) == 3
+    _crash(queue)
+
+    replayed = []
+    assert replay_journals(tmp_path, replayed.extend) == 3
+    assert [item['n'] for item in replayed] == [0, 1, 2]
+    assert not list(tmp_path.glob(f"*{JOURNAL_SUFFIX}"))
+
+
+def test_live_journal_is_not_replayed(tmp_path):
+    queue = WriteBehindQueue(_failing_flush, tmp_path, interval=3600)
+    queue.enqueue({'n': 0})
+
+    replayed = []
+    assert replay_journals(tmp_path, replayed.extend) == 0
+    assert replayed == []
+    _crash(queue)
+
+
+def test_done_items_and_a_torn_last_line_are_skipped(tmp_path):
+    _journal(tmp_path, '1', [
+        {'journal_id': 'a', 'n': 0},
+        {'journal_id': 'b', 'n': 1},
+        {'done': ['a']},
+    ], tail='{"journal_id": "c", "n"')
+
+    replayed = []
+    assert replay_journals(tmp_path, replayed.extend) == 1
+    assert replayed == [{'journal_id': 'b', 'n': 1}]
+    assert not list(tmp_path.glob(f"*{JOURNAL_SUFFIX}"))
+
+
+def test_failed_replay_keeps_the_journal_and_resumes_after_committed_batches(tmp_path):
+    path = _journal(tmp_path, '1', [{'journal_id': str(i), 'n': i} for i in range(3)], tail='{"torn')
+    committed = []
+
+    def flush_until_unavailable(batch):
+        if len(committed) == 1:
+            raise ConnectionError("database unavailable")
+        committed.extend(batch)
+
+    assert replay_journals(tmp_path, flush_until_unavailable, batch_size=1) == 0
+    assert path.exists()
+    assert [item['n'] for item in committed] == [0]
+
+    committed.clear()
+    assert replay_journals(tmp_path, committed.extend, batch_size=1) == 2
+    assert [item['n'] for item in committed] == [1, 2]
+    assert not path.exists()
+
+
+def _flush_two_of_three(batch):
+    if len(batch) == 3:
+        raise PartialFlushError(2, ConnectionError("database unavailable"))
+
+
+def test_partially_flushed_batch_keeps_only_the_rest_queued(tmp_path):
+    queue = WriteBehindQueue(_flush_two_of_three, tmp_path, interval=3600)
+    for i in range(3):
+        queue.enqueue({'n': i})
+    queue.flush()
+    assert [item['n'] for item in queue.pending()] == [2]
+    _crash(queue)
+
+    replayed = []
+    assert replay_journals(tmp_path, replayed.extend) == 1
+    assert [item['n'] for item in replayed] == [2]
+
+
+def test_partially_replayed_journal_resumes_after_the_flushed_items(tmp_path):
+    path = _journal(tmp_path, '1', [{'journal_id': str(i), 'n': i} for i in range(3)])
+    assert replay_journals(tmp_path, _flush_two_of_three) == 0
+    assert path.exists()
+
+    replayed = []
+    assert replay_journals(tmp_path, replayed.extend) == 1
+    assert [item['n'] for item in replayed] == [2]
+
+
+def _item(name):
+    return {'dataset_type': 'word_sorting', 'data': {
+        'name': name,
+        'system_prompt': f"Sort the words ({name})",
+        'metrics': {'combined_score': 50.0, 'accuracy': 50.0, 'word_accuracy': 50.0,
+                    'efficiency_modifier': 1.0, 'prompt_length': 20},
+    }}
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    """Ids of the entries commit_batch adds to the prompt index"""
+    from src import leaderboard
+
+    ids = []
+    monkeypatch.setattr(leaderboard, 'index_entries', lambda entries: ids.extend(entry.id for entry in entries))
+    return ids
+
+
+def test_rejected_batch_falls_back_to_row_by_row_inserts(indexed):
+    from src.app import app
+    from src.leaderboard import commit_batch
+    from src.models import LeaderboardEntry
+
+    with app.app_context():
+        before = LeaderboardEntry.query.count()
+        # name is NOT NULL, so the batch insert fails and only the bad row is dropped
+        commit_batch([_item('first'), _item(None), _item('third')])
+        added = LeaderboardEntry.query.order_by(LeaderboardEntry.id).all()[before:]
+    assert [entry.name for entry in added] == ['first', 'third']
+    # The dropped row was flushed (and given an id) before its commit failed; it must not be indexed
+    assert indexed == [entry.id for entry in added]
+
+
+def test_connection_loss_during_row_by_row_inserts_keeps_the_rest_queued(indexed, monkeypatch):
+    from src import leaderboard
+    from src.app import app
+    from src.models import LeaderboardEntry
+
+    add_entry = leaderboard.add_entry
+
+    def add_until_unavailable(entry):
+        if entry.name == 'third':
+            raise OperationalError("INSERT", {}, ConnectionError("database unavailable"))
+        add_entry(entry)
+
+    monkeypatch.setattr(leaderboard, 'add_entry', add_until_unavailable)
+    with app.app_context():
+        before = LeaderboardEntry.query.count()
+        with pytest.raises(PartialFlushError) as raised:
+            leaderboard.commit_batch([_item('first'), _item(None), _item('third')])
+        added = LeaderboardEntry.query.order_by(LeaderboardEntry.id).all()[before:]
+    # 'first' committed and the bad row was dropped: only 'third' is left to retry
+    assert raised.value.flushed == 2
+    assert [entry.name for entry in added] == ['first']
+    assert indexed == [entry.id for entry in added]